@@ -0,0 +1 @@
+"""Benchmarks for terraform_validate_patched, run them from the repository root with ``python -m benchmarks.<name>``."""
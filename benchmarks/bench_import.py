@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measures the cold start latency of the package in fresh interpreters.
+
+Every sample starts a new python process so nothing is cached in memory, which is
+what a pre-commit hook or a pytest-xdist worker pays. Three stages are timed: the
+package import, the first parse of a small configuration, that is the import of
+pyhcl and the creation of the parser, and a second parse. Run with::
+
+    python -m benchmarks.bench_import --repeat 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'terraform_validate_patched', 'fixtures', 'query')
+
+SCRIPT = '''
+import json, time
+start = time.perf_counter()
+import terraform_validate_patched as t
+imported = time.perf_counter()
+t.Validator({path!r})
+first = time.perf_counter()
+t.Validator({path!r})
+second = time.perf_counter()
+print(json.dumps({{'import': imported - start, 'first_parse': first - imported, 'second_parse': second - first}}))
+'''
+
+
+def sample(path):
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT.format(path=path)],
+                                     cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--path', default=FIXTURE)
+    args = parser.parse_args()
+
+    samples = [sample(args.path) for _ in range(args.repeat)]
+    result = {'repeat': args.repeat}
+    for stage in ('import', 'first_parse', 'second_parse'):
+        result['{}_median_ms'.format(stage)] = round(statistics.median(entry[stage] for entry in samples) * 1000, 2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
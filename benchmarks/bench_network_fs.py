@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measures loading a root from a filesystem with network latency, reading ahead or one file at a time.
+
+Every directory listing and every file read waits ``--latency`` seconds, like an
+NFS mount does, and the corpus is loaded reading the files one by one and with
+``--workers`` threads reading ahead of the parser. Run with::
+
+    python -m benchmarks.bench_network_fs --files 100 --latency 0.005 --workers 1 4 16
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import terraform_validate_patched as t
+from terraform_validate_patched.filesystem import LatencyFilesystem
+
+from . import corpus
+
+
+def load(path, workers, latency, repeat):
+    timings = []
+    validator = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validator = t.Validator(path, read_workers=workers, filesystem=LatencyFilesystem(latency))
+        timings.append(time.perf_counter() - start)
+    return min(timings), validator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    corpus.add_arguments(parser)
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds every listing and read waits')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp(prefix='tfv-network-fs-')
+    try:
+        corpus.generate_corpus(path, **corpus.corpus_parameters(args))
+        results, expected = [], None
+        for workers in args.workers:
+            seconds, validator = load(path, workers, args.latency, args.repeat)
+            if expected is None:
+                expected = validator.terraform_config
+            elif validator.terraform_config != expected:
+                raise SystemExit('Loading with {} workers gave another configuration'.format(workers))
+            results.append({'workers': workers, 'seconds': round(seconds, 4),
+                            'read_seconds': round(validator.stats()['phases']['read']['wall'], 4)})
+        print(json.dumps({'files': args.files + 1, 'latency': args.latency, 'loads': results}, indent=2))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compares a compiled rule plan against evaluating every rule on its own.
+
+The one test per rule approach selects and materializes the resources again for
+every rule, the plan visits every resource once. Run with::
+
+    python -m benchmarks.bench_rule_plan --resources 2000 --rules 300
+"""
+
+import argparse
+import json
+import random
+import time
+
+import terraform_validate_patched as t
+
+RESOURCE_TYPES = ['aws_instance', 'aws_s3_bucket', 'aws_security_group', 'aws_ebs_volume', 'aws_iam_role']
+ASSERTIONS = [('value', 'should_equal', [1]),
+              ('name', 'should_match_regex', ['res-.*']),
+              (None, 'should_have_properties', [['value', 'name']]),
+              (None, 'name_should_match_regex', ['r[0-9]+'])]
+
+
+def build_config(resources, seed=0):
+    generator = random.Random(seed)
+    config = {'resource': {}}
+    for index in range(resources):
+        resource_type = RESOURCE_TYPES[index % len(RESOURCE_TYPES)]
+        config['resource'].setdefault(resource_type, {})['r{}'.format(index)] = {
+            'value': generator.choice([1, 1, 1, 2]),
+            'name': 'res-{}'.format(index),
+            'tags': {'Name': 'res-{}'.format(index)}}
+    return config
+
+
+def build_rules(count):
+    rules = []
+    for index in range(count):
+        property_name, assertion, args = ASSERTIONS[index % len(ASSERTIONS)]
+        rules.append(t.Rule('rule-{}'.format(index),
+                            RESOURCE_TYPES[index % len(RESOURCE_TYPES)],
+                            assertion,
+                            args=args,
+                            property=property_name))
+    return t.RuleSet(rules)
+
+
+def rule_by_rule(validator, rule_set):
+    collector = validator.enable_violation_collection()
+    for rule in rule_set:
+        with collector.rule(rule.name):
+            rule.evaluate(validator)
+    validator.disable_violation_collection()
+    return collector
+
+
+def best_of(function, repeat, setup):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        # every sample validates a fresh validator, so none hits the memos of the previous one
+        validator = setup()
+        start = time.perf_counter()
+        result = function(validator)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--resources', type=int, default=2000)
+    parser.add_argument('--rules', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    config = build_config(args.resources)
+    rule_set = build_rules(args.rules)
+    plan = rule_set.compile()
+    separate, expected = best_of(lambda validator: rule_by_rule(validator, rule_set), args.repeat,
+                                 lambda: t.Validator(config))
+    planned, actual = best_of(plan.run, args.repeat, lambda: t.Validator(config))
+    if expected.messages() != actual.messages():
+        raise SystemExit('The plan and the rule by rule run reported different violations')
+    print(json.dumps({'resources': args.resources,
+                      'rules': args.rules,
+                      'violations': len(actual),
+                      'rule_by_rule_seconds': round(separate, 4),
+                      'plan_seconds': round(planned, 4),
+                      'speedup': round(separate / planned, 2)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Generates synthetic Terraform repositories to benchmark against.
+
+The shape of the corpus is controlled by the number of files, the resources per
+file, how deep blocks nest, how many times list valued blocks repeat and which
+fraction of string attributes interpolate a variable. Generation is seeded, the
+same parameters always produce the same files. Run with::
+
+    python -m benchmarks.corpus /tmp/corpus --files 50 --resources-per-file 40
+"""
+
+import argparse
+import json
+import os
+import random
+
+RESOURCE_TYPES = ['aws_instance', 'aws_s3_bucket', 'aws_security_group', 'aws_ebs_volume', 'aws_iam_role']
+INSTANCE_TYPES = ['t2.micro', 't2.small', 'm4.large', 'c5.xlarge']
+ENVIRONMENTS = ['production', 'staging', 'development']
+LIST_BLOCK = 'ebs_block_device'
+NESTED_BLOCK = 'block'
+VARIABLES_FILE = 'variables.tf'
+
+DEFAULTS = {'files': 10,
+            'resources_per_file': 20,
+            'depth': 2,
+            'list_blocks': 2,
+            'interpolation': 0.3,
+            'variables': 20,
+            'seed': 0}
+
+
+def _string(generator, literal, interpolation, variables):
+    if variables and generator.random() < interpolation:
+        return '"${{var.{}}}"'.format(generator.choice(variables))
+    return json.dumps(literal)
+
+
+def _nested_block(generator, lines, depth, level, indent, interpolation, variables):
+    if level > depth:
+        return
+    padding = '  ' * indent
+    lines.append('{}{}{} {{'.format(padding, NESTED_BLOCK if level == 1 else 'level_', '' if level == 1 else level))
+    lines.append('{}  leaf = {}'.format(padding, _string(generator, 'leaf-{}'.format(level), interpolation,
+                                                         variables)))
+    lines.append('{}  enabled = {}'.format(padding, generator.choice(['true', 'true', 'false'])))
+    _nested_block(generator, lines, depth, level + 1, indent + 1, interpolation, variables)
+    lines.append('{}}}'.format(padding))
+
+
+def render_resource(generator, resource_type, name, depth, list_blocks, interpolation, variables):
+    """Renders a single resource block as HCL."""
+    lines = ['resource "{}" "{}" {{'.format(resource_type, name),
+             '  name = {}'.format(_string(generator, name.replace('_', '-'), interpolation, variables)),
+             '  instance_type = {}'.format(_string(generator, generator.choice(INSTANCE_TYPES), interpolation,
+                                                   variables)),
+             '  count = {}'.format(generator.randint(1, 3)),
+             '  encrypted = {}'.format(generator.choice(['true', 'true', 'true', 'false'])),
+             '  security_groups = ["sg-{}", "sg-{}"]'.format(generator.randint(0, 9), generator.randint(0, 9)),
+             '  policy = {}'.format(json.dumps(json.dumps({'Version': '2012-10-17',
+                                                           'Statement': [{'Effect': 'Allow', 'Action': '*'}]}))),
+             '  tags {',
+             '    Name = {}'.format(_string(generator, name, interpolation, variables)),
+             '    Environment = "{}"'.format(generator.choice(ENVIRONMENTS)),
+             '  }']
+    for index in range(list_blocks):
+        lines.extend(['  {} {{'.format(LIST_BLOCK),
+                      '    device_name = "/dev/sd{}"'.format(chr(ord('b') + index % 24)),
+                      '    volume_size = {}'.format(generator.choice([8, 16, 100])),
+                      '    encrypted = {}'.format(generator.choice(['true', 'true', 'false'])),
+                      '  }'])
+    _nested_block(generator, lines, depth, 1, 1, interpolation, variables)
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def render_variables(count):
+    blocks = []
+    for index in range(count):
+        blocks.append('variable "var_{0}" {{\n  default = "value-{0}"\n}}'.format(index))
+    return '\n\n'.join(blocks) + '\n'
+
+
+def generate_corpus(path, files=DEFAULTS['files'], resources_per_file=DEFAULTS['resources_per_file'],
+                    depth=DEFAULTS['depth'], list_blocks=DEFAULTS['list_blocks'],
+                    interpolation=DEFAULTS['interpolation'], variables=DEFAULTS['variables'], seed=DEFAULTS['seed']):
+    """Writes a synthetic Terraform repository.
+
+    Args:
+        path: Directory to write to, it is created when missing
+        files: Number of .tf files holding resources
+        resources_per_file: Resources written to every file
+        depth: Levels of nested blocks inside every resource, 0 for none
+        list_blocks: How many times the list valued block repeats in every resource
+        interpolation: Fraction, 0 to 1, of string attributes interpolating a variable
+        variables: Number of variables declared in variables.tf
+        seed: Seed of the random generator
+
+    Returns:
+        dict: The parameters used and the number of resources written
+
+    """
+    generator = random.Random(seed)
+    variable_names = ['var_{}'.format(index) for index in range(variables)]
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    with open(os.path.join(path, VARIABLES_FILE), 'w') as ofile:
+        ofile.write(render_variables(variables))
+    counter = 0
+    for file_index in range(files):
+        blocks = []
+        for _ in range(resources_per_file):
+            resource_type = RESOURCE_TYPES[counter % len(RESOURCE_TYPES)]
+            blocks.append(render_resource(generator, resource_type, 'r_{}_{}'.format(file_index, counter),
+                                          depth, list_blocks, interpolation, variable_names))
+            counter += 1
+        with open(os.path.join(path, 'main_{:04d}.tf'.format(file_index)), 'w') as ofile:
+            ofile.write('\n\n'.join(blocks) + '\n')
+    return {'files': files,
+            'resources_per_file': resources_per_file,
+            'depth': depth,
+            'list_blocks': list_blocks,
+            'interpolation': interpolation,
+            'variables': variables,
+            'seed': seed,
+            'resources': counter}
+
+
+def add_arguments(parser):
+    """Adds the corpus shape options to an argument parser, shared by the benchmark scripts."""
+    parser.add_argument('--files', type=int, default=DEFAULTS['files'])
+    parser.add_argument('--resources-per-file', type=int, default=DEFAULTS['resources_per_file'])
+    parser.add_argument('--depth', type=int, default=DEFAULTS['depth'])
+    parser.add_argument('--list-blocks', type=int, default=DEFAULTS['list_blocks'])
+    parser.add_argument('--interpolation', type=float, default=DEFAULTS['interpolation'])
+    parser.add_argument('--variables', type=int, default=DEFAULTS['variables'])
+    parser.add_argument('--seed', type=int, default=DEFAULTS['seed'])
+
+
+def corpus_parameters(args):
+    return {name: getattr(args, name) for name in DEFAULTS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path')
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(generate_corpus(args.path, **corpus_parameters(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
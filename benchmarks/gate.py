@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Fails when the benchmark suite regressed against the committed baseline.
+
+Two checks are run:
+
+* The suite is run on the corpus recorded in ``benchmarks/baseline.json`` and the
+  median of every benchmark is compared to the stored median. A benchmark regressed
+  when it is slower by more than its tolerance, a fraction, and by more than the
+  absolute ``min_delta`` seconds, which keeps sub millisecond noise from failing
+  the gate.
+* A scaling check generates corpora of growing size and fits the growth exponent
+  of load and assertion time between consecutive sizes. An exponent above
+  ``--max-exponent`` means the time grows super linearly with the resources.
+
+The exit status is 1 on any regression. Refresh the baseline on the reference
+machine after an intended change with ``--update-baseline``. Run with::
+
+    python -m benchmarks.gate
+    python -m benchmarks.gate --skip-scaling --update-baseline
+    python -m benchmarks.gate --skip-suite --scaling-sizes 1000,10000,100000
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import terraform_validate_patched as t
+
+from . import corpus, suite
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_MIN_DELTA = 0.001
+SCALING_SIZES = '1000,10000,100000'
+SCALING_RESOURCES_PER_FILE = 100
+SCALING_BENCHMARKS = ('property_chain', 'should_equal', 'variable_expansion_should_equal')
+# Used when the baseline is written for the first time.
+BASELINE_CORPUS = OrderedDict([('files', 10), ('resources_per_file', 50)])
+BASELINE_REPEAT = 7
+
+
+def load_baseline(path, missing_ok=False):
+    if missing_ok and not os.path.exists(path):
+        parameters = OrderedDict(corpus.DEFAULTS)
+        parameters.update(BASELINE_CORPUS)
+        return OrderedDict([('corpus', parameters), ('repeat', BASELINE_REPEAT), ('benchmarks', OrderedDict())])
+    with open(path) as ifile:
+        return json.load(ifile, object_pairs_hook=OrderedDict)
+
+
+def compare(baseline, results):
+    """Compares suite results to the baseline.
+
+    Args:
+        baseline: The parsed baseline file
+        results: The output of ``suite.run_suite``
+
+    Returns:
+        list: A report row per benchmark in the baseline
+
+    """
+    defaults = baseline.get('defaults', {})
+    rows = []
+    for name, expected in baseline['benchmarks'].items():
+        tolerance = expected.get('tolerance', defaults.get('tolerance', DEFAULT_TOLERANCE))
+        min_delta = expected.get('min_delta', defaults.get('min_delta', DEFAULT_MIN_DELTA))
+        if name not in results:
+            rows.append({'name': name, 'status': 'missing', 'baseline': expected['median'], 'median': None})
+            continue
+        median = results[name]['median']
+        limit = expected['median'] * (1 + tolerance)
+        regressed = median > limit and median - expected['median'] > min_delta
+        rows.append({'name': name,
+                     'status': 'regression' if regressed else 'ok',
+                     'baseline': expected['median'],
+                     'median': median,
+                     'ratio': median / expected['median'] if expected['median'] else None,
+                     'tolerance': tolerance})
+    return rows
+
+
+def run_suite_gate(baseline, repeat=None):
+    directory = tempfile.mkdtemp(prefix='tfv-gate-')
+    try:
+        corpus.generate_corpus(directory, **baseline['corpus'])
+        return suite.run_suite(directory, repeat or baseline.get('repeat', 5))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def write_baseline(path, results, corpus_parameters, repeat, previous=None):
+    previous = previous or {}
+    benchmarks = OrderedDict()
+    for name, result in results.items():
+        entry = OrderedDict([('median', round(result['median'], 6))])
+        for key in ('tolerance', 'min_delta'):
+            if key in previous.get('benchmarks', {}).get(name, {}):
+                entry[key] = previous['benchmarks'][name][key]
+        benchmarks[name] = entry
+    document = OrderedDict([('environment', suite.environment()),
+                            ('corpus', corpus_parameters),
+                            ('repeat', repeat),
+                            ('defaults', previous.get('defaults', OrderedDict([('tolerance', DEFAULT_TOLERANCE),
+                                                                               ('min_delta', DEFAULT_MIN_DELTA)]))),
+                            ('benchmarks', benchmarks)])
+    with open(path, 'w') as ofile:
+        json.dump(document, ofile, indent=2)
+        ofile.write('\n')
+
+
+def _time_scaling_point(resources, repeat):
+    directory = tempfile.mkdtemp(prefix='tfv-scaling-')
+    try:
+        files = max(1, resources // SCALING_RESOURCES_PER_FILE)
+        corpus.generate_corpus(directory, files=files, resources_per_file=min(resources, SCALING_RESOURCES_PER_FILE))
+        start = time.perf_counter()
+        validator = t.Validator(directory)
+        load = time.perf_counter() - start
+        config = t.thaw(validator.terraform_config)
+        assertions = sum(suite.measure(suite.BENCHMARKS[name], repeat, lambda: t.Validator(config))['median']
+                         for name in SCALING_BENCHMARKS)
+        return OrderedDict([('resources', files * min(resources, SCALING_RESOURCES_PER_FILE)),
+                            ('load', load),
+                            ('assertions', assertions)])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def scaling_check(sizes, max_exponent, repeat=3):
+    """Fits the growth exponent of load and assertion time between consecutive corpus sizes.
+
+    Args:
+        sizes: Increasing resource counts
+        max_exponent: The largest accepted exponent, 1 is linear
+        repeat: Samples per assertion benchmark at every size
+
+    Returns:
+        tuple: The measured points and a report row per measured interval
+
+    """
+    points = [_time_scaling_point(size, repeat) for size in sizes]
+    rows = []
+    for smaller, larger in zip(points, points[1:]):
+        for measurement in ('load', 'assertions'):
+            exponent = (math.log(larger[measurement] / smaller[measurement]) /
+                        math.log(float(larger['resources']) / smaller['resources']))
+            rows.append({'name': '{}_{}_to_{}'.format(measurement, smaller['resources'], larger['resources']),
+                         'status': 'regression' if exponent > max_exponent else 'ok',
+                         'exponent': exponent,
+                         'max_exponent': max_exponent})
+    return points, rows
+
+
+def _print_rows(title, rows):
+    print(title)
+    for row in rows:
+        if 'exponent' in row:
+            detail = 'exponent {:.2f} (max {:.2f})'.format(row['exponent'], row['max_exponent'])
+        elif row['median'] is None:
+            detail = 'not measured'
+        else:
+            detail = '{:.6f}s vs {:.6f}s ({:+.0%}, tolerance {:.0%})'.format(row['median'], row['baseline'],
+                                                                          row['ratio'] - 1, row['tolerance'])
+        print('  {:<12} {:<45} {}'.format(row['status'].upper(), row['name'], detail))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--repeat', type=int, help='Samples per benchmark, defaults to the baseline setting')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store the suite medians as the new baseline instead of comparing')
+    parser.add_argument('--skip-suite', action='store_true')
+    parser.add_argument('--skip-scaling', action='store_true')
+    parser.add_argument('--scaling-sizes', default=SCALING_SIZES, help='Comma separated resource counts')
+    parser.add_argument('--max-exponent', type=float, default=1.25)
+    parser.add_argument('--output', help='Write the full report as JSON to this file')
+    args = parser.parse_args()
+
+    report = OrderedDict()
+    failed = False
+    if not args.skip_suite:
+        baseline = load_baseline(args.baseline, missing_ok=args.update_baseline)
+        results = run_suite_gate(baseline, args.repeat)
+        if args.update_baseline:
+            write_baseline(args.baseline, results, baseline['corpus'], args.repeat or baseline.get('repeat', 5),
+                           baseline)
+            print('Updated {}'.format(args.baseline))
+        else:
+            rows = compare(baseline, results)
+            _print_rows('Suite against {}'.format(args.baseline), rows)
+            failed = failed or any(row['status'] != 'ok' for row in rows)
+            report['suite'] = rows
+    if not args.skip_scaling:
+        sizes = [int(size) for size in args.scaling_sizes.split(',')]
+        points, rows = scaling_check(sizes, args.max_exponent)
+        _print_rows('Scaling over {} resources'.format(', '.join(str(point['resources']) for point in points)), rows)
+        failed = failed or any(row['status'] != 'ok' for row in rows)
+        report['scaling'] = OrderedDict([('points', points), ('intervals', rows)])
+    if args.output:
+        with open(args.output, 'w') as ofile:
+            json.dump(report, ofile, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the public API, run against a generated corpus.
+
+Covers loading a directory, resource selection, property chains, every assertion
+method and variable expansion. Assertions run in collecting mode so a failing
+resource costs the same as a passing one instead of aborting the run. Every
+benchmark is timed ``--repeat`` times, every sample on a fresh validator built
+from the loaded configuration so no sample hits the memos of the previous one,
+and the samples, median and minimum are written as JSON so runs can be compared.
+Run with::
+
+    python -m benchmarks.suite --files 20 --resources-per-file 50 --output results.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import terraform_validate_patched as t
+
+from . import corpus
+
+
+def _collect():
+    return {'collector': t.ViolationCollector()}
+
+
+def _instances(validator, **changes):
+    changes.update(_collect())
+    return validator.resources(['aws_instance'], **changes)
+
+
+def _all_resources(validator, **changes):
+    changes.update(_collect())
+    return validator.resources('aws_.*', **changes)
+
+
+BENCHMARKS = OrderedDict([
+    ('select_resources_regex', lambda v: _all_resources(v)),
+    ('select_resources_list', lambda v: _instances(v)),
+    ('property_chain', lambda v: _all_resources(v).property('block').property('level_2').property('leaf')),
+    ('property_list_block', lambda v: _all_resources(v).property('ebs_block_device').property('encrypted')),
+    ('find_property', lambda v: _all_resources(v).find_property('tag.*')),
+    ('with_property', lambda v: _all_resources(v).with_property('instance_type', 't2\\..*')),
+    ('resources_should_have_properties', lambda v: _all_resources(v).should_have_properties(['name', 'tags'])),
+    ('resources_should_not_have_properties', lambda v: _all_resources(v).should_not_have_properties(['acl'])),
+    ('name_should_match_regex', lambda v: _all_resources(v).name_should_match_regex('r_[0-9]+_[0-9]+')),
+    ('should_equal', lambda v: _all_resources(v).property('encrypted').should_equal(True)),
+    ('should_not_equal', lambda v: _all_resources(v).property('instance_type').should_not_equal('t2.micro')),
+    ('list_should_contain', lambda v: _all_resources(v).property('security_groups').list_should_contain(['sg-1'])),
+    ('list_should_not_contain',
+     lambda v: _all_resources(v).property('security_groups').list_should_not_contain(['sg-0'])),
+    ('properties_should_have_properties',
+     lambda v: _all_resources(v).property('tags').should_have_properties(['Name', 'Environment'])),
+    ('properties_should_not_have_properties',
+     lambda v: _all_resources(v).property('tags').should_not_have_properties(['Owner'])),
+    ('should_match_regex', lambda v: _all_resources(v).property('name').should_match_regex('r-[0-9]+-[0-9]+')),
+    ('should_contain_valid_json', lambda v: _all_resources(v).property('policy').should_contain_valid_json()),
+    ('columns_should_be_in',
+     lambda v: _all_resources(v).property('instance_type').columns().should_be_in(corpus.INSTANCE_TYPES)),
+    ('variable_expansion_should_equal',
+     lambda v: _all_resources(v, variable_expand=True).property('instance_type').should_equal('t2.micro')),
+    ('variable_expansion_nested',
+     lambda v: _all_resources(v, variable_expand=True).property('block').property('leaf').should_match_regex('.*')),
+])
+LOAD_BENCHMARK = 'load_directory'
+
+
+def measure(function, repeat, setup=None):
+    """Times function repeat times, passing it what setup returns when given, setup is not timed."""
+    samples = []
+    for _ in range(repeat):
+        arguments = (setup(),) if setup is not None else ()
+        # the garbage of the setup is collected before the clock starts, not during the sample
+        gc.collect()
+        start = time.perf_counter()
+        function(*arguments)
+        samples.append(time.perf_counter() - start)
+    return OrderedDict([('median', statistics.median(samples)),
+                        ('min', min(samples)),
+                        ('samples', samples)])
+
+
+def run_suite(path, repeat=5, pattern=None):
+    """Runs the benchmarks against the repository at path.
+
+    Args:
+        path: The Terraform directory to load
+        repeat: Samples taken per benchmark
+        pattern: Optional regex, only benchmarks whose name matches it are run
+
+    Returns:
+        OrderedDict: Benchmark name to its median, minimum and samples in seconds
+
+    """
+    selected = re.compile(pattern) if pattern else None
+    results = OrderedDict()
+    if selected is None or selected.search(LOAD_BENCHMARK):
+        results[LOAD_BENCHMARK] = measure(lambda: t.Validator(path), repeat)
+    config = t.thaw(t.Validator(path).terraform_config)
+    for name, benchmark in BENCHMARKS.items():
+        if selected is None or selected.search(name):
+            results[name] = measure(benchmark, repeat, lambda: t.Validator(config))
+    return results
+
+
+def environment():
+    return OrderedDict([('python', platform.python_version()),
+                        ('implementation', platform.python_implementation()),
+                        ('platform', platform.platform()),
+                        ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    corpus.add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help='Only run benchmarks whose name matches this regex')
+    parser.add_argument('--corpus', help='Use this Terraform directory instead of generating one')
+    parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    directory = args.corpus or tempfile.mkdtemp(prefix='tfv-corpus-')
+    try:
+        parameters = {'path': args.corpus} if args.corpus else corpus.generate_corpus(directory,
+                                                                                      **corpus.corpus_parameters(args))
+        report = OrderedDict([('environment', environment()),
+                              ('corpus', parameters),
+                              ('repeat', args.repeat),
+                              ('results', run_suite(directory, args.repeat, args.filter))])
+    finally:
+        if not args.corpus:
+            shutil.rmtree(directory, ignore_errors=True)
+    if args.output:
+        with open(args.output, 'w') as ofile:
+            json.dump(report, ofile, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
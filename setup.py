@@ -33,11 +33,15 @@ setup(
     author='''Costas Tyfoxylos''',
     author_email='''ctyfoxylos@schubergphilis.com''',
     url='''https://github.com/schubergphilis/terraform_validate_patched.git''',
-    packages=find_packages(where='.', exclude=('tests', 'hooks')),
+    packages=find_packages(where='.', exclude=('tests', 'hooks', 'benchmarks')),
     package_dir={'''terraform_validate_patched''':
                  '''terraform_validate_patched'''},
     include_package_data=True,
+    python_requires='>=3.8',
     install_requires=requirements,
+    extras_require={'numpy': ['numpy'],
+                    'yaml': ['PyYAML']},
+    entry_points={'console_scripts': ['terraform-validate = terraform_validate_patched.cli:main']},
     license='GNU GPL v3.0',
     zip_safe=False,
     keywords='''terraform_validate_patched terraform_validate patch''',
@@ -46,7 +50,13 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Natural Language :: English',
-        'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         ],
     test_suite='tests',
     tests_require=test_requirements,
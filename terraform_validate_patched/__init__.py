@@ -27,7 +27,15 @@ Import all parts from terraform_validate_patched here
    http://google.github.io/styleguide/pyguide.html
 """
 from ._version import __version__
-from terraform_validate_patched import *
+from .terraform_validate_patched import *
+from .rules import Rule, RulePlan, RuleSet, TerraformRuleException
+from .runner import RuleResult, RuleRunner
+from .history import RuleHistory, Schedule, schedule_rules
+from .cache import ResultCache
+from .shards import PartialResult, Shard, assign, load_timings, merge_partials
+from .fingerprints import ConfigDiff, diff_configs
+from .frozen import FrozenDict, FrozenList, freeze, thaw
+from .sinks import JsonLinesSink, JsonSink, JUnitSink, SarifSink, TextSink, ViolationSink
 
 __author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
 __docformat__ = '''google'''
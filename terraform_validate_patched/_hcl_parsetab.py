@@ -0,0 +1,191 @@
+# Generated by terraform_validate_patched.hclparser.write_tables(), do not edit.
+# pylint: skip-file
+SIGNATURE = '28c2e73a64fde38bb944ec3bbe32aaef03cc1dbc6c55d69a1f176193199c6909'
+ACTION_ITEMS = {
+    '$end': ([0, 1, 2, 3, 4, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 21, 23, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 52, 53, 54, 55, 56, 57, 58, 59, 60, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 94, 103, 105, 115, 116, 117, 118, 129, 137, 142, 144, 146, 156, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [-3, 0, -1, -2, -4, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, -78, -79, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, -38, -33, -34, -11, -10, -37, -39, -40, -41, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -82, -83, -7, -10, -75, -76, -77, -80, -8, -20, -87, -88, -81, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'ADD': ([6, 8, 13, 14, 15, 16, 33, 34, 35, 38, 41, 44, 53, 56, 63, 65, 67, 69, 71, 72, 73, 74, 75, 76, 100, 101, 112, 115, 117, 120, 126, 168, 173, 177, 182, 196, 200, 205], [25, 29, -115, -116, -124, -126, -123, -125, -117, -118, 85, 29, 85, 29, 107, 107, 107, 107, 107, 107, 107, 107, -127, -128, 29, 25, 25, 29, 25, -124, 25, 29, 25, 25, 25, 25, 25, 25]),
+    'ASTERISK_PERIOD': ([100, 168], [135, 208]),
+    'BOOL': ([20, 22, 77, 92, 138, 139, 140, 152, 153, 154], [42, 54, 113, 127, 174, 178, 181, 197, 201, 204]),
+    'COLON': ([5, 7, 8, 13, 14, 15, 16, 33, 34, 35, 38, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 111, 112, 113, 114, 115, 125, 126, 127, 128, 144, 146, 187, 188, 216, 221], [22, -11, -10, -115, -116, -124, -126, -123, -125, -117, -118, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 138, 139, 140, 141, -10, 152, 153, 154, 155, -87, -88, -89, -90, -91, -92]),
+    'COMMA': ([3, 4, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 21, 23, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 93, 94, 95, 96, 97, 98, 99, 100, 101, 102, 103, 105, 115, 116, 117, 118, 121, 122, 123, 129, 131, 132, 133, 134, 136, 137, 142, 144, 146, 149, 150, 151, 156, 157, 158, 159, 160, 161, 162, 163, 164, 165, 166, 167, 168, 169, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 189, 191, 194, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 214, 216, 220, 221], [18, -4, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, -78, -79, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, -38, -33, -34, -11, -10, -37, -39, -40, -41, 106, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 130, -82, -93, -94, 131, 132, 134, -10, -110, -113, -83, -7, -10, -75, -76, -77, 145, 147, 149, -80, -95, -96, -107, -97, 171, -8, -20, -87, -88, -97, 193, 194, -81, -98, -99, -100, -108, -109, -111, -101, -102, -103, -104, -105, -10, -114, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -86, -85, -97, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -106, -91, -84, -92]),
+    'COMMENT': ([0, 3, 4, 5, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 23, 24, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 94, 103, 105, 106, 115, 116, 117, 118, 129, 130, 137, 142, 144, 145, 146, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [11, 11, -4, 11, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, 11, 11, -78, -79, 11, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, -38, -33, -34, -11, -10, -37, -39, -40, -41, 11, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -82, -83, -7, 11, -10, -75, -76, -77, -80, 160, -8, -20, -87, 160, -88, -81, 160, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'DIVIDE': ([6, 8, 13, 14, 15, 16, 33, 34, 35, 38, 41, 44, 53, 56, 63, 65, 67, 69, 71, 72, 73, 74, 75, 76, 100, 101, 112, 115, 117, 120, 126, 168, 173, 177, 182, 196, 200, 205], [28, 32, -115, -116, -124, -126, -123, -125, -117, -118, 88, 32, 88, 32, 110, 110, 110, 110, 110, 110, 110, 110, -127, -128, 32, 28, 28, 32, 28, -124, 28, 32, 28, 28, 28, 28, 28, 28]),
+    'EMINUS': ([13, 14, 15, 16, 33, 34, 120], [37, 37, -124, -126, -123, -125, -124]),
+    'EPLUS': ([13, 14, 15, 16, 33, 34, 120], [36, 36, -124, -126, -123, -125, -124]),
+    'EQ': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 79, 79, -11, -10, 79, 79, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'EQUAL': ([5, 7, 8, 13, 14, 15, 16, 33, 34, 35, 38, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [20, -11, -10, -115, -116, -124, -126, -123, -125, -117, -118, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'FLOAT': ([0, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 94, 103, 104, 105, 106, 107, 108, 109, 110, 115, 116, 117, 118, 124, 129, 130, 131, 132, 137, 138, 139, 140, 141, 142, 144, 145, 146, 152, 153, 154, 155, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [16, 16, -4, 16, -11, -10, -42, 16, -129, -130, -115, -116, -124, -126, -5, 16, 16, 16, -78, 16, -79, 16, 16, 16, 16, 16, 16, 16, 16, 16, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, 16, -38, -33, -34, -11, -10, -37, -39, -40, -41, 16, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 16, 16, -69, -70, -71, -72, -73, -74, 16, 16, 16, 16, 16, 16, 16, 16, -82, -83, 16, -7, 16, 16, 16, 16, 16, -10, -75, -76, -77, 16, -80, 16, 16, 16, -8, 16, 16, 16, 16, -20, -87, 16, -88, 16, 16, 16, 16, -81, 16, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'GE': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 84, 84, -11, -10, 84, 84, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'GT': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 82, 82, -11, -10, 82, 82, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'IDENTIFIER': ([0, 3, 4, 5, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 94, 103, 104, 105, 106, 115, 116, 117, 118, 124, 129, 130, 131, 132, 135, 137, 138, 139, 140, 141, 142, 144, 145, 146, 152, 153, 154, 155, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 185, 186, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 208, 210, 211, 216, 220, 221], [8, 8, -4, 8, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, 8, 8, 44, -78, 56, -79, 8, 64, 66, 68, 70, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, 100, -38, -33, -34, -11, -10, -37, -39, -40, -41, 8, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 115, 8, -69, -70, -71, -72, -73, -74, 64, 66, 68, 70, 8, 8, 100, 115, -82, -83, 100, -7, 8, -10, -75, -76, -77, 100, -80, 100, 8, 168, 169, -8, 115, 115, 115, 8, -20, -87, 100, -88, 115, 115, 115, 8, -81, 100, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, 210, 211, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, 214, -21, -22, -91, -84, -92]),
+    'LE': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 83, 83, -11, -10, 83, 83, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'LEFTBRACE': ([5, 7, 8, 13, 14, 15, 16, 19, 20, 22, 33, 34, 35, 38, 50, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 91, 104, 124, 130, 131, 132, 145, 171], [24, -11, -10, -115, -116, -124, -126, 24, 24, 24, -123, -125, -117, -118, 24, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 24, 24, 24, 24, 24, 24, 24, 24]),
+    'LEFTBRACKET': ([7, 13, 14, 15, 16, 20, 22, 33, 34, 35, 38, 44, 50, 51, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 91, 98, 100, 104, 124, 132, 147, 149, 193, 194], [-11, -115, -116, -124, -126, 50, 50, -123, -125, -117, -118, 90, 50, 104, 90, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 124, 50, 90, 50, 50, 50, 50, 50, 50, 50]),
+    'LEFTPAREN': ([7, 13, 14, 15, 16, 20, 22, 33, 34, 35, 38, 44, 50, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 91, 98, 100, 104, 115, 124, 132, 147, 149, 193, 194], [-11, -115, -116, -124, -126, 51, 51, -123, -125, -117, -118, 91, 51, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 51, 51, 91, 51, 91, 51, 51, 51, 51, 51, 51]),
+    'LT': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 81, 81, -11, -10, 81, 81, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'MINUS': ([0, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 94, 100, 101, 103, 104, 105, 106, 107, 108, 109, 110, 112, 115, 116, 117, 118, 120, 124, 126, 129, 130, 131, 132, 137, 138, 139, 140, 141, 142, 144, 145, 146, 152, 153, 154, 155, 156, 168, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [10, 10, -4, 10, 26, -11, 30, -42, 10, -129, -130, -115, -116, -124, -126, -5, 10, 10, 10, -78, 10, -79, 10, 10, 10, 10, 10, 10, 10, 10, 10, -123, -125, -117, -118, -6, -28, 86, -24, -11, 30, -27, -29, -30, -31, -32, 10, -38, 86, -34, -11, 30, -37, -39, -40, -41, 10, -9, 108, -13, 108, -15, 108, -17, 108, -19, 108, 108, 108, 108, -127, -128, 10, 10, -69, -70, -71, -72, -73, -74, 10, 10, 10, 10, 10, 10, 10, 10, -82, 30, 26, -83, 10, -7, 10, 10, 10, 10, 10, 26, 30, -75, 26, -77, -124, 10, 26, -80, 10, 10, 10, -8, 10, 10, 10, 10, -20, -87, 10, -88, 10, 10, 10, 10, -81, 30, 10, -43, 26, -45, -46, -47, 26, -51, -52, -48, -55, 26, -54, -49, -89, -90, -56, 26, -58, -59, -60, 26, -64, -65, -61, -68, 26, -67, -62, -21, -22, -91, -84, -92]),
+    'MULTICOMMENT': ([0, 3, 4, 5, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 23, 24, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 94, 103, 105, 106, 115, 116, 117, 118, 129, 130, 137, 142, 144, 145, 146, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [12, 12, -4, 12, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, 12, 12, -78, -79, 12, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, -38, -33, -34, -11, -10, -37, -39, -40, -41, 12, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -82, -83, -7, 12, -10, -75, -76, -77, -80, 161, -8, -20, -87, 161, -88, -81, 161, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'MULTIPLY': ([6, 8, 13, 14, 15, 16, 33, 34, 35, 38, 41, 44, 53, 56, 63, 65, 67, 69, 71, 72, 73, 74, 75, 76, 100, 101, 112, 115, 117, 120, 126, 168, 173, 177, 182, 196, 200, 205], [27, 31, -115, -116, -124, -126, -123, -125, -117, -118, 87, 31, 87, 31, 109, 109, 109, 109, 109, 109, 109, 109, -127, -128, 31, 27, 27, 31, 27, -124, 27, 31, 27, 27, 27, 27, 27, 27]),
+    'NE': ([13, 14, 15, 16, 33, 34, 35, 38, 40, 41, 43, 44, 52, 53, 55, 56, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76], [-115, -116, -124, -126, -123, -125, -117, -118, 80, 80, -11, -10, 80, 80, -11, -10, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128]),
+    'NUMBER': ([0, 3, 4, 5, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36, 37, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 85, 86, 87, 88, 89, 90, 91, 92, 94, 103, 104, 105, 106, 107, 108, 109, 110, 115, 116, 117, 118, 124, 129, 130, 131, 132, 137, 138, 139, 140, 141, 142, 144, 145, 146, 152, 153, 154, 155, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [15, 15, -4, 15, -11, -10, -42, 15, -129, -130, -115, -116, -124, -126, -5, 15, 15, 15, -78, 15, -79, 15, 15, 15, 15, 15, 15, 15, 15, 15, -123, -125, -117, 75, 76, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, 15, -38, -33, -34, -11, -10, -37, -39, -40, -41, 15, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 15, 15, -69, -70, -71, -72, -73, -74, 15, 15, 15, 15, 15, 120, 15, 15, -82, -83, 15, -7, 15, 15, 15, 15, 15, -10, -75, -76, -77, 15, -80, 15, 15, 15, -8, 15, 15, 15, 15, -20, -87, 15, -88, 15, 15, 15, 15, -81, 15, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'PERIOD': ([94, 103, 123, 129, 142, 143, 148, 156, 170, 190, 192, 209, 213, 215, 217, 220], [-82, -83, 148, -80, 185, 186, 190, -81, 209, 212, 213, 215, 217, 218, 219, -84]),
+    'QMARK': ([7, 8, 13, 14, 15, 16, 33, 34, 35, 38, 40, 43, 44, 49, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 116, 117, 118], [-11, -10, -115, -116, -124, -126, -123, -125, -117, -118, 77, -11, -10, 92, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -75, -76, -77]),
+    'RIGHTBRACE': ([4, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 21, 23, 24, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 94, 103, 105, 106, 115, 116, 117, 118, 129, 137, 142, 144, 146, 156, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [-4, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, -78, -79, 62, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, -38, -33, -34, -11, -10, -37, -39, -40, -41, 105, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -82, -83, -7, 137, -10, -75, -76, -77, -80, -8, -20, -87, -88, -81, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+    'RIGHTBRACKET': ([7, 8, 13, 14, 15, 16, 33, 34, 35, 38, 50, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 93, 94, 95, 96, 97, 98, 100, 101, 102, 103, 105, 119, 120, 124, 129, 130, 131, 132, 133, 134, 136, 137, 142, 144, 146, 150, 156, 157, 158, 159, 160, 161, 162, 163, 164, 165, 166, 167, 168, 169, 187, 188, 189, 191, 194, 210, 211, 214, 216, 220, 221], [-11, -10, -115, -116, -124, -126, -123, -125, -117, -118, 94, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 129, -82, -93, -94, -111, -112, -10, -110, -113, -83, -7, 142, 143, 94, -80, 156, -95, -96, -107, -97, 170, -8, -20, -87, -88, 192, -81, -98, -99, -100, -108, -109, -111, -101, -102, -103, -104, -105, -10, -114, -89, -90, -86, -85, -97, -21, -22, -106, -91, -84, -92]),
+    'RIGHTPAREN': ([7, 8, 13, 14, 15, 16, 33, 34, 35, 38, 51, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 94, 95, 96, 97, 98, 100, 101, 102, 103, 105, 121, 122, 129, 131, 132, 133, 137, 142, 144, 145, 146, 147, 149, 156, 157, 158, 159, 160, 161, 162, 163, 164, 165, 166, 167, 168, 169, 187, 188, 189, 191, 210, 211, 212, 214, 216, 218, 219, 220, 221], [-11, -10, -115, -116, -124, -126, -123, -125, -117, -118, 103, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, -82, -93, -94, -111, -112, -10, -110, -113, -83, -7, 144, 146, -80, -95, -96, -107, -8, -20, -87, 187, -88, 188, -97, -81, -98, -99, -100, -108, -109, -111, -101, -102, -103, -104, -105, -10, -114, -89, -90, -86, -85, -21, -22, 216, -106, -91, 220, 221, -84, -92]),
+    'STRING': ([0, 3, 4, 5, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24, 33, 34, 35, 38, 39, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64, 65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81, 82, 83, 84, 89, 90, 91, 92, 94, 103, 104, 105, 106, 115, 116, 117, 118, 124, 129, 130, 131, 132, 137, 138, 139, 140, 141, 142, 144, 145, 146, 152, 153, 154, 155, 156, 171, 172, 173, 174, 175, 176, 177, 178, 179, 180, 181, 182, 183, 184, 187, 188, 195, 196, 197, 198, 199, 200, 201, 202, 203, 204, 205, 206, 207, 210, 211, 216, 220, 221], [7, 7, -4, 7, -11, -10, -42, -129, -130, -115, -116, -124, -126, -5, 7, 7, 43, -78, 55, -79, 7, -123, -125, -117, -118, -6, -28, -23, -24, -11, -10, -27, -29, -30, -31, -32, 7, -38, -33, -34, -11, -10, -37, -39, -40, -41, 7, -9, -119, -13, -120, -15, -121, -17, -122, -19, -12, -14, -16, -18, -127, -128, 7, 7, -69, -70, -71, -72, -73, -74, 7, 7, 7, 7, -82, -83, 7, -7, 7, -10, -75, -76, -77, 7, -80, 7, 7, 7, -8, 7, 7, 7, 7, -20, -87, 7, -88, 7, 7, 7, 7, -81, 7, -43, -44, -45, -46, -47, -50, -51, -52, -48, -55, -53, -54, -49, -89, -90, -56, -57, -58, -59, -60, -63, -64, -65, -61, -68, -66, -67, -62, -21, -22, -91, -84, -92]),
+}
+GOTO_ITEMS = {
+    'block': ([0, 3, 5, 18, 19, 24, 61, 106], [9, 9, 23, 9, 23, 9, 9, 9]),
+    'booleanexp': ([20, 22], [49, 60]),
+    'empty': ([0], [2]),
+    'exp': ([13, 14], [35, 38]),
+    'float': ([0, 3, 5, 10, 18, 19, 20, 22, 24, 25, 26, 27, 28, 29, 30, 31, 32, 50, 61, 77, 78, 85, 86, 87, 88, 89, 90, 91, 92, 104, 106, 107, 108, 109, 110, 124, 130, 131, 132, 138, 139, 140, 141, 145, 152, 153, 154, 155, 171], [14, 14, 14, 34, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14, 14]),
+    'function': ([20, 50, 77, 91, 92, 104, 124, 130, 138, 139, 140, 145, 152, 153, 154, 171], [48, 96, 114, 96, 128, 96, 96, 158, 175, 179, 183, 158, 198, 202, 206, 158]),
+    'int': ([0, 3, 5, 10, 18, 19, 20, 22, 24, 25, 26, 27, 28, 29, 30, 31, 32, 50, 61, 77, 78, 85, 86, 87, 88, 89, 90, 91, 92, 104, 106, 107, 108, 109, 110, 124, 130, 131, 132, 138, 139, 140, 141, 145, 152, 153, 154, 155, 171], [13, 13, 13, 33, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13, 13]),
+    'list': ([20, 22, 50, 91, 98, 104, 124, 132, 147, 149, 193, 194], [46, 58, 99, 123, 133, 99, 151, 167, 189, 191, 189, 191]),
+    'list_of_lists': ([91, 124], [122, 150]),
+    'listitem': ([50, 91, 104, 124, 130, 145, 171], [95, 95, 95, 95, 157, 157, 157]),
+    'listitems': ([50, 91, 104, 124], [93, 121, 136, 93]),
+    'number': ([0, 3, 5, 18, 19, 20, 22, 24, 25, 26, 27, 28, 29, 30, 31, 32, 50, 61, 77, 78, 85, 86, 87, 88, 89, 90, 91, 92, 104, 106, 107, 108, 109, 110, 124, 130, 131, 132, 138, 139, 140, 141, 145, 152, 153, 154, 155, 171], [6, 6, 6, 6, 6, 41, 53, 6, 63, 65, 67, 69, 71, 72, 73, 74, 101, 6, 112, 117, 63, 65, 67, 69, 6, 6, 101, 126, 101, 6, 63, 65, 67, 69, 101, 101, 6, 6, 173, 177, 182, 6, 101, 196, 200, 205, 6, 101]),
+    'object': ([5, 19, 20, 22, 50, 91, 104, 124, 130, 131, 132, 145, 171], [21, 21, 45, 57, 97, 97, 97, 97, 162, 163, 166, 162, 162]),
+    'objectbrackets': ([20, 22, 50, 91, 104, 124, 130, 145, 171], [47, 59, 102, 102, 102, 102, 102, 102, 102]),
+    'objectitem': ([0, 3, 18, 24, 61, 106], [4, 17, 39, 4, 17, 39]),
+    'objectkey': ([0, 3, 5, 18, 19, 20, 22, 24, 50, 61, 77, 78, 89, 90, 91, 92, 104, 106, 124, 130, 131, 132, 138, 139, 140, 141, 145, 152, 153, 154, 155, 171], [5, 5, 19, 5, 19, 40, 52, 5, 98, 5, 111, 116, 118, 119, 98, 125, 98, 5, 98, 159, 164, 165, 172, 176, 180, 184, 159, 195, 199, 203, 207, 159]),
+    'objectlist': ([0, 24], [3, 61]),
+    'operator': ([40, 41, 52, 53], [78, 89, 78, 89]),
+    'top': ([0], [1]),
+}
+PRODUCTIONS = [
+    ("S' -> top", "S'", 1, None),
+    ('top -> empty', 'top', 1, 'p_top'),
+    ('top -> objectlist', 'top', 1, 'p_top'),
+    ('empty -> <empty>', 'empty', 0, 'p_empty_0'),
+    ('objectlist -> objectitem', 'objectlist', 1, 'p_objectlist_0'),
+    ('objectlist -> objectlist objectitem', 'objectlist', 2, 'p_objectlist_1'),
+    ('objectlist -> objectlist COMMA objectitem', 'objectlist', 3, 'p_objectlist_2'),
+    ('object -> LEFTBRACE objectlist RIGHTBRACE', 'object', 3, 'p_object_0'),
+    ('object -> LEFTBRACE objectlist COMMA RIGHTBRACE', 'object', 4, 'p_object_1'),
+    ('object -> LEFTBRACE RIGHTBRACE', 'object', 2, 'p_object_2'),
+    ('objectkey -> IDENTIFIER', 'objectkey', 1, 'p_objectkey_0'),
+    ('objectkey -> STRING', 'objectkey', 1, 'p_objectkey_0'),
+    ('objectkey -> IDENTIFIER ADD number', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> number ADD IDENTIFIER', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> IDENTIFIER MINUS number', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> number MINUS IDENTIFIER', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> IDENTIFIER MULTIPLY number', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> number MULTIPLY IDENTIFIER', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> IDENTIFIER DIVIDE number', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectkey -> number DIVIDE IDENTIFIER', 'objectkey', 3, 'p_objectkey_1'),
+    ('objectbrackets -> IDENTIFIER LEFTBRACKET objectkey RIGHTBRACKET', 'objectbrackets', 4, 'p_objectbrackets_0'),
+    ('objectbrackets -> IDENTIFIER LEFTBRACKET objectkey RIGHTBRACKET PERIOD IDENTIFIER', 'objectbrackets', 6, 'p_objectbrackets_1'),
+    ('objectbrackets -> IDENTIFIER LEFTBRACKET NUMBER RIGHTBRACKET PERIOD IDENTIFIER', 'objectbrackets', 6, 'p_objectbrackets_1'),
+    ('objectitem -> objectkey EQUAL number', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL BOOL', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL STRING', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL IDENTIFIER', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL object', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL objectkey', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL list', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL objectbrackets', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL function', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey EQUAL booleanexp', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON number', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON BOOL', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON STRING', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON IDENTIFIER', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON object', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON objectkey', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON list', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON objectbrackets', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> objectkey COLON booleanexp', 'objectitem', 3, 'p_objectitem_0'),
+    ('objectitem -> block', 'objectitem', 1, 'p_objectitem_1'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK objectkey COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK objectkey COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK objectkey COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK objectkey COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK number COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK BOOL COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK function COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK number COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK number COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK number COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK BOOL COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK BOOL COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL objectkey QMARK BOOL COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK objectkey COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK objectkey COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK objectkey COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK objectkey COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK number COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK BOOL COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK function COLON objectkey', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK number COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK number COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK number COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK BOOL COLON number', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK BOOL COLON function', 'objectitem', 7, 'p_objectitem_2'),
+    ('objectitem -> objectkey EQUAL booleanexp QMARK BOOL COLON BOOL', 'objectitem', 7, 'p_objectitem_2'),
+    ('operator -> EQ', 'operator', 1, 'p_operator_0'),
+    ('operator -> NE', 'operator', 1, 'p_operator_0'),
+    ('operator -> LT', 'operator', 1, 'p_operator_0'),
+    ('operator -> GT', 'operator', 1, 'p_operator_0'),
+    ('operator -> LE', 'operator', 1, 'p_operator_0'),
+    ('operator -> GE', 'operator', 1, 'p_operator_0'),
+    ('booleanexp -> objectkey operator objectkey', 'booleanexp', 3, 'p_booleanexp_0'),
+    ('booleanexp -> objectkey operator number', 'booleanexp', 3, 'p_booleanexp_0'),
+    ('booleanexp -> number operator objectkey', 'booleanexp', 3, 'p_booleanexp_0'),
+    ('block -> objectkey object', 'block', 2, 'p_block_0'),
+    ('block -> objectkey block', 'block', 2, 'p_block_1'),
+    ('list -> LEFTBRACKET listitems RIGHTBRACKET', 'list', 3, 'p_list_0'),
+    ('list -> LEFTBRACKET listitems COMMA RIGHTBRACKET', 'list', 4, 'p_list_0'),
+    ('list -> LEFTBRACKET RIGHTBRACKET', 'list', 2, 'p_list_1'),
+    ('list -> LEFTPAREN RIGHTPAREN', 'list', 2, 'p_list_1'),
+    ('list -> LEFTPAREN LEFTBRACKET listitems RIGHTBRACKET PERIOD PERIOD PERIOD RIGHTPAREN', 'list', 8, 'p_list_2'),
+    ('list_of_lists -> list COMMA list', 'list_of_lists', 3, 'p_list_of_lists_0'),
+    ('list_of_lists -> list_of_lists COMMA list', 'list_of_lists', 3, 'p_list_of_lists_1'),
+    ('function -> IDENTIFIER LEFTPAREN listitems RIGHTPAREN', 'function', 4, 'p_function_0'),
+    ('function -> IDENTIFIER LEFTPAREN list_of_lists RIGHTPAREN', 'function', 4, 'p_function_0'),
+    ('function -> IDENTIFIER LEFTPAREN listitems COMMA RIGHTPAREN', 'function', 5, 'p_function_1'),
+    ('function -> IDENTIFIER LEFTPAREN list_of_lists COMMA RIGHTPAREN', 'function', 5, 'p_function_1'),
+    ('function -> IDENTIFIER LEFTPAREN list PERIOD PERIOD PERIOD RIGHTPAREN', 'function', 7, 'p_function_2'),
+    ('function -> IDENTIFIER LEFTPAREN LEFTBRACKET list_of_lists RIGHTBRACKET PERIOD PERIOD PERIOD RIGHTPAREN', 'function', 9, 'p_function_3'),
+    ('listitems -> listitem', 'listitems', 1, 'p_listitems_0'),
+    ('listitems -> function', 'listitems', 1, 'p_listitems_0'),
+    ('listitems -> object COMMA', 'listitems', 2, 'p_listitems_0'),
+    ('listitems -> objectkey COMMA', 'listitems', 2, 'p_listitems_0'),
+    ('listitems -> list COMMA', 'listitems', 2, 'p_listitems_0'),
+    ('listitems -> listitems COMMA listitem', 'listitems', 3, 'p_listitems_1'),
+    ('listitems -> listitems COMMA function', 'listitems', 3, 'p_listitems_1'),
+    ('listitems -> listitems COMMA objectkey', 'listitems', 3, 'p_listitems_1'),
+    ('listitems -> object COMMA object', 'listitems', 3, 'p_listitems_2'),
+    ('listitems -> object COMMA objectkey', 'listitems', 3, 'p_listitems_2'),
+    ('listitems -> objectkey COMMA objectkey', 'listitems', 3, 'p_listitems_2'),
+    ('listitems -> objectkey COMMA object', 'listitems', 3, 'p_listitems_2'),
+    ('listitems -> objectkey COMMA list', 'listitems', 3, 'p_listitems_2'),
+    ('listitems -> objectkey COMMA IDENTIFIER ASTERISK_PERIOD IDENTIFIER', 'listitems', 5, 'p_listitems_3'),
+    ('listitems -> objectkey list', 'listitems', 2, 'p_listitems_4'),
+    ('listitems -> listitems COMMA COMMENT', 'listitems', 3, 'p_listitems_5'),
+    ('listitems -> listitems COMMA MULTICOMMENT', 'listitems', 3, 'p_listitems_5'),
+    ('listitem -> number', 'listitem', 1, 'p_listitem_0'),
+    ('listitem -> object', 'listitem', 1, 'p_listitem_0'),
+    ('listitem -> objectkey', 'listitem', 1, 'p_listitem_0'),
+    ('listitem -> objectbrackets', 'listitem', 1, 'p_listitem_0'),
+    ('listitem -> IDENTIFIER ASTERISK_PERIOD IDENTIFIER', 'listitem', 3, 'p_listitem_1'),
+    ('number -> int', 'number', 1, 'p_number_0'),
+    ('number -> float', 'number', 1, 'p_number_1'),
+    ('number -> int exp', 'number', 2, 'p_number_2'),
+    ('number -> float exp', 'number', 2, 'p_number_3'),
+    ('number -> number ADD number', 'number', 3, 'p_number_4'),
+    ('number -> number MINUS number', 'number', 3, 'p_number_5'),
+    ('number -> number MULTIPLY number', 'number', 3, 'p_number_6'),
+    ('number -> number DIVIDE number', 'number', 3, 'p_number_7'),
+    ('int -> MINUS int', 'int', 2, 'p_int_0'),
+    ('int -> NUMBER', 'int', 1, 'p_int_1'),
+    ('float -> MINUS float', 'float', 2, 'p_float_0'),
+    ('float -> FLOAT', 'float', 1, 'p_float_1'),
+    ('exp -> EPLUS NUMBER', 'exp', 2, 'p_exp_0'),
+    ('exp -> EMINUS NUMBER', 'exp', 2, 'p_exp_1'),
+    ('block -> COMMENT', 'block', 1, 'p_comment_0'),
+    ('block -> MULTICOMMENT', 'block', 1, 'p_comment_0'),
+]
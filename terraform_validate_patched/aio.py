@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: aio.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+aio module
+
+Loading and validation for asyncio applications, without blocking the event loop.
+
+Reading and parsing files and evaluating rules runs on an executor, the default
+executor of the loop, a thread or process pool made for the call or one shared by
+the application. How many jobs are in flight at once is bounded by a limit, a
+number or an ``asyncio.Semaphore`` shared by every call that should count against
+the same bound::
+
+    validator = await Validator.aload('infra/')
+    collector = await rule_set.arun(validator)
+
+    limit = asyncio.Semaphore(4)
+    async for validator in load_each(roots, executor=pool, limit=limit):
+        async for result in rule_set.arun(validator, executor=pool, limit=limit):
+            report(validator.root, result)
+
+Validators are loaded and rule results are yielded in the order they complete.
+On a process pool a loaded validator is sent back pickled and the configuration
+a run validates is published in shared memory once, for the workers to attach to.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import asyncio
+import functools
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .runner import PROCESS_EXECUTOR, THREAD_EXECUTOR, evaluate_rule
+from .terraform_validate_patched import Validator
+from .violations import ViolationCollector
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+# Shared configurations a process worker keeps attached, for runs validating different configurations at once.
+ATTACHED_CONFIGS = 8
+_ATTACHED = OrderedDict()
+
+
+def _limiter(limit, default):
+    if isinstance(limit, asyncio.Semaphore):
+        return limit
+    return asyncio.Semaphore(max(1, limit or default))
+
+
+class _Executor(object):
+    """Resolves the executor argument, shutting down a pool made for the call when leaving."""
+
+    def __init__(self, executor, jobs):
+        if executor is not None and not isinstance(executor, Executor) and \
+                executor not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+            raise ValueError('Unknown executor {!r}, expected "thread", "process" or an Executor'.format(executor))
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.owned = executor in (THREAD_EXECUTOR, PROCESS_EXECUTOR)
+        if executor == THREAD_EXECUTOR:
+            executor = ThreadPoolExecutor(max_workers=self.jobs)
+        elif executor == PROCESS_EXECUTOR:
+            executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self.executor = executor
+        self.processes = isinstance(executor, ProcessPoolExecutor)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self.owned:
+            # waiting for the workers to exit blocks, so it is waited for on the default executor
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def call(self, limit, function, *args):
+        async with limit:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+
+async def load(path, executor=None, limit=None, jobs=None, **kwargs):
+    """Loads a validator on an executor.
+
+    Args:
+        path: The directory to load
+        executor: None for the default executor of the loop, 'thread', 'process' or an Executor
+        limit: An asyncio.Semaphore shared with other calls, bounding the loads in flight across them
+        jobs: The workers of a pool made for the call, defaults to the number of CPUs
+        **kwargs: Passed on to the Validator
+
+    Returns:
+        Validator: The loaded validator
+
+    """
+    async with _Executor(executor, jobs) as resolved:
+        return await resolved.call(_limiter(limit, resolved.jobs), functools.partial(Validator, path, **kwargs))
+
+
+async def load_each(paths, executor=None, limit=None, jobs=None, **kwargs):
+    """Loads validators concurrently and yields them as they are loaded, their root tells them apart.
+
+    The arguments are those of ``load``, the number of loads in flight is bounded by
+    the number of workers when no limit is given. Pending loads are cancelled when the
+    iteration is left early or a load fails.
+    """
+    async with _Executor(executor, jobs) as resolved:
+        limiter = _limiter(limit, resolved.jobs)
+        tasks = [asyncio.ensure_future(resolved.call(limiter, functools.partial(Validator, path, **kwargs)))
+                 for path in paths]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            await _cancel(tasks)
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _evaluate_attached(name, settings, rule):
+    validator = _ATTACHED.get(name)
+    if validator is None:
+        from .shared import attach
+        validator = _ATTACHED[name] = attach(name, *settings)
+        while len(_ATTACHED) > ATTACHED_CONFIGS:
+            _ATTACHED.popitem(last=False)
+    _ATTACHED.move_to_end(name)
+    return evaluate_rule(validator, rule)
+
+
+class AsyncRun(object):
+    """The evaluation of rules against a validator on an executor.
+
+    Iterating over it with ``async for`` yields a RuleResult per rule as it completes, awaiting
+    it gives every violation in a ViolationCollector. It runs once per iteration or await.
+
+    Args:
+        rules: The rules to evaluate
+        validator: The loaded validator, it is only read
+        executor: None for the default executor of the loop, 'thread', 'process' or an Executor
+        limit: The most rules in flight at once, a number or an asyncio.Semaphore, the number of workers by default
+        jobs: The workers of a pool made for the run, defaults to the number of CPUs
+        collector: Optional ViolationCollector awaiting appends to
+
+    """
+
+    def __init__(self, rules, validator, executor=None, limit=None, jobs=None, collector=None):
+        self.rules = list(rules)
+        self.validator = validator
+        self.executor = executor
+        self.limit = limit
+        self.jobs = jobs
+        self.collector = collector
+
+    def __aiter__(self):
+        return self._results()
+
+    def __await__(self):
+        return self._collect().__await__()
+
+    async def _collect(self):
+        collector = self.collector if self.collector is not None else ViolationCollector()
+        async for result in self._results():
+            collector.add(result.violations)
+        return collector
+
+    async def _results(self):
+        async with _Executor(self.executor, self.jobs) as resolved:
+            limiter = _limiter(self.limit, resolved.jobs)
+            shared = None
+            if resolved.processes:
+                from .shared import SharedConfig
+                shared = SharedConfig(self.validator)
+                settings = (self.validator.variable_expand, self.validator.raise_error_if_property_missing)
+                tasks = [asyncio.ensure_future(resolved.call(limiter, _evaluate_attached, shared.name, settings, rule))
+                         for rule in self.rules]
+            else:
+                tasks = [asyncio.ensure_future(resolved.call(limiter, evaluate_rule, self.validator, rule))
+                         for rule in self.rules]
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    yield await completed
+            finally:
+                await _cancel(tasks)
+                if shared is not None:
+                    shared.close()
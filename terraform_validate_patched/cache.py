@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: cache.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+cache module
+
+Outcomes of rules against single resources persisted across runs.
+
+Every assertion checks the resources it selected one by one, so the violations a
+rule reports for a resource only depend on the rule, on the resource and on the
+variables its values expand to. An entry is keyed by the hash of the rule
+definition, the fingerprint of the resource, the fingerprint of the variables and
+the library version, and holds the violations found, none when the resource
+passed. A rule is only evaluated against the resources missing from the cache::
+
+    cache = ResultCache.load('.tfv-cache/results.json')
+    collector = RuleRunner(rule_set, cache=cache).run(validator)
+
+The least recently used entries are evicted beyond ``max_entries``.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+
+from ._version import __version__
+from .fingerprints import digest, variables_fingerprint
+from .violations import Violation
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER_BASENAME = '''TerraformValidate'''
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def rule_digest(rule):
+    """The content hash of what a rule checks, its name and description left out."""
+    definition = rule.as_dict()
+    del definition['name'], definition['description']
+    return digest(definition)
+
+
+class CachedRule(object):
+    """What the cache holds for one rule against one configuration.
+
+    Args:
+        cache: The ResultCache looked into
+        rule: The rule
+        keys: The cache key of every resource the rule applies to, keyed by (type, name)
+        violations: The cached violations
+        missing: The (type, name) of the resources the rule still has to be evaluated on
+
+    """
+
+    def __init__(self, cache, rule, keys, violations, missing):
+        self.cache = cache
+        self.rule = rule
+        self.keys = keys
+        self.violations = violations
+        self.missing = missing
+
+    @property
+    def hits(self):
+        return len(self.keys) - len(self.missing)
+
+    @property
+    def complete(self):
+        return not self.missing
+
+    def merge(self, violations):
+        """Stores the outcome of evaluating the missing resources and returns every violation of the rule.
+
+        Args:
+            violations: The violations the rule reported for the missing resources
+
+        """
+        found = {resource: [] for resource in self.missing}
+        for violation in violations:
+            found.setdefault((violation.resource_type, violation.resource_name), []).append(violation)
+        for resource in self.missing:
+            self.cache.put(self.keys[resource], [[violation.template, violation.path, violation.expected,
+                                                  violation.actual] for violation in found[resource]])
+        return self.violations + list(violations)
+
+
+class ResultCache(object):
+    """Violations of rules per resource, keyed by content and kept least recently used first.
+
+    Args:
+        path: The JSON file the cache is saved to, None keeps it in memory only
+        max_entries: How many rule and resource outcomes to keep
+
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    @classmethod
+    def load(cls, path, max_entries=DEFAULT_MAX_ENTRIES):
+        """Loads the cache saved at path, a missing, unreadable or outdated file gives an empty cache."""
+        cache = cls(path, max_entries)
+        try:
+            with open(path) as ifile:
+                data = json.load(ifile)
+        except (IOError, OSError, ValueError):
+            cache._logger.debug('No usable result cache at {}, starting a new one'.format(path))
+            return cache
+        if data.get('version') != CACHE_VERSION or data.get('library') != __version__:
+            cache._logger.debug('Ignoring result cache at {} written by another version'.format(path))
+            return cache
+        for key, records in data.get('entries', []):
+            cache.put(key, records)
+        return cache
+
+    def save(self, path=None):
+        """Writes the cache atomically, so concurrent runs never read a partial file."""
+        path = path or self.path
+        if path is None:
+            raise ValueError('The result cache has no path to save to')
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = OrderedDict([('version', CACHE_VERSION),
+                            ('library', __version__),
+                            ('entries', list(self.entries.items()))])
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.results-')
+        try:
+            with os.fdopen(descriptor, 'w') as ofile:
+                json.dump(data, ofile, separators=(',', ':'), default=str)
+            os.replace(temporary, path)
+        except Exception:
+            os.unlink(temporary)
+            raise
+
+    def clear(self):
+        """Drops every entry, and the saved file when there is one."""
+        self.entries.clear()
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def key(self, rule_key, resource_fingerprint, variables):
+        return digest([CACHE_VERSION, __version__, rule_key, resource_fingerprint, variables])
+
+    def get(self, key):
+        records = self.entries.get(key)
+        if records is not None:
+            self.entries.move_to_end(key)
+        return records
+
+    def put(self, key, records):
+        self.entries[key] = records
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def lookup(self, validator, rule, variables=None):
+        """Splits the resources a rule applies to into the ones the cache holds an outcome for and the others.
+
+        Args:
+            validator: The loaded validator
+            rule: The rule about to be evaluated
+            variables: The variables fingerprint of the configuration, computed when omitted
+
+        Returns:
+            CachedRule: The cached violations and the resources still to evaluate
+
+        """
+        if variables is None:
+            variables = variables_fingerprint(validator.terraform_config)
+        rule_key = rule_digest(rule)
+        resource_types = set(rule.resource_types(validator))
+        keys, violations, missing = {}, [], []
+        for resource, fingerprint in validator.fingerprints().items():
+            if resource[0] not in resource_types:
+                continue
+            key = keys[resource] = self.key(rule_key, fingerprint, variables)
+            records = self.get(key)
+            if records is None:
+                self.misses += 1
+                missing.append(resource)
+                continue
+            self.hits += 1
+            violations.extend(Violation(template, resource[0], resource[1], path, expected, actual, rule=rule.name)
+                              for template, path, expected, actual in records)
+        return CachedRule(self, rule, keys, violations, missing)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: changes.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+changes module
+
+Asks the local git repository which files changed against a base ref, committed,
+staged, unstaged and untracked changes included, and loads the part of a root
+those changes affect.
+
+A file of a root is affected when it changed, when it refers to a variable defined
+in a changed file or when it calls, directly or through other local modules, a
+local module with a changed file. When a changed file was deleted, what it defined
+is unknown and every file of the root is affected. Only the affected files
+are loaded in full. The ``variable`` blocks of the other files are loaded as well,
+so expanding variables gives the same values as a full load, and the files holding
+them are found by scanning their text rather than parsing them. Every resource of
+the scoped validator is defined in an affected file and evaluates exactly as it
+does in a full load.
+
+Given the base ref, the affected files are also loaded as they were at the base and
+the resources whose fingerprint did not change are dropped from the scope, unless a
+variable definition changed.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import logging
+import os
+import re
+import subprocess
+
+from . import hclparser
+from .fingerprints import diff_configs, variables_fingerprint
+from .terraform_validate_patched import LOGGER_BASENAME, Validator
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER = logging.getLogger('{}.changes'.format(LOGGER_BASENAME))
+
+DEFAULT_BASE = 'HEAD'
+# A source attribute pointing at a local path, only module blocks use those, others at worst add a caller.
+LOCAL_SOURCE = re.compile(r'^\s*source\s*=\s*"(\.{1,2}/[^"]*)"', re.MULTILINE)
+VARIABLE_BLOCK = re.compile(r'^\s*variable\s', re.MULTILINE)
+VARIABLE_NAME = re.compile(r'^\s*variable\s+"?([\w-]+)"?', re.MULTILINE)
+VARIABLE_REFERENCE = r'\bvar\.(?:{})\b'
+
+
+class TerraformChangesException(Exception):
+    pass
+
+
+def _git(directory, *arguments):
+    try:
+        output = subprocess.check_output(('git', '-C', directory) + arguments, stderr=subprocess.PIPE)
+    except OSError as error:
+        raise TerraformChangesException('git is not available: {}'.format(error))
+    except subprocess.CalledProcessError as error:
+        raise TerraformChangesException('git {} failed in {}: {}'.format(
+            ' '.join(arguments), directory, error.stderr.decode('utf-8', 'replace').strip()))
+    return output.decode('utf-8')
+
+
+def repository_root(path):
+    """Returns the top level directory of the git work tree holding path."""
+    directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    return os.path.realpath(_git(directory, 'rev-parse', '--show-toplevel').strip())
+
+
+def changed_files(path, base=DEFAULT_BASE):
+    """Lists the files of the repository holding path that differ from base.
+
+    Args:
+        path: A file or directory inside the work tree
+        base: The ref to compare the work tree against
+
+    Returns:
+        set: The real paths of the changed, added, deleted and untracked files
+
+    Raises:
+        TerraformChangesException: If git is missing, path is not in a work tree or base is unknown
+
+    """
+    top = repository_root(path)
+    names = _git(top, 'diff', '--name-only', '-z', '--no-renames', base, '--').split('\0')
+    names += _git(top, 'ls-files', '--others', '--exclude-standard', '-z').split('\0')
+    return {os.path.join(top, name) for name in names if name}
+
+
+def terraform_files(root):
+    """The .tf files of a root, in the order Validator.parse_terraform_directory loads them."""
+    return [os.path.join(directory, ifile)
+            for directory, subdirectories, files in os.walk(root)
+            for ifile in files if ifile.endswith(".tf")]
+
+
+def _read(path):
+    with open(path) as ifile:
+        return ifile.read()
+
+
+def affected_files(root, changed, texts=None):
+    """Lists the files of a root that changed, refer to a variable of a changed file or call a changed module.
+
+    Args:
+        root: The Terraform directory
+        changed: Real paths of the changed files, as returned by ``changed_files``
+        texts: Optional mapping of path to file contents, files missing from it are read
+
+    Returns:
+        list: The affected .tf files, in load order
+
+    """
+    files = terraform_files(root)
+    texts = texts if texts is not None else {}
+    for path in files:
+        if path not in texts:
+            texts[path] = _read(path)
+    real_root = os.path.realpath(root)
+    deleted = [path for path in changed if path.endswith('.tf') and not os.path.exists(path) and
+               os.path.commonpath([real_root, path]) == real_root]
+    if deleted:
+        LOGGER.info('{}: {} was deleted, every file is affected'.format(root, deleted[0]))
+        return list(files)
+    affected = {path for path in files if os.path.realpath(path) in changed}
+    # the resources expanding a variable of a changed file may change with it, wherever they are defined
+    variables = {name for path in affected for name in VARIABLE_NAME.findall(texts[path])}
+    if variables:
+        reference = re.compile(VARIABLE_REFERENCE.format('|'.join(re.escape(name) for name in sorted(variables))))
+        affected |= {path for path in files if reference.search(texts[path])}
+    changed_directories = {os.path.dirname(path) for path in changed if path.endswith('.tf')}
+    calls = {}
+    for path in files:
+        directory = os.path.dirname(os.path.realpath(path))
+        calls[path] = {os.path.realpath(os.path.join(directory, source))
+                       for source in LOCAL_SOURCE.findall(texts[path])}
+    # a caller of an affected module is affected in turn
+    while True:
+        callers = {path for path, modules in calls.items()
+                   if path not in affected and modules & changed_directories}
+        if not callers:
+            break
+        affected |= callers
+        changed_directories |= {os.path.dirname(os.path.realpath(path)) for path in callers}
+    return [path for path in files if path in affected]
+
+
+class ChangedScope(object):
+    """The affected files of a root and the resources they define.
+
+    Args:
+        root: The Terraform directory
+        files: The affected files, in load order
+        resources: The (type, name) of every resource defined in them, or of those that differ from the base
+        diff: The ConfigDiff of the affected files against the base, when one was made
+
+    """
+
+    def __init__(self, root, files, resources, diff=None):
+        self.root = root
+        self.files = files
+        self.resources = resources
+        self.diff = diff
+
+    def __len__(self):
+        return len(self.files)
+
+    def __contains__(self, resource):
+        return resource in self.resources
+
+    def includes(self, violation):
+        """Tells whether a violation is about a resource of the scope."""
+        return (violation.resource_type, violation.resource_name) in self.resources
+
+
+def file_at(path, base):
+    """Returns the contents of a file at the base ref, None when it did not exist there."""
+    top = repository_root(path)
+    name = os.path.relpath(os.path.realpath(path), top).replace(os.sep, '/')
+    try:
+        return _git(top, 'show', '{}:{}'.format(base, name))
+    except TerraformChangesException:
+        return None
+
+
+def _parse_items(path, text):
+    """The top level items of a file, none for a file that does not parse, like the Validator skips it."""
+    try:
+        return hclparser.loads_items(text)
+    except ValueError:
+        LOGGER.debug('Terraform plan {} is empty, skipping'.format(os.path.basename(path)))
+        return []
+
+
+def _load_scope(root, selected, texts):
+    items = []
+    resources = set()
+    for path in terraform_files(root):
+        text = texts.get(path)
+        if text is None:
+            continue
+        if path in selected:
+            file_items = _parse_items(path, text)
+            for resource_type, names in hclparser.merge_items(file_items).get('resource', {}).items():
+                resources.update((resource_type, name) for name in names)
+            items.extend(file_items)
+        elif VARIABLE_BLOCK.search(text):
+            items.extend(item for item in _parse_items(path, text) if item[0] == 'variable')
+    return (hclparser.merge_items(items) if items else {}), resources
+
+
+def load_files(root, files, **kwargs):
+    """Loads some files of a root in full and the variable blocks of the others.
+
+    Args:
+        root: The Terraform directory
+        files: The files to load the resources of
+        **kwargs: Passed on to the Validator
+
+    Returns:
+        tuple: The Validator and the (type, name) of the resources it holds
+
+    """
+    texts = {path: _read(path) for path in terraform_files(root)}
+    config, resources = _load_scope(root, set(files), texts)
+    return Validator(config, **kwargs), resources
+
+
+def load_changed(root, changed, base=None, **kwargs):
+    """Loads the part of a root affected by changed files.
+
+    Args:
+        root: The Terraform directory
+        changed: Real paths of the changed files, as returned by ``changed_files``
+        base: Optional git ref, resources that did not change since it are left out
+        **kwargs: Passed on to the Validator
+
+    Returns:
+        tuple: The Validator holding the affected resources and every variable, and the ChangedScope
+
+    """
+    texts = {}
+    files = affected_files(root, changed, texts)
+    selected = set(files)
+    config, resources = _load_scope(root, selected, texts)
+    validator = Validator(config, **kwargs)
+    scope = ChangedScope(root, files, resources)
+    if base is None or not files:
+        return validator, scope
+    base_texts = dict(texts)
+    base_texts.update((path, file_at(path, base)) for path in files)
+    base_config, _ = _load_scope(root, selected, base_texts)
+    if variables_fingerprint(base_config) != variables_fingerprint(config):
+        LOGGER.info('{}: variables changed against {}, checking every affected resource'.format(root, base))
+        return validator, scope
+    scope.diff = diff_configs(base_config, validator)
+    scope.resources = resources & scope.diff.resources
+    LOGGER.info('{}: {} of {} affected resources differ from {}'.format(root, len(scope.resources),
+                                                                      len(resources), base))
+    return validator.restricted_to(scope.resources), scope
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: cli.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+cli module
+
+The ``terraform-validate`` command::
+
+    terraform-validate run -r rules.yml infra/ modules/network
+    terraform-validate run -r rules.yml --jobs 8 --cache-dir .tfv-cache --format junit -o report.xml infra/
+    terraform-validate run -r rules.yml --changed-only --base origin/main infra/ modules/*
+    terraform-validate cache clear --cache-dir .tfv-cache
+    terraform-validate run -r rules.yml --shard 2/4 --partial shard-2.jsonl infra/ modules/*
+    terraform-validate merge -o report.txt shard-1.jsonl shard-2.jsonl shard-3.jsonl shard-4.jsonl
+    terraform-validate snapshot infra/ -o infra.tfsnap
+    terraform-validate run -r tagging.yml infra.tfsnap
+
+With a cache directory the outcome of every rule against every resource is kept,
+the next runs only evaluate rules against resources that changed since.
+
+The exit status is 0 when every rule passed, 1 when there were violations and 2
+when the rules or the roots could not be loaded.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from contextlib import ExitStack
+from itertools import groupby
+
+from ._version import __version__
+from .cache import DEFAULT_MAX_ENTRIES, ResultCache
+from .changes import DEFAULT_BASE, TerraformChangesException, changed_files, load_changed, load_files, terraform_files
+from .filesystem import READ_WORKERS
+from .history import RuleHistory
+from .rules import RuleSet, TerraformRuleException
+from .runner import PROCESS_EXECUTOR, THREAD_EXECUTOR, RuleRunner
+from .shards import (FILES, ROOTS, RULES, SHARD_BY, PartialResult, PartialSink, Shard, TerraformShardException,
+                     load_timings, merge_partials, parse_shard, save_timings, unit_name)
+from .sinks import SINKS
+from .terraform_validate_patched import (LOGGER_BASENAME, TerraformSnapshotException, TerraformSyntaxException,
+                                         TerraformUnimplementedInterpolationException, TerraformVariableException,
+                                         Validator)
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER = logging.getLogger('{}.cli'.format(LOGGER_BASENAME))
+
+EXIT_PASSED, EXIT_VIOLATIONS, EXIT_ERROR = 0, 1, 2
+HISTORY_FILE = 'rule-history.json'
+RESULTS_FILE = 'results.json'
+PARTIAL_FILE = 'shard-{index}-of-{count}.jsonl'
+
+
+def load_rules(paths):
+    """Combines the rule packs at paths into one RuleSet, rule names have to be unique across the packs."""
+    return RuleSet([rule for path in paths for rule in RuleSet.from_file(path)])
+
+
+def changes_against(roots, rule_packs, base):
+    """Returns the files changed against base, None when a rule pack changed and everything has to run."""
+    changed = set()
+    for root in roots:
+        changed |= changed_files(root, base)
+    if any(os.path.realpath(pack) in changed for pack in rule_packs):
+        LOGGER.info('The rule packs changed, validating every resource')
+        return None
+    return changed
+
+
+def load_root(root, changed, base=None, memory_budget=None, files=None, read_workers=READ_WORKERS):
+    """Loads a whole root, only the resources of some files or the resources the changed files affect that differ
+    from base. A root that is a file is loaded as a snapshot.
+
+    Returns:
+        Validator: The loaded validator, None when the changes or the files hold no resource of the root
+
+    """
+    if os.path.isfile(root):
+        if files is not None or changed is not None:
+            raise TerraformSnapshotException('{} is a snapshot, only whole roots can be validated from one, '
+                                             'not changed or sharded files'.format(root))
+        return Validator.load_snapshot(root, memory_budget=memory_budget)
+    if files is not None:
+        validator, resources = load_files(root, files, memory_budget=memory_budget)
+        return validator if resources else None
+    if changed is None:
+        return Validator(root, memory_budget=memory_budget, read_workers=read_workers)
+    validator, scope = load_changed(root, changed, base, memory_budget=memory_budget)
+    LOGGER.info('{}: {} affected files define {} resources'.format(root, len(scope), len(scope.resources)))
+    return validator if scope.resources else None
+
+
+def shard_argument(text):
+    try:
+        return parse_shard(text)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def select_shard(args, rule_set):
+    """Narrows the rules or the roots down to those of the shard asked for.
+
+    Returns:
+        tuple: The Shard, None when the run is not sharded, the rule set and the roots to run
+
+    """
+    if not args.shard:
+        return None, rule_set, args.roots
+    timings = load_timings(args.shard_timings) if args.shard_timings else None
+    shard = Shard(args.shard[0], args.shard[1], args.shard_by, timings)
+    roots = args.roots
+    if shard.by == RULES:
+        rule_set = RuleSet(shard.select(rule_set, key=lambda rule: rule.name))
+    elif shard.by == ROOTS:
+        roots = shard.select(roots)
+    elif args.changed_only:
+        raise TerraformShardException('--shard-by files cannot be combined with --changed-only')
+    LOGGER.info('Shard {}/{} runs {} rules on {} roots'.format(shard.index, shard.count, len(rule_set), len(roots)))
+    return shard, rule_set, roots
+
+
+def record_timings(partial, root, files, elapsed, results):
+    """Attributes the time a root took to the units of the shard, to files by their size."""
+    if partial.shard.by == ROOTS:
+        partial.record(unit_name(root), elapsed)
+    elif partial.shard.by == RULES:
+        for rule_name, duration in results:
+            partial.record(rule_name, duration)
+    elif files:
+        sizes = [max(1, os.path.getsize(path)) for path in files]
+        for path, size in zip(files, sizes):
+            partial.record(unit_name(path), elapsed * size / sum(sizes))
+
+
+def run(args, stream):
+    for root in args.roots:
+        if not os.path.exists(root):
+            raise TerraformRuleException('{} is neither a directory nor a snapshot'.format(root))
+    shard, rule_set, roots = select_shard(args, load_rules(args.rules))
+    changed = changes_against(roots, args.rules, args.base) if args.changed_only else None
+    history = cache = None
+    if args.cache_dir:
+        history = RuleHistory.load(os.path.join(args.cache_dir, HISTORY_FILE))
+        if not args.no_result_cache:
+            cache = ResultCache.load(os.path.join(args.cache_dir, RESULTS_FILE), args.cache_size)
+    with ExitStack() as stack:
+        sink = stack.enter_context(SINKS[args.format](stream, rule_set))
+        sink.prefix_roots = len(args.roots) > 1
+        sinks, partial = [sink], None
+        if shard is not None:
+            path = args.partial or PARTIAL_FILE.format(index=shard.index, count=shard.count)
+            partial = stack.enter_context(PartialSink(stack.enter_context(open(path, 'w')), shard, len(args.roots),
+                                                      rule_set))
+            sinks.append(partial)
+        for root in roots:
+            start = time.time()
+            files = shard.select(terraform_files(root)) if shard is not None and shard.by == FILES else None
+            validator = load_root(root, changed, args.base, args.memory_budget, files, args.read_workers)
+            results = []
+            if validator is not None:
+                runner = RuleRunner(rule_set, args.jobs, args.executor, history=history, fail_fast=args.fail_fast,
+                                    cache=cache)
+                with ExitStack() as root_stack:
+                    for each in sinks:
+                        root_stack.enter_context(each.root(root))
+                    for result in runner.results(validator):
+                        results.append((result.rule, result.duration))
+                        for each in sinks:
+                            each.add_result(result)
+            if partial is not None:
+                record_timings(partial, root, files, time.time() - start, results)
+            if args.fail_fast and not sink.passed:
+                break
+    return EXIT_PASSED if sink.passed else EXIT_VIOLATIONS
+
+
+def snapshot(args, stream):
+    validator = Validator(args.root, memory_budget=args.memory_budget, read_workers=args.read_workers)
+    validator.save_snapshot(args.output_snapshot)
+    stream.write('Wrote {} resources of {} files to {}\n'.format(
+        sum(len(named) for named in validator.terraform_config.get('resource', {}).values()),
+        len(validator.source_files), args.output_snapshot))
+    return EXIT_PASSED
+
+
+def merge(args, stream):
+    partials = [PartialResult.load(path) for path in args.partials]
+    violations, timings, roots = merge_partials(partials)
+    rule_set = load_rules(args.rules) if args.rules else ()
+    with SINKS[args.format](stream, rule_set) as sink:
+        sink.prefix_roots = roots > 1
+        for root, pairs in groupby(violations, key=lambda pair: pair[0]):
+            with sink.root(root):
+                sink.add(violation for _, violation in pairs)
+    if args.timings:
+        save_timings(args.timings, partials[0].header['by'], timings)
+    return EXIT_PASSED if sink.passed else EXIT_VIOLATIONS
+
+
+def clear_cache(args, stream):
+    cache = ResultCache.load(os.path.join(args.cache_dir, RESULTS_FILE))
+    stream.write('Removed {} cached results from {}\n'.format(len(cache), cache.path))
+    cache.clear()
+    return EXIT_PASSED
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='terraform-validate',
+                                     description='Validates Terraform configurations against rule packs')
+    parser.add_argument('--version', action='version', version='%(prog)s {}'.format(__version__))
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='Log more, repeatable')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    run_parser = commands.add_parser('run', help='Validate roots against rule packs')
+    run_parser.set_defaults(handler=run)
+    run_parser.add_argument('-r', '--rules', action='append', required=True,
+                            help='A rule pack, .yml or .json, repeatable')
+    run_parser.add_argument('roots', nargs='+', metavar='ROOT',
+                            help='A Terraform directory to validate, or a snapshot of one')
+    run_parser.add_argument('-j', '--jobs', type=int, default=1,
+                            help='Rules evaluated in parallel, 0 uses every CPU (default: 1)')
+    run_parser.add_argument('--executor', choices=(THREAD_EXECUTOR, PROCESS_EXECUTOR), default=THREAD_EXECUTOR)
+    run_parser.add_argument('--cache-dir',
+                            help='Keep the rule durations here across runs, the slowest rules are started first, '
+                                 'and the results of rules per resource, unchanged resources are not checked again')
+    run_parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                            help='Rule and resource results kept, the least recently used are evicted '
+                                 '(default: {})'.format(DEFAULT_MAX_ENTRIES))
+    run_parser.add_argument('--no-result-cache', action='store_true',
+                            help='Evaluate every rule against every resource even with --cache-dir')
+    run_parser.add_argument('--fail-fast', action='store_true',
+                            help='Stop at the first failing rule, the rules that failed recently start first')
+    run_parser.add_argument('--changed-only', action='store_true',
+                            help='Only validate the resources of .tf files changed against --base, or of files '
+                                 'calling a changed local module, that differ from --base')
+    run_parser.add_argument('--base', default=DEFAULT_BASE, help='The git ref --changed-only compares to')
+    run_parser.add_argument('--memory-budget', type=int,
+                            help='Bytes loading a root may take, larger roots are parsed file by file')
+    run_parser.add_argument('--read-workers', type=int, default=READ_WORKERS,
+                            help='Threads reading the files of a root ahead of the parser, raise it on network '
+                                 'filesystems (default: {})'.format(READ_WORKERS))
+    run_parser.add_argument('-f', '--format', choices=list(SINKS), default='text',
+                            help='Violations are written as they are found, jsonl has one JSON object per line')
+    run_parser.add_argument('-o', '--output', help='Write the report to this file instead of stdout')
+    run_parser.add_argument('--shard', type=shard_argument, metavar='I/N',
+                            help='Only run the I-th of N parts of the work, numbered from 1')
+    run_parser.add_argument('--shard-by', choices=SHARD_BY, default=ROOTS,
+                            help='Divide the roots, the .tf files or the rules between the shards (default: roots)')
+    run_parser.add_argument('--shard-timings',
+                            help='Balance the shards with the unit timings written by merge --timings')
+    run_parser.add_argument('--partial',
+                            help='The partial result file of the shard (default: {})'.format(
+                                PARTIAL_FILE.format(index='I', count='N')))
+    snapshot_parser = commands.add_parser('snapshot', help='Load a root once and save it for other runs')
+    snapshot_parser.set_defaults(handler=snapshot, output=None)
+    snapshot_parser.add_argument('root', metavar='ROOT', help='The Terraform directory')
+    snapshot_parser.add_argument('-o', '--output', dest='output_snapshot', required=True, help='The snapshot file')
+    snapshot_parser.add_argument('--memory-budget', type=int,
+                                 help='Bytes loading the root may take, larger roots are parsed file by file')
+    snapshot_parser.add_argument('--read-workers', type=int, default=READ_WORKERS,
+                                 help='Threads reading the files of the root ahead of the parser')
+    merge_parser = commands.add_parser('merge', help='Combine the partial results of every shard into one report')
+    merge_parser.set_defaults(handler=merge)
+    merge_parser.add_argument('partials', nargs='+', metavar='PARTIAL', help='A partial result file')
+    merge_parser.add_argument('-r', '--rules', action='append', help='The rule packs, describe the rules in SARIF')
+    merge_parser.add_argument('-f', '--format', choices=list(SINKS), default='text')
+    merge_parser.add_argument('-o', '--output', help='Write the report to this file instead of stdout')
+    merge_parser.add_argument('--timings', help='Write the time every unit took, for --shard-timings')
+    cache_parser = commands.add_parser('cache', help='Manage the result cache')
+    cache_parser.add_argument('action', choices=('clear',), help='clear drops every cached result')
+    cache_parser.add_argument('--cache-dir', required=True, help='The cache directory given to run')
+    cache_parser.set_defaults(handler=clear_cache, output=None)
+    return parser
+
+
+def main(arguments=None):
+    args = build_parser().parse_args(arguments)
+    logging.basicConfig(level=max(logging.DEBUG, logging.WARNING - 10 * args.verbose),
+                        format='%(levelname)s %(name)s: %(message)s')
+    if getattr(args, 'jobs', None) == 0:
+        args.jobs = None
+    try:
+        if args.output:
+            with open(args.output, 'w') as stream:
+                return args.handler(args, stream)
+        return args.handler(args, sys.stdout)
+    except (TerraformRuleException, TerraformChangesException, TerraformShardException, TerraformSnapshotException,
+            TerraformSyntaxException, TerraformUnimplementedInterpolationException, TerraformVariableException,
+            ValueError, IOError, OSError) as error:
+        sys.stderr.write('terraform-validate: {}\n'.format(error))
+        return EXIT_ERROR
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: columns.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+columns module
+
+Columnar view of a property across many resources.
+
+Values are dictionary encoded: every distinct value is substituted, normalized and
+checked once, and the per value outcome is gathered back onto the rows through an
+integer code column. When NumPy is installed the code column is a NumPy array and
+the gather and numeric comparisons run vectorized, otherwise a plain ``array`` is used.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import importlib
+import importlib.util
+from array import array
+
+from .instrumentation import timed
+from .frozen import derived
+from .violations import Violation
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+NUMPY_BACKEND = 'numpy'
+PYTHON_BACKEND = 'python'
+
+# numpy takes longer to import than the rest of the package together, it is only imported when a numpy backed
+# column is built. find_spec tells whether it is installed without importing it.
+try:
+    _NUMPY_SPEC = importlib.util.find_spec('numpy')
+except (ImportError, ValueError):  # pragma: no cover
+    _NUMPY_SPEC = None
+AVAILABLE_BACKENDS = (PYTHON_BACKEND,) if _NUMPY_SPEC is None else (PYTHON_BACKEND, NUMPY_BACKEND)
+
+
+def default_backend():
+    return NUMPY_BACKEND if _NUMPY_SPEC is not None else PYTHON_BACKEND
+
+
+def _numpy():
+    return importlib.import_module('numpy')
+
+
+def _value_key(value):
+    if isinstance(value, (dict, list)):
+        # frozen lists and dicts hash, but would take [1] and [True] for the same category
+        return type(value), derived(value, 'repr', lambda: repr(value))
+    try:
+        hash(value)
+        return type(value), value
+    except TypeError:
+        return type(value), repr(value)
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TerraformPropertyColumns(object):
+    """A property of many resources stored as parallel, dictionary encoded columns.
+
+    Args:
+        validator: The validator the rows were extracted from
+        rows: An iterable of (resource_type, resource_name, property_name, value) tuples
+        normalizer: Callable turning a substituted value into the string compared by the equality assertions
+        backend: 'numpy' or 'python', defaults to numpy when it is installed
+        options: The QueryOptions of the query the rows were extracted by
+
+    """
+
+    def __init__(self, validator, rows, normalizer, backend=None, options=None):
+        backend = backend or default_backend()
+        if backend == NUMPY_BACKEND and _NUMPY_SPEC is None:
+            raise ValueError('The numpy backend was requested but numpy is not installed')
+        if backend not in (NUMPY_BACKEND, PYTHON_BACKEND):
+            raise ValueError('Unknown column backend {!r}'.format(backend))
+        self.validator = validator
+        self.options = options if options is not None else validator.options()
+        self.backend = backend
+        self.resource_types = []
+        self.resource_names = []
+        self.property_names = []
+        self.categories = []
+        positions = {}
+        codes = []
+        for resource_type, resource_name, property_name, value in rows:
+            self.resource_types.append(resource_type)
+            self.resource_names.append(resource_name)
+            self.property_names.append(property_name)
+            key = _value_key(value)
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = len(self.categories)
+                self.categories.append(value)
+            codes.append(position)
+        if backend == NUMPY_BACKEND:
+            numpy = _numpy()
+            self.codes = numpy.array(codes, dtype=numpy.intp)
+        else:
+            self.codes = array('l', codes)
+        self.values = [validator.substitute_variable_values_in_string(value, self.options.variable_expand)
+                       for value in self.categories]
+        self.normalized = [normalizer(value) for value in self.values]
+        self._normalizer = normalizer
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _failing_rows(self, passing_categories):
+        if self.backend == NUMPY_BACKEND:
+            numpy = _numpy()
+            passing = numpy.array(passing_categories, dtype=bool)
+            return numpy.flatnonzero(~passing[self.codes]).tolist()
+        return [row for row, code in enumerate(self.codes) if not passing_categories[code]]
+
+    def _violations(self, template, rows, expected=None, values=None):
+        violations = []
+        for row in rows:
+            name, _, parent_path = self.resource_names[row].partition('.')
+            path = '{0}.{1}'.format(parent_path, self.property_names[row]) if parent_path else self.property_names[row]
+            actual = (values or self.normalized)[self.codes[row]]
+            violations.append(Violation(template, self.resource_types[row], name, path, expected, actual))
+        self.validator.report_violations(violations, self.options.collector)
+
+    @timed('assert')
+    def should_equal(self, expected_value):
+        expected_value = self._normalizer(expected_value)
+        failing = self._failing_rows([value == expected_value for value in self.normalized])
+        self._violations("[{type}.{name}.{path}] should be '{expected}'. Is: '{actual}'", failing, expected_value)
+
+    @timed('assert')
+    def should_not_equal(self, expected_value):
+        expected_value = self._normalizer(expected_value)
+        failing = self._failing_rows([value != expected_value for value in self.normalized])
+        self._violations("[{type}.{name}.{path}] should not be '{expected}'. Is: '{actual}'", failing, expected_value)
+
+    @timed('assert')
+    def should_be_in(self, allowed_values):
+        if type(allowed_values) is not list:
+            allowed_values = [allowed_values]
+        allowed = [self._normalizer(value) for value in allowed_values]
+        failing = self._failing_rows([value in allowed for value in self.normalized])
+        self._violations("[{type}.{name}.{path}] should be one of '{expected}'. Is: '{actual}'", failing, allowed)
+
+    @timed('assert')
+    def should_not_be_in(self, excluded_values):
+        if type(excluded_values) is not list:
+            excluded_values = [excluded_values]
+        excluded = [self._normalizer(value) for value in excluded_values]
+        failing = self._failing_rows([value not in excluded for value in self.normalized])
+        self._violations("[{type}.{name}.{path}] should not be one of '{expected}'. Is: '{actual}'", failing, excluded)
+
+    @timed('assert')
+    def should_match_regex(self, regex):
+        failing = self._failing_rows([self.validator.matches_regex_pattern(value, regex) for value in self.values])
+        self._violations("[{type}.{name}.{path}] should match regex '{expected}'", failing, regex, self.values)
+
+    @timed('assert')
+    def should_be_in_range(self, minimum=None, maximum=None):
+        numbers = [_to_number(value) for value in self.values]
+        if self.backend == NUMPY_BACKEND:
+            numpy = _numpy()
+            column = numpy.array([numpy.nan if number is None else number for number in numbers], dtype=float)
+            passing = ~numpy.isnan(column)
+            if minimum is not None:
+                passing &= column >= minimum
+            if maximum is not None:
+                passing &= column <= maximum
+            passing = passing.tolist()
+        else:
+            passing = [number is not None and
+                       (minimum is None or number >= minimum) and
+                       (maximum is None or number <= maximum) for number in numbers]
+        if minimum is not None and maximum is not None:
+            template = "[{type}.{name}.{path}] should be between '{expected[0]}' and '{expected[1]}'. Is: '{actual}'"
+        elif minimum is not None:
+            template = "[{type}.{name}.{path}] should be at least '{expected[0]}'. Is: '{actual}'"
+        else:
+            template = "[{type}.{name}.{path}] should be at most '{expected[1]}'. Is: '{actual}'"
+        self._violations(template, self._failing_rows(passing), (minimum, maximum), self.values)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: daemon.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+daemon module
+
+A long running process keeping loaded Terraform roots in memory and answering
+validation requests over a Unix domain socket, so pre-commit hooks and editors do
+not pay for starting Python and parsing the repository on every check.
+
+Before answering a request for a root the daemon compares the modification time,
+size and inode of its .tf files to the last load and only parses the files that
+changed, the top level items of the unchanged files are reused for the merge.
+
+The protocol is one JSON object per line in each direction. A request names a
+``command`` and its arguments, the response holds ``ok`` and either the result or
+an ``error``::
+
+    {"command": "validate", "root": "/repo/infra", "rules": "/repo/rules.yml"}
+    {"ok": true, "root": "/repo/infra", "passed": false, "violations": [...], "refreshed": 1, ...}
+
+Serve and query it with::
+
+    python -m terraform_validate_patched.daemon serve --root infra
+    python -m terraform_validate_patched.daemon validate --rules rules.yml infra
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from . import hclparser
+from ._version import __version__
+from .rules import RuleSet, TerraformRuleException
+from .runner import RuleRunner
+from .terraform_validate_patched import (TerraformSyntaxException, TerraformUnimplementedInterpolationException,
+                                         TerraformVariableException, Validator)
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER_BASENAME = '''TerraformValidate'''
+
+SOCKET_ENVIRONMENT_VARIABLE = 'TERRAFORM_VALIDATE_SOCKET'
+CLIENT_TIMEOUT = 300
+
+
+class TerraformDaemonException(Exception):
+    pass
+
+
+def default_socket_path():
+    """The socket named by TERRAFORM_VALIDATE_SOCKET, or a per user socket in the temporary directory."""
+    path = os.environ.get(SOCKET_ENVIRONMENT_VARIABLE)
+    if path:
+        return path
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'default')
+    return os.path.join(tempfile.gettempdir(), 'terraform-validate-{}.sock'.format(user))
+
+
+def _file_signature(stat):
+    return stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size, stat.st_ino
+
+
+class ResidentRoot(object):
+    """A Terraform root kept loaded and refreshed from the files that changed since the last load.
+
+    Args:
+        path: The directory to load
+
+    """
+
+    def __init__(self, path):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        self.path = path
+        self.validator = None
+        self.loaded = None
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _list_files(self):
+        # Same order as Validator.parse_terraform_directory, the merge of the items depends on it.
+        return [os.path.join(directory, ifile)
+                for directory, subdirectories, files in os.walk(self.path)
+                for ifile in files if ifile.endswith(".tf")]
+
+    def refresh(self):
+        """Parses the files added or changed since the last refresh.
+
+        Returns:
+            int: The number of files parsed, removed files count as well
+
+        Files that do not parse, like empty ones, are skipped the way the Validator skips
+        them, their stat is kept so they are not parsed again until they change.
+        """
+        with self._lock:
+            files = OrderedDict()
+            changed = 0
+            for file_path in self._list_files():
+                try:
+                    signature = _file_signature(os.stat(file_path))
+                except OSError:
+                    continue
+                known = self._files.get(file_path)
+                if known is not None and known[0] == signature:
+                    files[file_path] = known
+                    continue
+                with open(file_path) as fp:
+                    try:
+                        items = hclparser.loads_items(fp.read())
+                    except ValueError:
+                        self._logger.debug('Terraform plan {} is empty, skipping'.format(os.path.basename(file_path)))
+                        items = []
+                files[file_path] = (signature, items)
+                changed += 1
+            changed += len(set(self._files) - set(files))
+            if changed or self.validator is None:
+                items = [item for _, file_items in files.values() for item in file_items]
+                self.validator = Validator(hclparser.merge_items(items))
+                self._files = files
+                self.loaded = time.time()
+                self._logger.debug('Refreshed {}, {} files parsed'.format(self.path, changed))
+            return changed
+
+    @property
+    def files(self):
+        return len(self._files)
+
+
+class RuleSetCache(object):
+    """Rule packs loaded from disk, reloaded when their file changes."""
+
+    def __init__(self):
+        self._rule_sets = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        signature = _file_signature(os.stat(path))
+        with self._lock:
+            cached = self._rule_sets.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        rule_set = RuleSet.from_file(path)
+        with self._lock:
+            self._rule_sets[path] = (signature, rule_set)
+        return rule_set
+
+
+class ValidationService(object):
+    """Answers protocol requests against the resident roots, independently of the transport.
+
+    Args:
+        jobs: Default number of workers rules run on
+
+    """
+
+    commands = ('ping', 'load', 'refresh', 'validate', 'stats', 'shutdown')
+
+    def __init__(self, jobs=1):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        self.jobs = jobs
+        self.roots = OrderedDict()
+        self.rule_sets = RuleSetCache()
+        self.started = time.time()
+        self.requests = 0
+        self.server = None
+        self._lock = threading.Lock()
+
+    def root(self, path):
+        """Returns the resident root of a directory, loading it on first use."""
+        if not path:
+            raise TerraformDaemonException('A "root" is required')
+        path = os.path.realpath(path)
+        if not os.path.isdir(path):
+            raise TerraformDaemonException('{} is not a directory'.format(path))
+        with self._lock:
+            resident = self.roots.get(path)
+            if resident is None:
+                resident = self.roots[path] = ResidentRoot(path)
+        return resident
+
+    def handle(self, request):
+        """Executes a request.
+
+        Args:
+            request: The decoded request object
+
+        Returns:
+            OrderedDict: The response, 'ok' is false and 'error' holds the reason when the request failed
+
+        """
+        self.requests += 1
+        command = request.get('command') if isinstance(request, dict) else None
+        if command not in self.commands:
+            return OrderedDict([('ok', False), ('error', 'Unknown command {!r}'.format(command))])
+        try:
+            response = getattr(self, 'command_{}'.format(command))(request)
+        except (TerraformDaemonException, TerraformRuleException, TerraformSyntaxException,
+                TerraformVariableException, TerraformUnimplementedInterpolationException,
+                ValueError, IOError, OSError) as error:
+            return OrderedDict([('ok', False), ('error', str(error))])
+        except Exception as error:
+            # anything else a rule pack or a root can raise, like a YAML error, fails the request, not the daemon
+            self._logger.exception('The %s request failed', command)
+            return OrderedDict([('ok', False), ('error', '{}: {}'.format(error.__class__.__name__, error))])
+        response['ok'] = True
+        response.move_to_end('ok', last=False)
+        return response
+
+    def command_ping(self, request):
+        return OrderedDict([('version', __version__), ('pid', os.getpid())])
+
+    def command_load(self, request):
+        return self.command_refresh(request)
+
+    def command_refresh(self, request):
+        start = time.perf_counter()
+        resident = self.root(request.get('root'))
+        refreshed = resident.refresh()
+        return OrderedDict([('root', resident.path),
+                            ('files', resident.files),
+                            ('refreshed', refreshed),
+                            ('duration', time.perf_counter() - start)])
+
+    def command_validate(self, request):
+        start = time.perf_counter()
+        if not request.get('rules'):
+            raise TerraformDaemonException('A "rules" pack is required')
+        resident = self.root(request.get('root'))
+        refreshed = resident.refresh()
+        rule_set = self.rule_sets.get(os.path.realpath(request['rules']))
+        runner = RuleRunner(rule_set, jobs=request.get('jobs') or self.jobs, fail_fast=bool(request.get('fail_fast')))
+        violations = runner.run(resident.validator).violations
+        return OrderedDict([('root', resident.path),
+                            ('passed', not violations),
+                            ('violations', [violation.as_dict() for violation in violations]),
+                            ('files', resident.files),
+                            ('refreshed', refreshed),
+                            ('duration', time.perf_counter() - start)])
+
+    def command_stats(self, request):
+        roots = OrderedDict((path, OrderedDict([('files', resident.files), ('loaded', resident.loaded)]))
+                            for path, resident in list(self.roots.items()))
+        return OrderedDict([('roots', roots),
+                            ('requests', self.requests),
+                            ('uptime', time.time() - self.started)])
+
+    def command_shutdown(self, request):
+        if self.server is not None:
+            # shutdown() waits for serve_forever to return, which cannot happen inside this request.
+            threading.Thread(target=self.server.shutdown).start()
+        return OrderedDict()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except ValueError as error:
+                response = OrderedDict([('ok', False), ('error', 'Invalid request: {}'.format(error))])
+            else:
+                response = self.server.service.handle(request)
+            self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class ValidationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves a ValidationService on a Unix domain socket, one thread per connection.
+
+    Args:
+        path: The socket path, a stale socket left by a dead daemon is replaced
+        service: The ValidationService answering the requests
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, service):
+        if os.path.exists(path):
+            if _is_listening(path):
+                raise TerraformDaemonException('A daemon is already listening on {}'.format(path))
+            os.unlink(path)
+        self.service = service
+        service.server = self
+        socketserver.UnixStreamServer.__init__(self, path, _RequestHandler)
+        os.chmod(path, 0o600)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def _is_listening(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (IOError, OSError):
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+class DaemonClient(object):
+    """A connection to a running daemon.
+
+    Args:
+        path: The socket path, defaults to ``default_socket_path()``
+        timeout: Seconds to wait for a response
+
+    """
+
+    def __init__(self, path=None, timeout=CLIENT_TIMEOUT):
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self._socket = None
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def connect(self):
+        if self._socket is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.path)
+            except (IOError, OSError) as error:
+                connection.close()
+                raise TerraformDaemonException('No daemon listening on {}: {}'.format(self.path, error))
+            self._socket, self._file = connection, connection.makefile('rb')
+        return self
+
+    def close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def request(self, command, **arguments):
+        """Sends a request and returns the response.
+
+        Raises:
+            TerraformDaemonException: If the daemon cannot be reached or the request failed
+
+        """
+        self.connect()
+        arguments['command'] = command
+        self._socket.sendall(json.dumps(arguments).encode('utf-8') + b'\n')
+        line = self._file.readline()
+        if not line:
+            self.close()
+            raise TerraformDaemonException('The daemon on {} closed the connection'.format(self.path))
+        response = json.loads(line.decode('utf-8'), object_pairs_hook=OrderedDict)
+        if not response.get('ok'):
+            raise TerraformDaemonException(response.get('error'))
+        return response
+
+    def ping(self):
+        return self.request('ping')
+
+    def validate(self, root, rules, jobs=None, fail_fast=False):
+        return self.request('validate', root=os.path.abspath(root), rules=os.path.abspath(rules), jobs=jobs,
+                            fail_fast=fail_fast)
+
+    def refresh(self, root):
+        return self.request('refresh', root=os.path.abspath(root))
+
+    def stats(self):
+        return self.request('stats')
+
+    def shutdown(self):
+        return self.request('shutdown')
+
+
+def serve(path=None, roots=(), jobs=1):
+    """Loads the roots and serves requests until a shutdown request or an interrupt."""
+    path = path or default_socket_path()
+    service = ValidationService(jobs)
+    for root in roots:
+        service.root(root).refresh()
+    server = ValidationServer(path, service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m terraform_validate_patched.daemon',
+                                     description='Keeps Terraform roots loaded and validates them on request')
+    parser.add_argument('--socket', help='The socket path, defaults to ${} or a per user socket'.format(
+        SOCKET_ENVIRONMENT_VARIABLE))
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    serve_parser = commands.add_parser('serve', help='Run the daemon in the foreground')
+    serve_parser.add_argument('--root', action='append', default=[], help='Load this root on start, repeatable')
+    serve_parser.add_argument('--jobs', type=int, default=1)
+    validate_parser = commands.add_parser('validate', help='Validate a root with a rule pack')
+    validate_parser.add_argument('--rules', required=True, help='The rule pack, .yml or .json')
+    validate_parser.add_argument('--jobs', type=int)
+    validate_parser.add_argument('--fail-fast', action='store_true')
+    validate_parser.add_argument('root')
+    for command in ('ping', 'stats', 'shutdown'):
+        commands.add_parser(command)
+    args = parser.parse_args(arguments)
+
+    if args.command == 'serve':
+        logging.basicConfig(level=logging.INFO)
+        serve(args.socket, args.root, args.jobs)
+        return 0
+    try:
+        with DaemonClient(args.socket) as client:
+            if args.command == 'validate':
+                response = client.validate(args.root, args.rules, args.jobs, args.fail_fast)
+                for violation in sorted(violation['message'] for violation in response['violations']):
+                    print(violation)
+                return 0 if response['passed'] else 1
+            print(json.dumps(client.request(args.command), indent=2))
+            return 0
+    except TerraformDaemonException as error:
+        sys.stderr.write('{}\n'.format(error))
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
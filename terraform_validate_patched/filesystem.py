@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: filesystem.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+filesystem module
+
+Finds and reads the files of a root ahead of the parser.
+
+On a network filesystem every directory listing and every open waits a round trip,
+reading the files of a root one by one spends most of the load waiting. A
+PrefetchReader lists directories with ``os.scandir``, which returns the entries of
+a directory with their type in one call, and lists the subdirectories found
+concurrently. The files are then read on a bounded thread pool, at most ``depth``
+files ahead of the consumer, which gets them in walk order while the next ones are
+read::
+
+    with PrefetchReader(workers=8) as reader:
+        for path, text, stat in reader.read(reader.walk('infra/')):
+            parse(text)
+
+The filesystem is pluggable, LatencyFilesystem makes the local one behave like a
+slow network share for tests and benchmarks.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+READ_WORKERS = 8
+# Files read ahead of the consumer per worker, bounding the contents held in memory at once.
+PREFETCH_PER_WORKER = 2
+TERRAFORM_SUFFIX = '.tf'
+
+
+class LocalFilesystem(object):
+    """The files of the machine, through the os module."""
+
+    def scandir(self, path):
+        return os.scandir(path)
+
+    def read(self, path):
+        """Returns the text of a file and its stat, taken from the open file."""
+        with open(path) as ifile:
+            return ifile.read(), os.fstat(ifile.fileno())
+
+
+class LatencyFilesystem(LocalFilesystem):
+    """The local filesystem with every directory listing and every read waiting first, like a network share.
+
+    Args:
+        latency: The seconds every call waits
+        filesystem: The filesystem waited in front of, the local one by default
+
+    """
+
+    def __init__(self, latency=0.005, filesystem=None):
+        self.latency = latency
+        self.filesystem = filesystem or LocalFilesystem()
+        self.calls = 0
+        self.peak = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'latency': self.latency, 'filesystem': self.filesystem}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _wait(self):
+        with self._lock:
+            self.calls += 1
+            self._active += 1
+            self.peak = max(self.peak, self._active)
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def scandir(self, path):
+        self._wait()
+        return self.filesystem.scandir(path)
+
+    def read(self, path):
+        self._wait()
+        return self.filesystem.read(path)
+
+
+class _InlineExecutor(object):
+    """Runs every call right away, in place of a pool of one worker."""
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class PrefetchReader(object):
+    """Lists and reads files on a bounded thread pool.
+
+    Args:
+        filesystem: The filesystem read, the local one by default
+        workers: The threads reading at once, 1 or less reads in the calling thread
+        depth: How many files are read ahead of the consumer at most, PREFETCH_PER_WORKER per worker by default
+
+    """
+
+    def __init__(self, filesystem=None, workers=READ_WORKERS, depth=None):
+        self.filesystem = filesystem or LocalFilesystem()
+        self.workers = max(1, workers or 1)
+        self.depth = max(1, depth or self.workers * PREFETCH_PER_WORKER)
+        self.entries = {}
+        if self.workers == 1:
+            self._pool = _InlineExecutor()
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='terraform-read')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def _list(self, directory):
+        try:
+            with self.filesystem.scandir(directory) as listing:
+                entries = list(listing)
+        except OSError:
+            # unreadable directories are skipped, like os.walk does
+            return [], []
+        files, subdirectories = [], []
+        for entry in entries:
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                is_directory = False
+            if not is_directory:
+                if entry.name.endswith(TERRAFORM_SUFFIX):
+                    files.append(entry)
+            elif not entry.is_symlink():
+                subdirectories.append(entry.path)
+        return files, subdirectories
+
+    def walk(self, root):
+        """Lists the .tf files under root in the order of os.walk, the subdirectories found are listed concurrently.
+
+        Returns:
+            list: The paths of the files, their scandir entries are kept in ``entries``
+        """
+        pending = {root: self._pool.submit(self._list, root)}
+        stack, paths = [root], []
+        while stack:
+            files, subdirectories = pending.pop(stack.pop()).result()
+            for subdirectory in subdirectories:
+                pending[subdirectory] = self._pool.submit(self._list, subdirectory)
+            for entry in files:
+                self.entries[entry.path] = entry
+                paths.append(entry.path)
+            stack.extend(reversed(subdirectories))
+        return paths
+
+    def size(self, path):
+        """The size of a file, from its scandir entry when walked, the entry caches what it stats."""
+        entry = self.entries.get(path)
+        return entry.stat().st_size if entry is not None else os.path.getsize(path)
+
+    def read(self, paths):
+        """Yields the (path, text, stat) of every file in order, reading up to ``depth`` files ahead.
+
+        Reads not consumed yet are cancelled when the generator is closed early.
+        """
+        paths = iter(paths)
+        queue = deque()
+        try:
+            for path in paths:
+                queue.append((path, self._pool.submit(self.filesystem.read, path)))
+                if len(queue) >= self.depth:
+                    break
+            while queue:
+                path, future = queue.popleft()
+                for following in paths:
+                    queue.append((following, self._pool.submit(self.filesystem.read, following)))
+                    break
+                text, stat = future.result()
+                yield path, text, stat
+        finally:
+            for _, future in queue:
+                future.cancel()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: fingerprints.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+fingerprints module
+
+Stable content hashes of resources and the structural diff of two configurations.
+
+The fingerprint of a resource hashes its type, its name and its configuration
+rendered as canonical JSON, with sorted keys and no insignificant whitespace, so it
+does not depend on formatting, attribute order or the file the resource is in. Two
+configurations are diffed by comparing the fingerprints of their resources::
+
+    diff = diff_configs(base_validator, head_validator)
+    rule_set.run(head_validator.restricted_to(diff.resources))
+
+Resource fingerprints do not cover the variables a resource refers to, compare
+``variables_fingerprint`` as well before skipping resources whose values are
+expanded.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+from .frozen import derived
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+DIGEST_SIZE = 16
+
+
+def canonical(value):
+    """Renders a parsed value as canonical JSON."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def digest(value):
+    return hashlib.blake2b(canonical(value).encode('utf-8'), digest_size=DIGEST_SIZE).hexdigest()
+
+
+def fingerprint(resource_type, name, config):
+    """The content hash of one resource, cached on a frozen config and shared by every tree holding it."""
+    return derived(config, ('fingerprint', resource_type, name), lambda: digest([resource_type, name, config]))
+
+
+def resource_fingerprints(terraform_config):
+    """Returns the fingerprint of every resource of a parsed configuration, keyed by (type, name)."""
+    fingerprints = OrderedDict()
+    for resource_type, resources in terraform_config.get('resource', {}).items():
+        for name, config in resources.items():
+            fingerprints[(resource_type, name)] = fingerprint(resource_type, name, config)
+    return fingerprints
+
+
+def variables_fingerprint(terraform_config):
+    """The content hash of the variable definitions of a parsed configuration."""
+    variables = terraform_config.get('variable', {})
+    return derived(variables, 'fingerprint', lambda: digest(variables))
+
+
+class ConfigDiff(object):
+    """The resources added, changed, removed and left unchanged between two configurations.
+
+    Every attribute is a sorted list of (type, name) tuples.
+    """
+
+    def __init__(self, added, changed, removed, unchanged):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    __nonzero__ = __bool__
+
+    @property
+    def resources(self):
+        """The resources of the head configuration that are new or differ from the base."""
+        return set(self.added) | set(self.changed)
+
+    def as_dict(self):
+        return OrderedDict((kind, ['{}.{}'.format(*resource) for resource in getattr(self, kind)])
+                           for kind in ('added', 'changed', 'removed', 'unchanged'))
+
+
+def diff_fingerprints(base, head):
+    """Diffs two mappings of (type, name) to fingerprint."""
+    common = [resource for resource in head if resource in base]
+    return ConfigDiff(added=sorted(resource for resource in head if resource not in base),
+                      changed=sorted(resource for resource in common if head[resource] != base[resource]),
+                      removed=sorted(resource for resource in base if resource not in head),
+                      unchanged=sorted(resource for resource in common if head[resource] == base[resource]))
+
+
+def diff_configs(base, head):
+    """Diffs the resources of two configurations.
+
+    Args:
+        base: A Validator or a parsed configuration
+        head: A Validator or a parsed configuration
+
+    Returns:
+        ConfigDiff: What changed from base to head
+
+    """
+    return diff_fingerprints(*[config.fingerprints() if hasattr(config, 'fingerprints') else
+                               resource_fingerprints(config) for config in (base, head)])
@@ -0,0 +1,21 @@
+variable "size" {
+  default = "t2.micro"
+}
+
+resource "aws_instance" "foo" {
+  instance_type = "${var.size}"
+  volume_size   = 8
+  monitoring    = "true"
+}
+
+resource "aws_instance" "bar" {
+  instance_type = "t2.micro"
+  volume_size   = 100
+  monitoring    = true
+}
+
+resource "aws_instance" "baz" {
+  instance_type = "m4.large"
+  volume_size   = "big"
+  monitoring    = false
+}
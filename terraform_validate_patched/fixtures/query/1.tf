@@ -0,0 +1,23 @@
+resource "aws_instance" "foo" {
+  instance_type = "t2.micro"
+  ebs_block_device {
+    device_name = "/dev/sdg"
+    encrypted   = true
+  }
+  ebs_block_device {
+    device_name = "/dev/sdh"
+    encrypted   = false
+  }
+}
+
+resource "aws_instance" "bar" {
+  instance_type = "t2.large"
+  ebs_block_device {
+    device_name = "/dev/sdg"
+    encrypted   = true
+  }
+}
+
+resource "aws_ebs_volume" "baz" {
+  encrypted = true
+}
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: frozen.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+frozen module
+
+The immutable tree a loaded configuration is held in.
+
+Every dict of a parsed configuration becomes a FrozenDict and every list a
+FrozenList. They read like the dicts and lists they replace, but refuse to be
+changed and are hashable, so whatever is derived from a node stays valid as long
+as the node is referenced and is cached on the node itself::
+
+    node.derived('fingerprint', lambda: digest(node))
+
+A changed configuration is a new tree. ``set_in`` and ``delete_in`` copy the nodes
+on the path to the change and share every other node with the original, together
+with what was cached on them::
+
+    changed = validator.terraform_config.set_in(('resource', 'aws_instance', 'web', 'ami'), 'ami-2')
+    validator.terraform_config = changed
+
+``thaw`` turns a tree back into plain dicts and lists.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+
+class _FrozenNode(object):
+    """What FrozenDict and FrozenList share, the subclasses hold the _hash and _derived slots."""
+
+    __slots__ = ()
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError('{} is frozen, change a copy made with set_in or delete_in, '
+                        'or a mutable one made with thaw'.format(self.__class__.__name__))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def derived(self, key, compute):
+        """Returns what compute returns, computed once per node and key.
+
+        Args:
+            key: Names what is derived, hashable
+            compute: Called without arguments on the first lookup of key
+
+        """
+        try:
+            cache = self._derived
+        except AttributeError:
+            cache = self._derived = {}
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = compute()
+            return value
+
+    def set_in(self, path, value):
+        """Returns a copy of the tree with the value at path replaced, or added to a dict.
+
+        Args:
+            path: The keys and list indexes leading to the value
+            value: The new value, frozen on the way in
+
+        """
+        path = list(path)
+        if not path:
+            raise ValueError('An empty path does not lead to a value')
+        if len(path) == 1:
+            return self.set(path[0], value)
+        return self.set(path[0], self[path[0]].set_in(path[1:], value))
+
+    def delete_in(self, path):
+        """Returns a copy of the tree without the value at path."""
+        path = list(path)
+        if not path:
+            raise ValueError('An empty path does not lead to a value')
+        if len(path) == 1:
+            return self.without(path[0])
+        return self.set(path[0], self[path[0]].delete_in(path[1:]))
+
+
+class FrozenDict(_FrozenNode, dict):
+    """A dict that cannot be changed, hashable when its values are."""
+
+    __slots__ = ('_hash', '_derived')
+
+    __setitem__ = __delitem__ = __ior__ = _FrozenNode._frozen
+    clear = pop = popitem = setdefault = update = _FrozenNode._frozen
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def set(self, key, value):
+        """Returns a copy with key set to value, sharing every other value."""
+        changed = dict(self)
+        changed[key] = freeze(value)
+        return FrozenDict(changed)
+
+    def without(self, key):
+        """Returns a copy without key, which has to be there."""
+        if key not in self:
+            raise KeyError(key)
+        return FrozenDict((name, value) for name, value in self.items() if name != key)
+
+
+class FrozenList(_FrozenNode, list):
+    """A list that cannot be changed, hashable when its items are."""
+
+    __slots__ = ('_hash', '_derived')
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _FrozenNode._frozen
+    append = extend = insert = pop = remove = clear = sort = reverse = _FrozenNode._frozen
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(self))
+            return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def set(self, index, value):
+        """Returns a copy with the item at index replaced, sharing every other item."""
+        changed = list(self)
+        changed[index] = freeze(value)
+        return FrozenList(changed)
+
+    def without(self, index):
+        """Returns a copy without the item at index."""
+        changed = list(self)
+        del changed[index]
+        return FrozenList(changed)
+
+
+def freeze(value):
+    """Returns value with its dicts and lists turned into FrozenDicts and FrozenLists.
+
+    Frozen nodes are returned as they are, so freezing a tree made of already frozen
+    subtrees only copies what is new. Mappings that are not dicts are left alone.
+    """
+    if isinstance(value, _FrozenNode):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList([freeze(item) for item in value])
+    return value
+
+
+def thaw(value):
+    """Returns a mutable copy of a tree, made of plain dicts and lists."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def derived(node, key, compute):
+    """Caches what compute returns on node when it is frozen, a plain value is computed every time."""
+    if isinstance(node, _FrozenNode):
+        return node.derived(key, compute)
+    return compute()
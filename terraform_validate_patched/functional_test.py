@@ -412,3 +412,691 @@ class TestValidatorFunctional(unittest.TestCase):
 
         with self.assertRaisesRegexp(AssertionError, expected_error):
             tagged_buckets.property("policy").should_contain_valid_json()
+
+    def test_query(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        results = validator.query("resource.aws_instance.*.ebs_block_device[*].encrypted")
+        self.assertEqual(sorted((t.format_path(path), value) for path, value in results), [
+            ("resource.aws_instance.bar.ebs_block_device[0].encrypted", True),
+            ("resource.aws_instance.foo.ebs_block_device[0].encrypted", True),
+            ("resource.aws_instance.foo.ebs_block_device[1].encrypted", False)
+        ])
+        results = validator.query("resource./aws_.*_volume/.*.encrypted")
+        self.assertEqual(results, [(("resource", "aws_ebs_volume", "baz", "encrypted"), True)])
+        results = validator.query("resource.aws_instance.foo.ebs_block_device[-1].device_name")
+        self.assertEqual(results, [(("resource", "aws_instance", "foo", "ebs_block_device", 1, "device_name"), "/dev/sdh")])
+        self.assertEqual(validator.query("resource.aws_instance.*.missing"), [])
+
+    def test_columns(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/columns"))
+        validator.enable_variable_expansion()
+        for backend in t.columns.AVAILABLE_BACKENDS:
+            columns = validator.resources("aws_instance").columns("instance_type", backend=backend)
+            self.assertEqual(len(columns), 3)
+            columns.should_be_in(["t2.micro", "m4.large"])
+            expected_error = self.error_list_format("[aws_instance.baz.instance_type] should be one of "
+                                                    "'['t2.micro']'. Is: 'm4.large'")
+            with self.assertRaisesRegexp(AssertionError, expected_error):
+                columns.should_be_in("t2.micro")
+            expected_error = self.error_list_format([
+                "[aws_instance.bar.instance_type] should be 'm4.large'. Is: 't2.micro'",
+                "[aws_instance.foo.instance_type] should be 'm4.large'. Is: 't2.micro'"
+            ])
+            with self.assertRaisesRegexp(AssertionError, expected_error):
+                columns.should_equal("m4.large")
+            columns.should_match_regex("(t2|m4)\\..*")
+
+            monitoring = validator.resources("aws_instance").property("monitoring").columns(backend=backend)
+            expected_error = self.error_list_format("[aws_instance.baz.monitoring] should be 'True'. Is: 'False'")
+            with self.assertRaisesRegexp(AssertionError, expected_error):
+                monitoring.should_equal(True)
+
+            expected_error = self.error_list_format([
+                "[aws_instance.bar.volume_size] should be between '1' and '50'. Is: '100'",
+                "[aws_instance.baz.volume_size] should be between '1' and '50'. Is: 'big'"
+            ])
+            with self.assertRaisesRegexp(AssertionError, expected_error):
+                validator.resources("aws_instance").columns("volume_size", backend=backend).should_be_in_range(1, 50)
+
+    def test_violation_collection(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/resource"))
+        collector = validator.enable_violation_collection()
+        with collector.rule("value-is-two"):
+            validator.resources('aws_instance').property('value').should_equal(2)
+        with collector.rule("has-abc123"):
+            validator.resources('aws_instance').should_have_properties('abc123')
+        validator.resources('aws_instance').property('value').should_equal(1)
+        self.assertEqual(len(collector), 4)
+        self.assertEqual(list(collector.by_rule().keys()), ["value-is-two", "has-abc123"])
+        violation = collector.by_rule()["value-is-two"][0]
+        self.assertEqual((violation.resource_type, violation.path, violation.expected, violation.actual),
+                         ("aws_instance", "value", "2", "1"))
+        self.assertEqual(collector.messages(), [
+            "[aws_instance.bar.value] should be '2'. Is: '1'",
+            "[aws_instance.bar] should have property: 'abc123'",
+            "[aws_instance.foo.value] should be '2'. Is: '1'",
+            "[aws_instance.foo] should have property: 'abc123'"
+        ])
+        with self.assertRaisesRegexp(AssertionError, "should have property: 'abc123'"):
+            collector.raise_if_violations()
+        self.assertIs(validator.disable_violation_collection(), collector)
+        with self.assertRaises(AssertionError):
+            validator.resources('aws_instance').property('value').should_equal(2)
+
+    def test_rule_pack_plan_matches_rule_by_rule_evaluation(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        collector = rule_set.run(validator)
+        self.assertEqual(collector.messages(), [
+            "[aws_ebs_volume.baz] should have property: 'tags'",
+            "[aws_instance.bar] should have property: 'tags'",
+            "[aws_instance.foo.ebs_block_device.encrypted] should be 'True'. Is: 'False'",
+            "[aws_instance.foo] should have property: 'tags'"
+        ])
+        self.assertEqual(sorted(collector.by_rule().keys()), ["ebs-encrypted", "instances-have-tags"])
+
+        reference = validator.enable_violation_collection()
+        for rule in rule_set:
+            with reference.rule(rule.name):
+                rule.evaluate(validator)
+        self.assertEqual(sorted(reference.violations, key=lambda violation: violation.message),
+                         sorted(collector.violations, key=lambda violation: violation.message))
+
+    def test_rule_pack_from_json(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.json"))
+        self.assertEqual(rule_set.run(validator).messages(),
+                         ["[aws_instance.bar.instance_type] should be 't2.micro'. Is: 't2.large'"])
+
+    def test_per_query_options(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/variable_substitution"))
+        expanded = validator.resources('aws_instance', variable_expand=True).property('value')
+        raw = validator.resources('aws_instance').property('value')
+        expanded.should_equal(1)
+        raw.should_equal('${var.test_variable}')
+        self.assertFalse(validator.variable_expand)
+
+    def test_rule_runner_matches_plan(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        expected = rule_set.run(validator).messages()
+        for executor in ("thread", "process"):
+            runner = t.RuleRunner(rule_set, jobs=2, executor=executor)
+            self.assertEqual(runner.run(validator).messages(), expected)
+            results = list(runner.results(validator))
+            self.assertEqual([result.rule for result in results], [rule.name for rule in rule_set])
+            self.assertEqual([result.passed for result in results], [True, False, True, False])
+
+    def test_process_workers_read_the_configuration_from_shared_memory(self):
+        from terraform_validate_patched.shared import SharedConfig, attach
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        expected = rule_set.run(validator).messages()
+        for cache in (None, t.ResultCache(), t.ResultCache()):
+            runner = t.RuleRunner(rule_set, jobs=2, executor="process", shared_memory=True, cache=cache)
+            self.assertEqual(runner.run(validator).messages(), expected)
+        with SharedConfig(validator) as shared:
+            attached = attach(shared.name)
+            resources = attached.terraform_config['resource']
+            self.assertEqual(list(resources), list(validator.terraform_config['resource']))
+            self.assertEqual(rule_set.run(attached.restricted_to([('aws_ebs_volume', 'baz')])).messages(),
+                             ["[aws_ebs_volume.baz] should have property: 'tags'"])
+            self.assertEqual(list(resources.decoded), ['aws_ebs_volume'])
+            self.assertEqual(attached.query('resource.aws_instance.*.instance_type'),
+                             validator.query('resource.aws_instance.*.instance_type'))
+            self.assertEqual(rule_set.run(attached).messages(), expected)
+            del attached, resources
+
+    def test_async_loading_and_validation(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        from terraform_validate_patched.aio import load_each
+        root = os.path.join(self.path, "fixtures/query")
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        expected = rule_set.run(t.Validator(root)).messages()
+
+        async def validate():
+            validator = await t.Validator.aload(root)
+            collector = await rule_set.arun(validator)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                limit = asyncio.Semaphore(2)
+                roots = [validator.root async for validator in load_each([root, root], executor=pool, limit=limit)]
+                results = [result async for result in rule_set.arun(validator, executor=pool, limit=limit)]
+            processed = await rule_set.arun(await t.Validator.aload(root, executor="process", jobs=2),
+                                            executor="process", jobs=2)
+            return collector, roots, results, processed
+
+        collector, roots, results, processed = asyncio.run(validate())
+        self.assertEqual(collector.messages(), expected)
+        self.assertEqual(roots, [root, root])
+        self.assertEqual(sorted(result.rule for result in results), sorted(rule.name for rule in rule_set))
+        self.assertEqual(sorted(violation.message for result in results for violation in result.violations),
+                         sorted(expected))
+        self.assertEqual(sorted(processed.messages()), sorted(expected))
+
+    def test_phase_stats(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        stats = validator.stats()
+        self.assertEqual(list(stats['phases']), ['walk', 'read', 'parse', 'merge', 'select', 'expand', 'assert'])
+        self.assertEqual(stats['files'], 1)
+        self.assertEqual(stats['slowest_files'][0]['path'], os.path.join(self.path, "fixtures/query", "1.tf"))
+        for phase in ('walk', 'read', 'parse', 'merge'):
+            self.assertEqual(stats['phases'][phase]['calls'], 1)
+        with self.assertRaises(AssertionError):
+            validator.resources('aws_instance').property('instance_type').should_equal('t2.micro')
+        stats = validator.stats()
+        self.assertEqual(stats['phases']['select']['calls'], 2)
+        self.assertEqual(stats['phases']['assert']['calls'], 1)
+        self.assertAlmostEqual(stats['wall'], sum(phase['wall'] for phase in stats['phases'].values()))
+        validator = t.Validator(os.path.join(self.path, "fixtures/variable_expansion"))
+        validator.resources('aws_instance', variable_expand=True).property('value').should_equal('1')
+        stats = validator.stats()
+        self.assertEqual(stats['phases']['expand']['calls'], 1)
+        self.assertAlmostEqual(stats['wall'], sum(phase['wall'] for phase in stats['phases'].values()))
+        validator.reset_stats()
+        self.assertEqual(validator.stats()['files'], 0)
+
+    def test_memory_profiling(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"), profile_memory=True)
+        try:
+            validator.resources('aws_instance').property('ebs_block_device').property('encrypted')
+        finally:
+            validator.disable_memory_profiling()
+        stats = validator.stats()
+        self.assertEqual(stats['load_strategy'], 'concatenate')
+        self.assertGreater(stats['phases']['merge']['peak'], 0)
+        self.assertGreater(stats['phases']['select']['peak'], 0)
+        self.assertEqual(stats['phases']['expand']['retained'], 0)
+
+    def test_memory_budget_parses_file_by_file(self):
+        fixtures = os.path.join(self.path, "fixtures")
+        for name in sorted(os.listdir(fixtures)):
+            try:
+                expected = t.Validator(os.path.join(fixtures, name)).terraform_config
+            except ValueError:
+                continue
+            validator = t.Validator(os.path.join(fixtures, name), memory_budget=1)
+            self.assertEqual(validator.terraform_config, expected)
+        self.assertEqual(t.Validator(os.path.join(fixtures, "query"), memory_budget=1).load_strategy, 'per_file')
+        validator = t.Validator(os.path.join(fixtures, "query"), memory_budget=2 ** 30)
+        self.assertEqual(validator.load_strategy, 'concatenate')
+
+    def test_operation_counters(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        with validator.counting() as counts:
+            encrypted = validator.resources('aws_instance').property('ebs_block_device').property('encrypted')
+            encrypted.should_match_regex('.*')
+            with validator.counting() as inner:
+                validator.resources('aws_.*').name_should_match_regex('[a-z]+')
+                validator.resources('aws_.*').name_should_match_regex('[a-z]+')
+        self.assertEqual(counts['resources'], 8)
+        self.assertEqual(counts['properties'], 5)
+        self.assertEqual(inner['resources'], 6)
+        # two resource types and three resource names matched per call
+        self.assertEqual(inner['regex_evaluations'], 2 * (2 + 3))
+        self.assertEqual(inner['regex_cache_hits'] + inner['regex_cache_misses'], inner['regex_evaluations'])
+        self.assertGreater(inner.hit_rate('regex_cache'), 0.5)
+        self.assertEqual(validator.counts()['resources'], 8)
+        self.assertEqual(validator.stats()['counters']['properties'], 5)
+
+        results = list(t.RuleRunner(t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml")),
+                                    jobs=2).results(validator))
+        self.assertTrue(all(result.counts['resources'] > 0 for result in results))
+
+    def test_assertions_evaluate_identical_values_once(self):
+        policy = '{"Version": "2012-10-17"'
+        config = {'resource': {'aws_iam_policy': {'p{}'.format(index): {'policy': policy, 'path': '/'}
+                                                  for index in range(6)}}}
+        config['resource']['aws_iam_policy']['p5']['policy'] = '{}'
+        validator = t.Validator(config)
+        collector = validator.enable_violation_collection()
+        with validator.counting() as counts:
+            validator.resources('aws_iam_policy').property('policy').should_contain_valid_json()
+            validator.resources('aws_iam_policy').property('policy').should_contain_valid_json()
+            validator.resources('aws_iam_policy').property('path').should_equal('/')
+        self.assertEqual(counts['json_decodes'], 2)
+        self.assertEqual(counts['assertion_cache_misses'], 3)
+        self.assertEqual(counts['assertion_cache_hits'], 15)
+        self.assertEqual(sorted(violation.resource_name for violation in collector), sorted(
+            ['p{}'.format(index) for index in range(5)] * 2))
+        validator.resources('aws_iam_policy').property('path').should_equal('/other')
+        self.assertEqual(len(collector), 16)
+        self.assertEqual(collector.messages()[-1], "[aws_iam_policy.p5.path] should be '/other'. Is: '/'")
+
+    def test_result_cache_only_evaluates_changed_resources(self):
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        config = t.Validator(os.path.join(self.path, "fixtures/query")).terraform_config
+        expected = rule_set.run(t.Validator(config)).messages()
+        cache = t.ResultCache()
+        for jobs in (1, 2, 1):
+            runner = t.RuleRunner(rule_set, jobs=jobs, cache=cache)
+            self.assertEqual(runner.run(t.Validator(config)).messages(), expected)
+        self.assertEqual(runner.report['cached'], len(cache))
+        self.assertEqual(cache.misses, len(cache))
+
+        instance_type = 'aws_instance'
+        name = sorted(config['resource'][instance_type])[0]
+        changed = config.set_in(('resource', instance_type, name, 'instance_type'), 't2.nano')
+        runner = t.RuleRunner(rule_set, cache=cache)
+        collector = runner.run(t.Validator(changed))
+        self.assertEqual(collector.messages(), rule_set.run(t.Validator(changed)).messages())
+        self.assertIn("[{}.{}.instance_type] should be one of '['t2.micro', 't2.large']'. Is: 't2.nano'".format(
+            instance_type, name), collector.messages())
+        # the four rules selecting aws_instance are evaluated again for the changed instance only, adding entries
+        self.assertEqual(runner.report['cached'], len(cache) - 4 - 4)
+        self.assertEqual(runner.run(t.Validator(dict(changed, variable={'new': {}}))).messages(),
+                         collector.messages())
+        self.assertEqual(runner.report['cached'], 0)
+
+    def test_snapshot_round_trip(self):
+        import shutil
+        import tempfile
+        from terraform_validate_patched import cli
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            shutil.copytree(os.path.join(self.path, "fixtures/variable_expansion"), root)
+            shutil.copy(os.path.join(self.path, "fixtures/query/1.tf"), os.path.join(root, "query.tf"))
+            path = os.path.join(directory, "root.tfsnap")
+            validator = t.Validator(root)
+            validator.save_snapshot(path)
+            loaded = t.Validator.load_snapshot(path, check=True)
+            self.assertEqual(loaded.terraform_config, validator.terraform_config)
+            self.assertEqual(list(loaded.terraform_config), list(validator.terraform_config))
+            self.assertEqual((loaded.load_strategy, loaded.root), ('snapshot', os.path.abspath(root)))
+            self.assertEqual(sorted(loaded.source_files),
+                             sorted(os.path.abspath(path) for path in validator.source_files))
+            with t.Snapshot(path) as snapshot:
+                self.assertEqual(snapshot.index['aws_instance'],
+                                 list(validator.terraform_config['resource']['aws_instance']))
+                self.assertEqual(snapshot.resources('aws_ebs_volume'),
+                                 validator.terraform_config['resource']['aws_ebs_volume'])
+                self.assertEqual(snapshot.stale_files(), [])
+
+            rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+            output = os.path.join(directory, "report")
+            self.assertEqual(cli.main(['snapshot', root, '-o', path]), cli.EXIT_PASSED)
+            cli.main(['run', '-r', rules, '-o', output, path])
+            with open(output) as ifile:
+                self.assertEqual(sorted(ifile.read().splitlines()),
+                                 t.RuleSet.from_file(rules).run(validator).messages())
+
+            with open(os.path.join(root, "query.tf"), "a") as ofile:
+                ofile.write("\n")
+            with self.assertRaisesRegexp(t.TerraformSnapshotException, "out of date"):
+                t.Validator.load_snapshot(path, check=True)
+            with open(output, "wb") as ofile:
+                ofile.write(b"TFVSNAP")
+            with self.assertRaises(t.TerraformSnapshotException):
+                t.Validator.load_snapshot(output)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_daemon_validates_and_refreshes_changed_files(self):
+        import shutil
+        import tempfile
+        import threading
+        from terraform_validate_patched import daemon
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            shutil.copytree(os.path.join(self.path, "fixtures/query"), root)
+            with open(os.path.join(root, "2.tf"), "w") as ofile:
+                ofile.write('resource "aws_ebs_volume" "extra" {\n  encrypted = false\n}\n')
+            rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+            server = daemon.ValidationServer(os.path.join(directory, "daemon.sock"), daemon.ValidationService())
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                with daemon.DaemonClient(server.server_address) as client:
+                    response = client.validate(root, rules)
+                    expected = t.RuleSet.from_file(rules).run(t.Validator(root)).messages()
+                    self.assertEqual(sorted(violation['message'] for violation in response['violations']), expected)
+                    self.assertEqual((response['files'], response['refreshed']), (2, 2))
+                    self.assertEqual(client.validate(root, rules)['refreshed'], 0)
+                    os.remove(os.path.join(root, "2.tf"))
+                    response = client.validate(root, rules)
+                    expected = t.RuleSet.from_file(rules).run(t.Validator(root)).messages()
+                    self.assertEqual(sorted(violation['message'] for violation in response['violations']), expected)
+                    self.assertEqual((response['files'], response['refreshed']), (1, 1))
+                    with self.assertRaises(daemon.TerraformDaemonException):
+                        client.request('unknown')
+                    client.shutdown()
+            finally:
+                thread.join(10)
+                server.server_close()
+            self.assertFalse(os.path.exists(server.server_address))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_daemon_reports_a_bad_rule_pack_and_keeps_serving(self):
+        import shutil
+        import tempfile
+        import threading
+        from terraform_validate_patched import daemon
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(self.path, "fixtures/query")
+            unknown = os.path.join(directory, "unknown.yml")
+            with open(unknown, "w") as ofile:
+                ofile.write("rules:\n  - name: purple\n    resources: aws_instance\n    assertion: should_be_purple\n")
+            invalid = os.path.join(directory, "invalid.yml")
+            with open(invalid, "w") as ofile:
+                ofile.write("rules: [\n")
+            server = daemon.ValidationServer(os.path.join(directory, "daemon.sock"), daemon.ValidationService())
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                with daemon.DaemonClient(server.server_address) as client:
+                    with self.assertRaisesRegexp(daemon.TerraformDaemonException, "should_be_purple"):
+                        client.validate(root, unknown)
+                    with self.assertRaisesRegexp(daemon.TerraformDaemonException, "not a valid rule pack"):
+                        client.validate(root, invalid)
+                    rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+                    self.assertIn("violations", client.validate(root, rules))
+                    client.shutdown()
+            finally:
+                thread.join(10)
+                server.server_close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_daemon_skips_empty_files_like_the_validator(self):
+        import shutil
+        import tempfile
+        from terraform_validate_patched import daemon
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            shutil.copytree(os.path.join(self.path, "fixtures/query"), root)
+            with open(os.path.join(root, "blank.tf"), "w") as ofile:
+                ofile.write("\n  \n")
+            rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+            service = daemon.ValidationService()
+            response = service.handle({'command': 'validate', 'root': root, 'rules': rules})
+            self.assertTrue(response['ok'])
+            expected = t.RuleSet.from_file(rules).run(t.Validator(root)).messages()
+            self.assertEqual(sorted(violation['message'] for violation in response['violations']), expected)
+            self.assertEqual((response['files'], response['refreshed']), (2, 2))
+            self.assertEqual(service.handle({'command': 'refresh', 'root': root})['refreshed'], 0)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_cli_exits_with_an_error_when_rules_cannot_be_loaded_or_run(self):
+        import json
+        import shutil
+        import tempfile
+        from terraform_validate_patched import cli
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            os.makedirs(root)
+            with open(os.path.join(root, "main.tf"), "w") as ofile:
+                ofile.write('resource "aws_instance" "web" {\n  instance_type = "${var.missing}"\n}\n')
+            broken = os.path.join(directory, "broken.yml")
+            with open(broken, "w") as ofile:
+                ofile.write("rules: [\n")
+            undefined = os.path.join(directory, "undefined.json")
+            with open(undefined, "w") as ofile:
+                json.dump([{'name': 'types', 'resources': 'aws_instance', 'property': 'instance_type',
+                            'assertion': 'should_equal', 'args': ['t2.micro'], 'variable_expansion': True}], ofile)
+            self.assertRaises(t.TerraformRuleException, t.RuleSet.from_file, broken)
+            self.assertEqual(cli.main(['run', '-r', broken, root]), cli.EXIT_ERROR)
+            self.assertEqual(cli.main(['run', '-r', undefined, root]), cli.EXIT_ERROR)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_cli_formats_and_exit_status(self):
+        import json
+        import shutil
+        import tempfile
+        from xml.etree import ElementTree
+        from terraform_validate_patched import cli
+        rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+        root = os.path.join(self.path, "fixtures/query")
+        expected = t.RuleSet.from_file(rules).run(t.Validator(root)).messages()
+        directory = tempfile.mkdtemp()
+        try:
+            output = os.path.join(directory, "report")
+            cache = os.path.join(directory, "cache")
+            self.assertEqual(cli.main(['run', '-r', rules, '-o', output, '--jobs', '2', '--cache-dir', cache, root]),
+                             cli.EXIT_VIOLATIONS)
+            with open(output) as ifile:
+                self.assertEqual(sorted(ifile.read().splitlines()), expected)
+            self.assertEqual(len(t.RuleHistory.load(os.path.join(cache, cli.HISTORY_FILE))), 4)
+            cached = len(t.ResultCache.load(os.path.join(cache, cli.RESULTS_FILE)))
+            self.assertGreater(cached, 0)
+            self.assertEqual(cli.main(['run', '-r', rules, '-o', output, '--cache-dir', cache, root]),
+                             cli.EXIT_VIOLATIONS)
+            with open(output) as ifile:
+                self.assertEqual(sorted(ifile.read().splitlines()), expected)
+            self.assertEqual(cli.main(['cache', 'clear', '--cache-dir', cache]), cli.EXIT_PASSED)
+            self.assertEqual(len(t.ResultCache.load(os.path.join(cache, cli.RESULTS_FILE))), 0)
+            cli.main(['run', '-r', rules, '-o', output, '--format', 'json', root])
+            with open(output) as ifile:
+                document = json.load(ifile)
+            self.assertEqual((document['passed'], document['count']), (False, len(expected)))
+            self.assertEqual(sorted(violation['message'] for violation in document['violations']), expected)
+            cli.main(['run', '-r', rules, '-o', output, '--format', 'jsonl', root])
+            with open(output) as ifile:
+                self.assertEqual(sorted(json.loads(line)['message'] for line in ifile), expected)
+            cli.main(['run', '-r', rules, '-o', output, '--format', 'junit', root])
+            suite = ElementTree.parse(output).getroot().find('testsuite')
+            self.assertEqual(suite.get('name'), root)
+            self.assertEqual(sorted(case.find('failure').get('message') for case in suite
+                                    if case.find('failure') is not None), expected)
+            self.assertEqual(len([case for case in suite if case.find('failure') is None]), 2)
+            cli.main(['run', '-r', rules, '-o', output, '--format', 'sarif', root])
+            with open(output) as ifile:
+                run = json.load(ifile)['runs'][0]
+            self.assertEqual(sorted(result['message']['text'] for result in run['results']), expected)
+            self.assertEqual([rule['id'] for rule in run['tool']['driver']['rules']],
+                             [rule.name for rule in t.RuleSet.from_file(rules)])
+            self.assertEqual(cli.main(['run', '-r', os.path.join(directory, "missing.yml"), root]), cli.EXIT_ERROR)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_merged_shards_match_an_unsharded_run(self):
+        import shutil
+        import tempfile
+        from terraform_validate_patched import cli
+        rules = os.path.join(self.path, "fixtures/rule_pack/rules.yml")
+        directory = tempfile.mkdtemp()
+        try:
+            roots = []
+            for root_index in range(4):
+                root = os.path.join(directory, "root{}".format(root_index))
+                os.makedirs(os.path.join(root, "modules"))
+                for file_index in range(3):
+                    name = "{}{}".format(root_index, file_index)
+                    with open(os.path.join(root, "modules" if file_index else "", "{}.tf".format(name)), "w") as ofile:
+                        ofile.write('resource "aws_instance" "i{}" {{\n  instance_type = "{}"\n  tags {{}}\n}}\n'
+                                    'resource "aws_ebs_volume" "v{}" {{\n  encrypted = {}\n}}\n'.format(
+                                        name, "t2.nano" if file_index % 2 else "t2.micro", name,
+                                        "true" if (root_index + file_index) % 3 else "false"))
+                roots.append(root)
+            full, merged = os.path.join(directory, "full"), os.path.join(directory, "merged")
+            timings = os.path.join(directory, "timings.json")
+            self.assertEqual(cli.main(['run', '-r', rules, '-o', full] + roots), cli.EXIT_VIOLATIONS)
+            with open(full) as ifile:
+                expected = sorted(ifile.read().splitlines())
+
+            def run_shards(by, *options):
+                partials = []
+                for index in range(1, 4):
+                    partials.append(os.path.join(directory, "{}-{}.jsonl".format(by, index)))
+                    cli.main(['run', '-r', rules, '-o', os.path.join(directory, "out"), '--shard', '{}/3'.format(index),
+                              '--shard-by', by, '--partial', partials[-1]] + list(options) + roots)
+                return partials
+
+            for by in ('roots', 'files', 'rules'):
+                partials = run_shards(by)
+                self.assertEqual(cli.main(['merge', '-o', merged, '--timings', timings] + partials),
+                                 cli.EXIT_VIOLATIONS)
+                with open(merged) as ifile:
+                    self.assertEqual(ifile.read().splitlines(), expected)
+                partials = run_shards(by, '--shard-timings', timings)
+                cli.main(['merge', '-o', merged] + partials)
+                with open(merged) as ifile:
+                    self.assertEqual(ifile.read().splitlines(), expected)
+            self.assertEqual(len(t.load_timings(timings)), len(t.RuleSet.from_file(rules)))
+            self.assertEqual(cli.main(['merge', '-o', merged] + partials[:2]), cli.EXIT_ERROR)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_changed_only_matches_a_full_run_restricted_to_the_changed_resources(self):
+        import json
+        import shutil
+        import subprocess
+        import tempfile
+        from terraform_validate_patched import changes, cli
+        directory = tempfile.mkdtemp()
+        try:
+            repository, root = os.path.join(directory, "repo"), os.path.join(directory, "repo", "root")
+            files = {'main.tf': 'resource "aws_instance" "foo" {\n  instance_type = "${var.type}"\n}\n'
+                                'module "net" {\n  source = "./modules/net"\n}\n',
+                     'variables.tf': 'variable "type" {\n  default = "t2.nano"\n}\n',
+                     'other.tf': 'resource "aws_instance" "bar" {\n  instance_type = "t2.nano"\n}\n',
+                     'modules/net/main.tf': 'resource "aws_ebs_volume" "vol" {\n  encrypted = false\n}\n'}
+            for name, contents in files.items():
+                path = os.path.join(root, name)
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                with open(path, "w") as ofile:
+                    ofile.write(contents)
+            rules = os.path.join(directory, "rules.json")
+            with open(rules, "w") as ofile:
+                json.dump([{'name': 'types', 'resources': 'aws_instance', 'property': 'instance_type',
+                            'assertion': 'should_equal', 'args': ['t2.micro'], 'variable_expansion': True},
+                           {'name': 'encrypted', 'resources': 'aws_.*', 'property': 'encrypted',
+                            'assertion': 'should_equal', 'args': [True]}], ofile)
+            git = ['git', '-C', repository, '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+            subprocess.check_call(git + ['init', '-q'])
+            subprocess.check_call(git + ['add', '.'])
+            subprocess.check_call(git + ['commit', '-q', '-m', 'initial'])
+            self.assertEqual(cli.changes_against([root], [rules], 'HEAD'), set())
+            self.assertIsNone(cli.load_root(root, set()))
+
+            with open(os.path.join(root, "modules/net/main.tf"), "a") as ofile:
+                ofile.write('resource "aws_ebs_volume" "other" {\n  encrypted = true\n}\n')
+            changed = cli.changes_against([root], [rules], 'HEAD')
+            validator, scope = changes.load_changed(root, changed)
+            self.assertEqual(sorted(os.path.relpath(path, root) for path in scope.files),
+                             ['main.tf', os.path.join('modules', 'net', 'main.tf')])
+            self.assertEqual(sorted(scope.resources),
+                             [('aws_ebs_volume', 'other'), ('aws_ebs_volume', 'vol'), ('aws_instance', 'foo')])
+            rule_set = cli.load_rules([rules])
+            full = [violation for violation in rule_set.run(t.Validator(root)) if scope.includes(violation)]
+            self.assertEqual(sorted(violation.message for violation in rule_set.run(validator)),
+                             sorted(violation.message for violation in full))
+            self.assertIn("[aws_instance.foo.instance_type] should be 't2.micro'. Is: 't2.nano'",
+                          [violation.message for violation in full])
+            # against the base only the added volume differs, and it is encrypted
+            validator, scope = changes.load_changed(root, changed, 'HEAD')
+            self.assertEqual(scope.resources, {('aws_ebs_volume', 'other')})
+            self.assertEqual(scope.diff.unchanged, [('aws_ebs_volume', 'vol'), ('aws_instance', 'foo')])
+            self.assertEqual(cli.main(['run', '-r', rules, '--changed-only', root]), cli.EXIT_PASSED)
+            with open(os.path.join(root, "variables.tf"), "w") as ofile:
+                ofile.write('variable "type" {\n  default = "t2.large"\n}\n')
+            changed = cli.changes_against([root], [rules], 'HEAD')
+            validator, scope = changes.load_changed(root, changed, 'HEAD')
+            self.assertIsNone(scope.diff)
+            self.assertEqual(cli.main(['run', '-r', rules, '--changed-only', root]), cli.EXIT_VIOLATIONS)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_changed_only_follows_changed_variables_into_other_files(self):
+        import json
+        import shutil
+        import subprocess
+        import tempfile
+        from terraform_validate_patched import changes, cli
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            os.makedirs(root)
+            files = {'main.tf': 'resource "aws_instance" "web" {\n  instance_type = "${var.type}"\n}\n',
+                     'variables.tf': 'variable "type" {\n  default = "t2.micro"\n}\n',
+                     'other.tf': 'resource "aws_instance" "db" {\n  instance_type = "t2.micro"\n}\n'}
+            for name, contents in files.items():
+                with open(os.path.join(root, name), "w") as ofile:
+                    ofile.write(contents)
+            rules = os.path.join(directory, "rules.json")
+            with open(rules, "w") as ofile:
+                json.dump([{'name': 'types', 'resources': 'aws_instance', 'property': 'instance_type',
+                            'assertion': 'should_equal', 'args': ['t2.micro'], 'variable_expansion': True}], ofile)
+            git = ['git', '-C', directory, '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+            subprocess.check_call(git + ['init', '-q'])
+            subprocess.check_call(git + ['add', '.'])
+            subprocess.check_call(git + ['commit', '-q', '-m', 'initial'])
+
+            with open(os.path.join(root, "variables.tf"), "w") as ofile:
+                ofile.write('variable "type" {\n  default = "m5.24xlarge"\n}\n')
+            changed = cli.changes_against([root], [rules], 'HEAD')
+            validator, scope = changes.load_changed(root, changed, 'HEAD')
+            self.assertEqual(sorted(os.path.basename(path) for path in scope.files), ['main.tf', 'variables.tf'])
+            self.assertEqual(scope.resources, {('aws_instance', 'web')})
+            self.assertEqual(cli.main(['run', '-r', rules, root]), cli.EXIT_VIOLATIONS)
+            self.assertEqual(cli.main(['run', '-r', rules, '--changed-only', root]), cli.EXIT_VIOLATIONS)
+
+            subprocess.check_call(git + ['checkout', '-q', '--', '.'])
+            os.remove(os.path.join(root, "other.tf"))
+            changed = cli.changes_against([root], [rules], 'HEAD')
+            self.assertEqual(len(changes.affected_files(root, changed)), 2)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_changed_only_skips_files_that_do_not_parse(self):
+        import json
+        import shutil
+        import subprocess
+        import tempfile
+        from terraform_validate_patched import changes, cli
+        directory = tempfile.mkdtemp()
+        try:
+            root = os.path.join(directory, "root")
+            os.makedirs(root)
+            files = {'main.tf': 'resource "aws_instance" "web" {\n  instance_type = "t2.micro"\n}\n',
+                     'blank.tf': '\n',
+                     'broken.tf': 'variable "type" {\n'}
+            for name, contents in files.items():
+                with open(os.path.join(root, name), "w") as ofile:
+                    ofile.write(contents)
+            rules = os.path.join(directory, "rules.json")
+            with open(rules, "w") as ofile:
+                json.dump([{'name': 'types', 'resources': 'aws_instance', 'property': 'instance_type',
+                            'assertion': 'should_equal', 'args': ['t2.micro']}], ofile)
+            git = ['git', '-C', directory, '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+            subprocess.check_call(git + ['init', '-q'])
+            subprocess.check_call(git + ['add', '.'])
+            subprocess.check_call(git + ['commit', '-q', '-m', 'initial'])
+
+            with open(os.path.join(root, "main.tf"), "w") as ofile:
+                ofile.write('resource "aws_instance" "web" {\n  instance_type = "m5.24xlarge"\n}\n')
+            with open(os.path.join(root, "blank.tf"), "w") as ofile:
+                ofile.write('  \n\n')
+            subprocess.check_call(git + ['commit', '-q', '-a', '-m', 'change'])
+            full, changed_only = os.path.join(directory, "full.txt"), os.path.join(directory, "changed.txt")
+            self.assertEqual(cli.main(['run', '-r', rules, '-o', full, root]), cli.EXIT_VIOLATIONS)
+            self.assertEqual(cli.main(['run', '-r', rules, '-o', changed_only, '--changed-only', '--base', 'HEAD~1',
+                                       root]), cli.EXIT_VIOLATIONS)
+            with open(full) as expected, open(changed_only) as actual:
+                self.assertEqual(actual.read(), expected.read())
+            _, resources = changes.load_files(root, [os.path.join(os.path.realpath(root), "blank.tf")])
+            self.assertEqual(resources, set())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_rule_runner_schedules_with_history(self):
+        validator = t.Validator(os.path.join(self.path, "fixtures/query"))
+        rule_set = t.RuleSet.from_file(os.path.join(self.path, "fixtures/rule_pack/rules.yml"))
+        history = t.RuleHistory()
+        runner = t.RuleRunner(rule_set, jobs=2, history=history)
+        expected = runner.run(validator).messages()
+        self.assertEqual(len(history), 4)
+        self.assertEqual(runner.report['evaluated'], 4)
+        runner = t.RuleRunner(rule_set, jobs=2, history=history)
+        self.assertEqual(runner.run(validator).messages(), expected)
+        self.assertIsNotNone(runner.report['predicted'])
+        runner = t.RuleRunner(rule_set, jobs=1, history=history, fail_fast=True)
+        self.assertEqual([result.rule for result in runner.results(validator)], ['ebs-encrypted'])
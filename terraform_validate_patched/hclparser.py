@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: hclparser.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+hclparser module
+
+Lazily imported, reusable pyhcl parser.
+
+``hcl.loads`` builds a brand new PLY parser, and with recent pyhcl releases the
+LALR tables, on every call. This module imports pyhcl on the first parse only,
+keeps one parser per thread and builds it from the tables shipped in
+``_hcl_parsetab.py``. The tables are keyed by a signature of the installed pyhcl
+grammar, when it does not match they are generated once from the installed
+grammar and shared by every thread. Regenerate the shipped tables after changing
+the pyhcl version with::
+
+    python -c 'from terraform_validate_patched import hclparser; hclparser.write_tables()'
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import json
+import logging
+import os
+import threading
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER_BASENAME = '''TerraformValidate'''
+LOGGER = logging.getLogger('{}.hclparser'.format(LOGGER_BASENAME))
+
+TABLES_MODULE = '_hcl_parsetab'
+
+_LOCAL = threading.local()
+_STATE = {}
+_LOCK = threading.Lock()
+
+
+class _TableProduction(object):
+    """The subset of a PLY production the LR parsing engine uses."""
+
+    __slots__ = ('name', 'len', 'str', 'func', 'callable')
+
+    def __init__(self, str_, name, length, func):
+        self.str = str_
+        self.name = name
+        self.len = length
+        self.func = func
+        self.callable = None
+
+    def __str__(self):
+        return self.str
+
+
+def grammar_signature(parser_class):
+    """Hashes everything PLY derives the parsing tables from.
+
+    Args:
+        parser_class: The pyhcl HclParser class
+
+    Returns:
+        string: A hex digest that changes whenever the grammar does
+
+    """
+    import hashlib
+    digest = hashlib.sha256()
+    digest.update(repr(tuple(getattr(parser_class, 'tokens', ()))).encode('utf-8'))
+    digest.update(repr(getattr(parser_class, 'precedence', None)).encode('utf-8'))
+    for name in sorted(dir(parser_class)):
+        if name.startswith('p_') and name != 'p_error':
+            docstring = getattr(parser_class, name).__doc__ or ''
+            digest.update('{}:{}'.format(name, ' '.join(docstring.split())).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _load_hcl():
+    with _LOCK:
+        if not _STATE:
+            from hcl import api, parser
+            _STATE['api'] = api
+            _STATE['parser_class'] = parser.HclParser
+            # the ply pyhcl parses with, a dependency of older releases and vendored by newer ones
+            _STATE['yacc'] = parser.yacc
+            _STATE['tables'] = _load_tables(parser.HclParser)
+    return _STATE
+
+
+def _load_tables(parser_class):
+    try:
+        from . import _hcl_parsetab as tables
+    except ImportError:
+        LOGGER.debug('No prebuilt parser tables are shipped, generating them')
+        return _generate_tables(parser_class)
+    if tables.SIGNATURE != grammar_signature(parser_class):
+        LOGGER.info('The prebuilt parser tables do not match the installed pyhcl grammar, generating them')
+        return _generate_tables(parser_class)
+    return tables
+
+
+class _GeneratedTables(object):
+    """Parsing tables generated at runtime, shaped like the shipped tables module."""
+
+    def __init__(self, signature, action_items, goto_items, productions):
+        self.SIGNATURE = signature
+        self.ACTION_ITEMS = action_items
+        self.GOTO_ITEMS = goto_items
+        self.PRODUCTIONS = productions
+
+
+def _generate_tables(parser_class):
+    """Builds a parser the regular way once and keeps its tables, for every thread to build its parser from."""
+    built = parser_class().yacc
+    return _GeneratedTables(grammar_signature(parser_class),
+                            _items(built.action),
+                            _items(built.goto),
+                            [(production.str, production.name, production.len, production.func)
+                             for production in built.productions])
+
+
+def _build_parser(state):
+    parser_class = state['parser_class']
+    tables = state['tables']
+    parser = parser_class.__new__(parser_class)
+    action = {}
+    for token, (states, actions) in tables.ACTION_ITEMS.items():
+        for state_number, value in zip(states, actions):
+            action.setdefault(state_number, {})[token] = value
+    goto = {}
+    for symbol, (states, targets) in tables.GOTO_ITEMS.items():
+        for state_number, value in zip(states, targets):
+            goto.setdefault(state_number, {})[symbol] = value
+    productions = []
+    for str_, name, length, func in tables.PRODUCTIONS:
+        production = _TableProduction(str_, name, length, func)
+        if func:
+            production.callable = getattr(parser, func)
+        productions.append(production)
+
+    class _Tables(object):
+        lr_action = action
+        lr_goto = goto
+        lr_productions = productions
+
+    parser.yacc = state['yacc'].LRParser(_Tables, parser.p_error)
+    return parser
+
+
+def get_parser():
+    """Returns the parser of the calling thread, building it on first use.
+
+    PLY parsers keep their stacks on the instance so they are not shared between threads.
+    """
+    parser = getattr(_LOCAL, 'parser', None)
+    if parser is None:
+        parser = _LOCAL.parser = _build_parser(_load_hcl())
+    return parser
+
+
+def _top_items(p):
+    p[0] = p[1]
+
+
+def get_items_parser():
+    """Returns a parser of the calling thread that leaves the top level items of a document unmerged.
+
+    The top level items of several documents merged together by ``merge_items`` give the same
+    configuration as parsing the concatenated documents, without ever holding the concatenation.
+    """
+    parser = getattr(_LOCAL, 'items_parser', None)
+    if parser is None:
+        parser = _build_parser(_load_hcl())
+        for production in parser.yacc.productions:
+            if production.func == 'p_top':
+                production.callable = _top_items
+        _LOCAL.items_parser = parser
+    return parser
+
+
+def loads_items(text):
+    """Parses an HCL or JSON string into its list of top level (key, value) items.
+
+    Raises:
+        ValueError: If the text is not valid HCL
+
+    """
+    api = _load_hcl()['api']
+    text = api.u(text)
+    if api.isHcl(text):
+        return get_items_parser().parse(text)
+    return list(json.loads(text).items())
+
+
+def merge_items(items):
+    """Merges top level items the way pyhcl merges the top level of a single document."""
+    return get_parser().objectlist_flat(items, True)
+
+
+def loads(text):
+    """Parses an HCL or JSON string the same way ``hcl.loads`` does, reusing the thread's parser.
+
+    Args:
+        text: The configuration text
+
+    Returns:
+        dict: The parsed configuration
+
+    Raises:
+        ValueError: If the text is not valid HCL
+
+    """
+    api = _load_hcl()['api']
+    text = api.u(text)
+    if api.isHcl(text):
+        return get_parser().parse(text)
+    return json.loads(text)
+
+
+def _items(table):
+    items = {}
+    for state_number in sorted(table):
+        for symbol, value in sorted(table[state_number].items()):
+            states, values = items.setdefault(symbol, ([], []))
+            states.append(state_number)
+            values.append(value)
+    return items
+
+
+def _write_mapping(ofile, name, items):
+    ofile.write('{} = {{\n'.format(name))
+    for symbol in sorted(items):
+        states, values = items[symbol]
+        ofile.write('    {!r}: ({!r}, {!r}),\n'.format(symbol, states, values))
+    ofile.write('}\n')
+
+
+def write_tables(path=None):
+    """Generates the parsing tables for the installed pyhcl and writes them as a python module.
+
+    Args:
+        path: Where to write the module, defaults to the module shipped in this package
+
+    Returns:
+        string: The path written to
+
+    """
+    from hcl import parser as hcl_parser
+    tables = _generate_tables(hcl_parser.HclParser)
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), '{}.py'.format(TABLES_MODULE))
+    with open(path, 'w') as ofile:
+        ofile.write('# Generated by terraform_validate_patched.hclparser.write_tables(), do not edit.\n')
+        ofile.write('# pylint: skip-file\n')
+        ofile.write('SIGNATURE = {!r}\n'.format(tables.SIGNATURE))
+        _write_mapping(ofile, 'ACTION_ITEMS', tables.ACTION_ITEMS)
+        _write_mapping(ofile, 'GOTO_ITEMS', tables.GOTO_ITEMS)
+        ofile.write('PRODUCTIONS = [\n')
+        for production in tables.PRODUCTIONS:
+            ofile.write('    {!r},\n'.format(production))
+        ofile.write(']\n')
+    return path
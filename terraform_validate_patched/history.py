@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: history.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+history module
+
+Per rule cost history persisted across runs and the schedules derived from it.
+
+Every run updates an exponentially weighted average of the duration and of the
+failures of each rule, so recent runs weigh more than old ones. A schedule orders
+the rules longest first, which keeps a slow rule from starting last and stretching
+the run, or, in fail fast mode, the rules most likely to fail first.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import heapq
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER_BASENAME = '''TerraformValidate'''
+
+HISTORY_VERSION = 1
+SMOOTHING = 0.3
+
+
+class RuleStatistics(object):
+    """What is known about the past runs of one rule."""
+
+    __slots__ = ('runs', 'failures', 'duration', 'failure_score', 'last_duration', 'last_failed')
+
+    def __init__(self, runs=0, failures=0, duration=0.0, failure_score=0.0, last_duration=None, last_failed=None):
+        self.runs = runs
+        self.failures = failures
+        self.duration = duration
+        self.failure_score = failure_score
+        self.last_duration = last_duration
+        self.last_failed = last_failed
+
+    def update(self, duration, failed, smoothing=SMOOTHING):
+        if self.runs:
+            self.duration += smoothing * (duration - self.duration)
+            self.failure_score += smoothing * (float(failed) - self.failure_score)
+        else:
+            self.duration, self.failure_score = duration, float(failed)
+        self.runs += 1
+        self.failures += int(failed)
+        self.last_duration = duration
+        self.last_failed = failed
+
+    def as_dict(self):
+        return OrderedDict((name, getattr(self, name)) for name in self.__slots__)
+
+
+class RuleHistory(object):
+    """Durations and failures of rules, keyed by rule name.
+
+    Args:
+        path: The JSON file the history is saved to, None keeps it in memory only
+        smoothing: Weight of the newest run in the averages, between 0 and 1
+
+    """
+
+    def __init__(self, path=None, smoothing=SMOOTHING):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        self.path = path
+        self.smoothing = smoothing
+        self.rules = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __contains__(self, rule_name):
+        return rule_name in self.rules
+
+    @classmethod
+    def load(cls, path, smoothing=SMOOTHING):
+        """Loads the history saved at path, a missing or unreadable file gives an empty history."""
+        history = cls(path, smoothing)
+        try:
+            with open(path) as ifile:
+                data = json.load(ifile)
+        except (IOError, OSError, ValueError):
+            history._logger.debug('No usable rule history at {}, starting a new one'.format(path))
+            return history
+        if data.get('version') != HISTORY_VERSION:
+            history._logger.debug('Ignoring rule history at {} written by another version'.format(path))
+            return history
+        for name, entry in data.get('rules', {}).items():
+            history.rules[name] = RuleStatistics(**entry)
+        return history
+
+    def save(self, path=None):
+        """Writes the history atomically, so concurrent runs never read a partial file."""
+        path = path or self.path
+        if path is None:
+            raise ValueError('The rule history has no path to save to')
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        data = OrderedDict([('version', HISTORY_VERSION),
+                            ('rules', OrderedDict((name, self.rules[name].as_dict()) for name in sorted(self.rules)))])
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.rule-history-')
+        try:
+            with os.fdopen(descriptor, 'w') as ofile:
+                json.dump(data, ofile, indent=2)
+            os.replace(temporary, path)
+        except Exception:
+            os.unlink(temporary)
+            raise
+
+    def get(self, rule_name):
+        return self.rules.get(rule_name)
+
+    def record(self, rule_name, duration, failed):
+        statistics = self.rules.get(rule_name)
+        if statistics is None:
+            statistics = self.rules[rule_name] = RuleStatistics()
+        statistics.update(duration, failed, self.smoothing)
+
+    def record_results(self, results):
+        """Records RuleResult objects of a run."""
+        for result in results:
+            self.record(result.rule, result.duration, not result.passed)
+
+    def mean_duration(self):
+        if not self.rules:
+            return 0.0
+        return sum(entry.duration for entry in self.rules.values()) / len(self.rules)
+
+    def expected_duration(self, rule_name, default=None):
+        """The predicted duration of a rule, rules never seen take the default or the mean of the known ones."""
+        statistics = self.rules.get(rule_name)
+        if statistics is not None:
+            return statistics.duration
+        return default if default is not None else self.mean_duration()
+
+    def failure_score(self, rule_name):
+        statistics = self.rules.get(rule_name)
+        return statistics.failure_score if statistics is not None else 0.0
+
+
+class Schedule(object):
+    """An execution order of rules and the run time it is predicted to take.
+
+    Args:
+        order: Indexes into the scheduled rules, in the order they should start
+        durations: The predicted duration of every scheduled rule, by index
+        jobs: The number of workers the schedule was made for
+
+    """
+
+    def __init__(self, order, durations, jobs):
+        self.order = order
+        self.durations = durations
+        self.jobs = jobs
+        self.predicted_makespan = simulate_makespan([durations[index] for index in order], jobs)
+
+    def __iter__(self):
+        return iter(self.order)
+
+
+def simulate_makespan(durations, jobs):
+    """Returns when the last of the durations ends when each starts on the first free of the workers, in order."""
+    workers = [0.0] * max(1, min(jobs, len(durations) or 1))
+    for duration in durations:
+        heapq.heapreplace(workers, workers[0] + duration)
+    return max(workers)
+
+
+def schedule_rules(rules, history, jobs=1, fail_fast=False):
+    """Orders rules using their history.
+
+    Args:
+        rules: The rules to run
+        history: A RuleHistory, rules it does not know are expected to take the mean known duration
+        jobs: The number of workers
+        fail_fast: Order the rules that failed recently first instead of the longest first
+
+    Returns:
+        Schedule: The order to start the rules in
+
+    """
+    default = history.mean_duration()
+    durations = [history.expected_duration(rule.name, default) for rule in rules]
+    if fail_fast:
+        def key(index):
+            return -history.failure_score(rules[index].name), -durations[index], index
+    else:
+        def key(index):
+            return -durations[index], index
+    return Schedule(sorted(range(len(rules)), key=key), durations, jobs)
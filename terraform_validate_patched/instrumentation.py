@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: instrumentation.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+instrumentation module
+
+Phase timers and operation counters kept by every Validator.
+
+A run is split in the phases below, the time of a phase nested in another one, like
+the variable expansion done by an assertion, is only accounted to the inner phase so
+the phases add up to the total.
+
+walk
+    Listing the .tf files of the directory
+read
+    Reading the files
+parse
+    Parsing every file on its own, the per file times are kept as well
+merge
+    Parsing the merged configuration
+select
+    Selecting resources and properties
+expand
+    Substituting variable values
+assert
+    Running the assertion methods
+
+The operation counters count the work done on the hot paths and the hits and
+misses of the caches. Counting can be scoped to a block, only the operations done
+by the thread that entered the block are counted in it::
+
+    with validator.counting() as counts:
+        validator.resources('aws_instance').property('tags').should_have_properties(['Name'])
+    counts['properties'], counts.hit_rate('regex_cache')
+
+With memory profiling enabled the timers also report, per phase, the peak traced
+memory above the start of the phase and the bytes it left allocated, measured with
+``tracemalloc``. Tracing slows Python allocations down considerably and is process
+wide, so phases running in parallel threads see each other's allocations.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import functools
+import heapq
+import logging
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER_BASENAME = '''TerraformValidate'''
+
+PHASES = ('walk', 'read', 'parse', 'merge', 'select', 'expand', 'assert')
+SLOWEST_FILES = 10
+COUNTERS = ('resources',
+            'properties',
+            'regex_evaluations',
+            'regex_cache_hits',
+            'regex_cache_misses',
+            'variable_expansions',
+            'json_decodes',
+            'query_cache_hits',
+            'query_cache_misses',
+            'selection_cache_hits',
+            'selection_cache_misses',
+            'assertion_cache_hits',
+            'assertion_cache_misses',
+            'expansion_cache_hits',
+            'expansion_cache_misses')
+CACHES = ('regex_cache', 'query_cache', 'selection_cache', 'assertion_cache', 'expansion_cache')
+
+# Indexes into the totals of a phase
+WALL, CPU, CALLS, PEAK, RETAINED = range(5)
+
+# CPU time of the calling thread where the platform offers it, threads of a RuleRunner share the process.
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+# Without it, before Python 3.9, the peak of a phase is the highest memory traced since tracing started.
+_reset_peak = getattr(tracemalloc, 'reset_peak', lambda: None)
+
+
+def _empty_totals():
+    return {name: [0.0, 0.0, 0, 0, 0] for name in PHASES}
+
+
+class _Phase(object):
+    """Context manager timing one phase, entered and left through the owning PhaseTimers."""
+
+    __slots__ = ('timers', 'name')
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.timers.start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timers.stop()
+
+
+class PhaseTimers(object):
+    """Accumulates wall and CPU time per phase and the parse time per file.
+
+    Args:
+        slowest: How many of the slowest files are reported by default
+        memory: Also track the peak and retained memory of every phase
+
+    """
+
+    def __init__(self, slowest=SLOWEST_FILES, memory=False):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        self.slowest = slowest
+        self.memory = False
+        self.memory_profiled = False
+        self._owns_tracing = False
+        self._lock = threading.Lock()
+        self._phases = {name: _Phase(self, name) for name in PHASES}
+        self.reset()
+        if memory:
+            self.enable_memory()
+
+    def __getstate__(self):
+        return {'slowest': self.slowest, 'memory_profiled': self.memory_profiled,
+                'totals': [self._summed(index) for index in (WALL, CPU, CALLS, PEAK, RETAINED)],
+                'files': list(self.files)}
+
+    def __setstate__(self, state):
+        self.__init__(state['slowest'])
+        self.files = state['files']
+        self.memory_profiled = state['memory_profiled']
+        self._totals = {name: [column[name] for column in state['totals']] for name in PHASES}
+
+    def reset(self):
+        with self._lock:
+            # {phase: [wall, cpu, calls, peak, retained]} of every phase left by the outermost phase of its thread
+            self._totals = _empty_totals()
+            self._local = threading.local()
+            self.files = []
+            self.memory_profiled = self.memory
+
+    def enable_memory(self):
+        """Starts tracking memory per phase, tracemalloc is started unless something else already traces."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self.memory = self.memory_profiled = True
+
+    def disable_memory(self):
+        """Stops tracking memory, tracemalloc is only stopped if it was started by enable_memory."""
+        self.memory = False
+        if self._owns_tracing:
+            self._owns_tracing = False
+            tracemalloc.stop()
+
+    def _thread_state(self):
+        try:
+            return self._local.stack, self._local.totals
+        except AttributeError:
+            # the totals of the thread, so stopping a nested phase never waits on a lock, they are
+            # merged into the shared totals when the outermost phase stops and end with the thread
+            self._local.stack = []
+            self._local.totals = _empty_totals()
+            return self._local.stack, self._local.totals
+
+    def phase(self, name):
+        """Returns the context manager timing the named phase."""
+        return self._phases[name]
+
+    def start(self, name):
+        try:
+            stack = self._local.stack
+        except AttributeError:
+            stack = self._thread_state()[0]
+        if self.memory and tracemalloc.is_tracing():
+            memory = self._start_memory(stack)
+            stack.append([name, time.perf_counter(), _cpu_time(), 0.0, 0.0] + memory)
+        else:
+            # [name, wall start, cpu start, wall of nested phases, cpu of nested phases]
+            stack.append([name, time.perf_counter(), _cpu_time(), 0.0, 0.0])
+
+    @staticmethod
+    def _start_memory(stack):
+        current, peak = tracemalloc.get_traced_memory()
+        if stack and len(stack[-1]) > 5:
+            # the peak counter is restarted for the new phase, the parent keeps the peak reached so far
+            stack[-1][6] = max(stack[-1][6], peak)
+        _reset_peak()
+        # [memory at start, highest memory seen, bytes retained by nested phases]
+        return [current, current, 0]
+
+    def stop(self):
+        wall_end, cpu_end = time.perf_counter(), _cpu_time()
+        local = self._local
+        stack = local.stack
+        entry = stack.pop()
+        name, wall_start, cpu_start, nested_wall, nested_cpu = entry[:5]
+        wall, cpu = wall_end - wall_start, cpu_end - cpu_start
+        total = local.totals[name]
+        if len(entry) > 5:
+            self._stop_memory(stack, entry, total)
+        if stack:
+            parent = stack[-1]
+            parent[3] += wall
+            parent[4] += cpu
+        total[WALL] += wall - nested_wall
+        total[CPU] += cpu - nested_cpu
+        total[CALLS] += 1
+        if not stack:
+            self._merge(local.totals)
+            local.totals = _empty_totals()
+        return wall
+
+    def _merge(self, totals):
+        with self._lock:
+            for name, total in totals.items():
+                if total[CALLS]:
+                    merged = self._totals[name]
+                    merged[WALL] += total[WALL]
+                    merged[CPU] += total[CPU]
+                    merged[CALLS] += total[CALLS]
+                    merged[PEAK] = max(merged[PEAK], total[PEAK])
+                    merged[RETAINED] += total[RETAINED]
+
+    @staticmethod
+    def _stop_memory(stack, entry, total):
+        memory_start, peak, nested_retained = entry[5:]
+        if tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, traced_peak)
+        else:
+            current = memory_start
+        retained = current - memory_start
+        total[PEAK] = max(total[PEAK], peak - memory_start)
+        total[RETAINED] += retained - nested_retained
+        if stack and len(stack[-1]) > 5:
+            parent = stack[-1]
+            parent[6] = max(parent[6], peak)
+            parent[7] += retained
+
+    def _summed(self, index):
+        with self._lock:
+            return {name: self._totals[name][index] for name in PHASES}
+
+    @property
+    def wall(self):
+        return self._summed(WALL)
+
+    @property
+    def cpu(self):
+        return self._summed(CPU)
+
+    @property
+    def calls(self):
+        return self._summed(CALLS)
+
+    @property
+    def peak(self):
+        """The highest memory, in bytes above the start of the phase, any call of each phase reached."""
+        return self._summed(PEAK)
+
+    @property
+    def retained(self):
+        """The bytes each phase left allocated, not counting what nested phases left."""
+        return self._summed(RETAINED)
+
+    def record_file(self, path, seconds, size):
+        with self._lock:
+            self.files.append((seconds, path, size))
+        self._logger.debug('Parsed {} ({} bytes) in {:.4f}s'.format(path, size, seconds))
+
+    def slowest_files(self, count=None):
+        """Returns the (path, seconds, size) of the files that took longest to parse, slowest first."""
+        count = self.slowest if count is None else count
+        return [(path, seconds, size) for seconds, path, size in heapq.nlargest(count, self.files)]
+
+    def as_dict(self, slowest=None):
+        """The timings, the 'peak' and 'retained' bytes of a phase are None unless memory was profiled."""
+        wall, cpu, calls = self.wall, self.cpu, self.calls
+        peak, retained = (self.peak, self.retained) if self.memory_profiled else ({}, {})
+        phases = OrderedDict()
+        for name in PHASES:
+            phases[name] = OrderedDict([('wall', wall[name]),
+                                        ('cpu', cpu[name]),
+                                        ('calls', calls[name]),
+                                        ('peak', peak.get(name)),
+                                        ('retained', retained.get(name))])
+        return OrderedDict([('phases', phases),
+                            ('wall', sum(wall.values())),
+                            ('cpu', sum(cpu.values())),
+                            ('files', len(self.files)),
+                            ('slowest_files', [OrderedDict([('path', path), ('parse', seconds), ('size', size)])
+                                               for path, seconds, size in self.slowest_files(slowest)])])
+
+    def log(self, level=logging.INFO, slowest=None):
+        """Emits the phase and slowest file timings through the TerraformValidate logger hierarchy."""
+        if not self._logger.isEnabledFor(level):
+            return
+        wall, cpu, calls = self.wall, self.cpu, self.calls
+        peak, retained = self.peak, self.retained
+        for name in PHASES:
+            if calls[name]:
+                self._logger.log(level, 'Phase {}: {:.4f}s wall, {:.4f}s cpu over {} calls'.format(
+                    name, wall[name], cpu[name], calls[name]))
+                if self.memory_profiled:
+                    self._logger.log(level, 'Phase {}: {} bytes peak, {} bytes retained'.format(
+                        name, peak[name], retained[name]))
+        for path, seconds, size in self.slowest_files(slowest):
+            self._logger.log(level, 'Slow file {}: {:.4f}s for {} bytes'.format(path, seconds, size))
+
+
+class OperationCounts(OrderedDict):
+    """Operation counts, as totals or as counted inside a scope."""
+
+    def __init__(self, *args, **kwargs):
+        super(OperationCounts, self).__init__(*args, **kwargs)
+        for name in COUNTERS:
+            self.setdefault(name, 0)
+
+    def hit_rate(self, cache):
+        """Returns the fraction of lookups of the named cache that were hits, None when there were none."""
+        hits, misses = self['{}_hits'.format(cache)], self['{}_misses'.format(cache)]
+        return float(hits) / (hits + misses) if hits + misses else None
+
+    def hit_rates(self):
+        return OrderedDict((cache, self.hit_rate(cache)) for cache in CACHES)
+
+
+class OperationCounters(object):
+    """Counts the operations done on the hot paths, per validator."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        return {'totals': self.totals()}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._thread_state()[0].update(state['totals'])
+
+    def reset(self):
+        with self._lock:
+            # (thread, counts) of the threads counting, and the counts of the threads that ended since
+            self._totals = []
+            self._ended = dict.fromkeys(COUNTERS, 0)
+            self._local = threading.local()
+
+    def _thread_state(self):
+        try:
+            return self._local.totals, self._local.scopes
+        except AttributeError:
+            self._local.totals = dict.fromkeys(COUNTERS, 0)
+            self._local.scopes = []
+            with self._lock:
+                # an ended thread counts no more, its counts are folded in so the list does not grow with threads
+                for thread, totals in self._totals:
+                    if not thread.is_alive():
+                        for name in COUNTERS:
+                            self._ended[name] += totals[name]
+                self._totals = [(thread, totals) for thread, totals in self._totals if thread.is_alive()]
+                self._totals.append((threading.current_thread(), self._local.totals))
+            return self._local.totals, self._local.scopes
+
+    def increment(self, name, amount=1):
+        try:
+            totals, scopes = self._local.totals, self._local.scopes
+        except AttributeError:
+            totals, scopes = self._thread_state()
+        totals[name] += amount
+        for scope in scopes:
+            scope[name] += amount
+
+    def totals(self):
+        with self._lock:
+            threads = [totals for _, totals in self._totals] + [self._ended]
+        return OperationCounts((name, sum(thread[name] for thread in threads)) for name in COUNTERS)
+
+    @contextmanager
+    def scope(self):
+        """Counts the operations done by the calling thread inside the block, scopes may nest."""
+        counts = OperationCounts()
+        scopes = self._thread_state()[1]
+        scopes.append(counts)
+        try:
+            yield counts
+        finally:
+            scopes.pop()
+
+
+def timed(phase):
+    """Decorates a method of an object holding a ``validator`` so its run time is accounted to a phase."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            timers = getattr(self.validator, 'timers', None)
+            if timers is None:
+                return method(self, *args, **kwargs)
+            with timers.phase(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
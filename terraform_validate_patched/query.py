@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: query.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+query module
+
+Compiles path expressions like ``resource.aws_instance.*.ebs_block_device[*].encrypted``
+into a list of steps and evaluates them over a parsed terraform configuration.
+
+Supported segments:
+
+* ``name`` or ``"quoted.name"`` matches a key literally
+* ``*`` matches any key
+* ``/regex/`` matches any key the regex fully matches
+* ``[*]`` matches every element of a list, ``[n]`` the element at index n
+
+A key segment applied to a list descends into every element of it, the same way
+``property()`` handles repeated blocks.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import re
+from collections.abc import Mapping
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+KEY = 'key'
+ANY_KEY = 'any_key'
+REGEX_KEY = 'regex_key'
+INDEX = 'index'
+ANY_INDEX = 'any_index'
+
+QUERY_CACHE_SIZE = 256
+_QUERY_CACHE = {}
+
+
+class TerraformQueryException(Exception):
+    pass
+
+
+class CompiledQuery(object):
+    """A path expression compiled into a tuple of (kind, argument) steps."""
+
+    def __init__(self, expression, steps):
+        self.expression = expression
+        self.steps = tuple(steps)
+
+    def __repr__(self):
+        return '<CompiledQuery {!r}>'.format(self.expression)
+
+    def evaluate(self, config):
+        """Walks the configuration once, yielding (path, value) pairs.
+
+        The traversal is iterative and level synchronous, every step turns the
+        current set of matches into the next one so no intermediate wrapper
+        objects are created.
+
+        Args:
+            config: The parsed terraform configuration to query
+
+        Returns:
+            generator: Tuples of (path, value) where path is a tuple of keys and list indexes
+
+        """
+        current = [((), config)]
+        for kind, argument in self.steps:
+            matches = []
+            for path, value in current:
+                if kind in (INDEX, ANY_INDEX):
+                    elements = value if isinstance(value, list) else [value]
+                    if kind == ANY_INDEX:
+                        matches.extend((path + (index,), element) for index, element in enumerate(elements))
+                    elif -len(elements) <= argument < len(elements):
+                        matches.append((path + (argument % len(elements),), elements[argument]))
+                    continue
+                if isinstance(value, list):
+                    candidates = [(path + (index,), element) for index, element in enumerate(value)]
+                else:
+                    candidates = [(path, value)]
+                for candidate_path, candidate in candidates:
+                    if not isinstance(candidate, Mapping):
+                        continue
+                    if kind == KEY:
+                        if argument in candidate:
+                            matches.append((candidate_path + (argument,), candidate[argument]))
+                    else:
+                        for key, nested in candidate.items():
+                            if kind == ANY_KEY or argument.match(key):
+                                matches.append((candidate_path + (key,), nested))
+            current = matches
+            if not current:
+                break
+        for match in current:
+            yield match
+
+
+def format_path(path):
+    """Renders a path tuple the way terraform addresses are written.
+
+    Args:
+        path: A tuple of keys and list indexes as produced by a query
+
+    Returns:
+        string: The path as a dotted string with list indexes in brackets
+
+    """
+    rendered = ''
+    for segment in path:
+        if isinstance(segment, int):
+            rendered += '[{}]'.format(segment)
+        else:
+            rendered += '.{}'.format(segment) if rendered else segment
+    return rendered
+
+
+def _tokenize(expression):
+    steps = []
+    index = 0
+    length = len(expression)
+    expect_key = True
+    while index < length:
+        char = expression[index]
+        if char == '.':
+            if expect_key:
+                raise TerraformQueryException('Empty segment at position {} of {!r}'.format(index, expression))
+            expect_key = True
+            index += 1
+        elif char == '[':
+            end = expression.find(']', index)
+            if end == -1:
+                raise TerraformQueryException('Unterminated "[" at position {} of {!r}'.format(index, expression))
+            selector = expression[index + 1:end].strip()
+            if selector == '*':
+                steps.append((ANY_INDEX, None))
+            else:
+                try:
+                    steps.append((INDEX, int(selector)))
+                except ValueError:
+                    raise TerraformQueryException('Invalid list index {!r} in {!r}'.format(selector, expression))
+            expect_key = False
+            index = end + 1
+        elif not expect_key:
+            raise TerraformQueryException('Expected "." or "[" at position {} of {!r}'.format(index, expression))
+        elif char in '"\'/':
+            end = index + 1
+            value = ''
+            while end < length and expression[end] != char:
+                if expression[end] == '\\' and end + 1 < length and expression[end + 1] == char:
+                    end += 1
+                value += expression[end]
+                end += 1
+            if end == length:
+                raise TerraformQueryException('Unterminated {} at position {} of {!r}'.format(char, index, expression))
+            if char == '/':
+                try:
+                    steps.append((REGEX_KEY, re.compile('(?:{})$'.format(value))))
+                except re.error as error:
+                    raise TerraformQueryException('Invalid regex {!r} in {!r}: {}'.format(value, expression, error))
+            else:
+                steps.append((KEY, value))
+            expect_key = False
+            index = end + 1
+        else:
+            end = index
+            while end < length and expression[end] not in '.[':
+                end += 1
+            name = expression[index:end].strip()
+            steps.append((ANY_KEY, None) if name == '*' else (KEY, name))
+            expect_key = False
+            index = end
+    if expect_key:
+        raise TerraformQueryException('Expression {!r} ends with an empty segment'.format(expression))
+    return steps
+
+
+def compile_query(expression, counters=None):
+    """Compiles a path expression, reusing the cached result for repeated expressions.
+
+    Args:
+        expression: The path expression to compile
+        counters: Optional OperationCounters recording the cache hits and misses
+
+    Returns:
+        CompiledQuery: The compiled query
+
+    Raises:
+        TerraformQueryException: If the expression is not valid
+
+    """
+    query = _QUERY_CACHE.get(expression)
+    if query is None:
+        if counters is not None:
+            counters.increment('query_cache_misses')
+        query = CompiledQuery(expression, _tokenize(expression))
+        if len(_QUERY_CACHE) >= QUERY_CACHE_SIZE:
+            _QUERY_CACHE.clear()
+        _QUERY_CACHE[expression] = query
+    elif counters is not None:
+        counters.increment('query_cache_hits')
+    return query
@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: rules.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+rules module
+
+Declarative rule packs mapped onto the existing assertion methods.
+
+A rule pack is a JSON or YAML file holding a list of rules, or a mapping with a
+``rules`` key holding that list::
+
+    rules:
+      - name: instances-use-allowed-types
+        resources: aws_instance
+        property: instance_type
+        assertion: should_be_in
+        args: [["t2.micro", "t2.small"]]
+      - name: volumes-are-encrypted
+        resources: aws_instance
+        property: ebs_block_device.encrypted
+        assertion: should_equal
+        args: [true]
+
+A rule set is compiled into a plan that groups the rules by resource type. The
+resources of a type are selected and materialized once and every rule that applies
+to the type is evaluated against that shared selection, rules selecting the same
+property path share the extracted property list as well.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import importlib
+import json
+import os
+
+from .terraform_validate_patched import TerraformResourceList
+from .violations import ViolationCollector
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+RESOURCE_ASSERTIONS = ('should_have_properties',
+                       'should_not_have_properties',
+                       'name_should_match_regex')
+PROPERTY_ASSERTIONS = ('should_equal',
+                       'should_not_equal',
+                       'list_should_contain',
+                       'list_should_not_contain',
+                       'should_have_properties',
+                       'should_not_have_properties',
+                       'should_match_regex',
+                       'should_contain_valid_json')
+COLUMN_ASSERTIONS = ('should_be_in',
+                     'should_not_be_in',
+                     'should_be_in_range')
+
+RULE_KEYS = ('name', 'resources', 'property', 'with_property', 'assertion', 'args', 'kwargs',
+             'variable_expansion', 'error_if_property_missing', 'description')
+
+
+class TerraformRuleException(Exception):
+    pass
+
+
+class Rule(object):
+    """A single declarative policy.
+
+    Args:
+        name: Unique name of the rule, used to attribute violations
+        resources: Resource type regex or list of resource types, as accepted by ``Validator.resources``
+        assertion: Name of the assertion method to call
+        args: Positional arguments for the assertion
+        kwargs: Keyword arguments for the assertion
+        property: Dotted property path (or a list of property names) applied through ``property()`` calls
+        with_property: Optional [property_name, regex] filter applied through ``with_property()``
+        variable_expansion: Whether variables are expanded while the rule is evaluated
+        error_if_property_missing: Whether a missing property is reported as a violation
+        description: Free text shown to humans
+
+    """
+
+    def __init__(self, name, resources, assertion, args=None, kwargs=None, property=None, with_property=None,
+                 variable_expansion=False, error_if_property_missing=False, description=None):
+        self.name = name
+        self.resources = resources
+        self.assertion = assertion
+        self.args = list(args or [])
+        self.kwargs = dict(kwargs or {})
+        if isinstance(property, (list, tuple)):
+            self.property_path = list(property)
+        else:
+            self.property_path = property.split('.') if property else []
+        self.with_property = list(with_property) if with_property else None
+        self.variable_expansion = variable_expansion
+        self.error_if_property_missing = error_if_property_missing
+        self.description = description
+        self._validate()
+
+    def __repr__(self):
+        return '<Rule {!r}>'.format(self.name)
+
+    def _validate(self):
+        if not self.name:
+            raise TerraformRuleException('Every rule needs a name')
+        if not self.resources:
+            raise TerraformRuleException('Rule {!r} does not select any resources'.format(self.name))
+        allowed = PROPERTY_ASSERTIONS + COLUMN_ASSERTIONS if self.property_path else RESOURCE_ASSERTIONS
+        if self.assertion not in allowed:
+            raise TerraformRuleException('Rule {!r} uses unknown assertion {!r}, '
+                                         'expected one of {}'.format(self.name, self.assertion, ', '.join(allowed)))
+        if self.with_property is not None and len(self.with_property) != 2:
+            raise TerraformRuleException('Rule {!r}: with_property takes [property_name, regex]'.format(self.name))
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = set(data) - set(RULE_KEYS)
+        if unknown:
+            raise TerraformRuleException('Rule {!r} has unknown keys: {}'.format(data.get('name'),
+                                                                                 ', '.join(sorted(unknown))))
+        return cls(**data)
+
+    def as_dict(self):
+        return {'name': self.name,
+                'resources': self.resources,
+                'property': self.property_path or None,
+                'with_property': self.with_property,
+                'assertion': self.assertion,
+                'args': self.args,
+                'kwargs': self.kwargs,
+                'variable_expansion': self.variable_expansion,
+                'error_if_property_missing': self.error_if_property_missing,
+                'description': self.description}
+
+    def options(self, options):
+        return options.replace(variable_expand=self.variable_expansion,
+                               raise_error_if_property_missing=self.error_if_property_missing)
+
+    def apply(self, resource_list, targets=None):
+        """Runs the rule against an already selected resource list.
+
+        Args:
+            resource_list: A TerraformResourceList holding the resources to check
+            targets: Optional dictionary used to share property lists between rules that select the same properties
+
+        """
+        resource_list = resource_list.with_options(self.options(resource_list.options))
+        if targets is None or self.error_if_property_missing:
+            target = self.select(resource_list)
+        else:
+            key = (tuple(self.with_property or ()), tuple(self.property_path), self.variable_expansion)
+            target = targets.get(key)
+            if target is None:
+                resource_list.validator.counters.increment('selection_cache_misses')
+                target = targets[key] = self.select(resource_list)
+            else:
+                resource_list.validator.counters.increment('selection_cache_hits')
+        if self.assertion in COLUMN_ASSERTIONS:
+            target = target.columns()
+        getattr(target, self.assertion)(*self.args, **self.kwargs)
+
+    def resource_types(self, validator):
+        """The resource types of the configuration the rule applies to."""
+        resource_types = list(validator.terraform_config.get('resource', {}).keys())
+        if isinstance(self.resources, list):
+            return [resource_type for resource_type in self.resources if resource_type in resource_types]
+        return [resource_type for resource_type in resource_types
+                if validator.matches_regex_pattern(resource_type, self.resources)]
+
+    def select(self, resource_list):
+        target = resource_list
+        if self.with_property:
+            target = target.with_property(*self.with_property)
+        for property_name in self.property_path:
+            target = target.property(property_name)
+        return target
+
+    def evaluate(self, validator, collector=None):
+        """Runs the rule on its own, selecting its resources from the whole configuration.
+
+        This is what a hand written test method per rule does and is kept as the
+        reference the compiled plan is measured and checked against.
+
+        Args:
+            validator: The loaded validator
+            collector: Optional ViolationCollector, the violations added to it are attributed to the rule,
+                the validator's own setting is used when omitted
+
+        Raises:
+            TerraformVariableException: If the rule expands a variable the configuration does not define,
+                and the other errors of the validator that are not violations
+
+        """
+        if collector is None:
+            self.apply(validator.resources(self.resources, validator.options()))
+            return
+        with collector.rule(self.name):
+            self.apply(validator.resources(self.resources, validator.options(collector=collector)))
+
+
+class RuleSet(object):
+    """An ordered collection of uniquely named rules."""
+
+    def __init__(self, rules=None):
+        self.rules = []
+        self._names = set()
+        for rule in rules or []:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def add(self, rule):
+        if rule.name in self._names:
+            raise TerraformRuleException('Duplicate rule name {!r}'.format(rule.name))
+        self._names.add(rule.name)
+        self.rules.append(rule)
+
+    @classmethod
+    def from_data(cls, data):
+        if isinstance(data, dict):
+            data = data.get('rules', [])
+        if not isinstance(data, list):
+            raise TerraformRuleException('A rule pack should be a list of rules or a mapping with a "rules" list')
+        return cls([Rule.from_dict(entry) for entry in data])
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads a rule pack from a .json, .yml or .yaml file.
+
+        Raises:
+            TerraformRuleException: If the YAML of the pack does not parse or the pack holds invalid rules
+            ValueError: If the JSON of the pack does not parse
+
+        """
+        with open(path) as ifile:
+            contents = ifile.read()
+        if os.path.splitext(path)[1].lower() in ('.yml', '.yaml'):
+            try:
+                yaml = importlib.import_module('yaml')
+            except ImportError:
+                raise TerraformRuleException('PyYAML is needed to load {}'.format(path))
+            try:
+                data = yaml.safe_load(contents)
+            except yaml.YAMLError as error:
+                raise TerraformRuleException('{} is not a valid rule pack: {}'.format(path, error))
+        else:
+            data = json.loads(contents)
+        return cls.from_data(data)
+
+    def compile(self):
+        return RulePlan(self.rules)
+
+    def run(self, validator, collector=None):
+        return self.compile().run(validator, collector)
+
+    def arun(self, validator, executor=None, limit=None, jobs=None, collector=None):
+        """Evaluates the rules on an executor, see ``aio.AsyncRun``.
+
+        ``async for`` over the returned run yields a RuleResult per rule as it completes,
+        awaiting it gives the ViolationCollector of the run.
+        """
+        from .aio import AsyncRun
+        return AsyncRun(self.rules, validator, executor, limit, jobs, collector)
+
+
+class RulePlan(object):
+    """Rules of a rule set grouped so the resources of every type are selected once.
+
+    Args:
+        rules: The rules to evaluate
+
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+
+    def group_by_resource_type(self, validator):
+        """Resolves the resource selector of every rule against the types present in the configuration.
+
+        Args:
+            validator: The loaded validator
+
+        Returns:
+            dict: Resource type to the list of rules that apply to it, in rule order
+
+        """
+        groups = {}
+        for rule in self.rules:
+            for resource_type in rule.resource_types(validator):
+                groups.setdefault(resource_type, []).append(rule)
+        return groups
+
+    def run(self, validator, collector=None):
+        """Evaluates every rule, collecting violations instead of raising.
+
+        Only failed assertions are collected. An error that is not a violation, like an
+        undefined variable, says the configuration or the rule is broken, it propagates
+        and ends the run, the violations of the rules evaluated until then stay in the collector.
+
+        Args:
+            validator: The loaded validator
+            collector: Optional ViolationCollector to append to
+
+        Returns:
+            ViolationCollector: The collector holding all violations
+
+        Raises:
+            TerraformVariableException: If a rule expands a variable the configuration does not define,
+                and the other errors of the validator that are not violations
+
+        """
+        collector = collector if collector is not None else ViolationCollector()
+        options = validator.options(collector=collector)
+        resources = validator.terraform_config.get('resource', {})
+        for resource_type, rules in self.group_by_resource_type(validator).items():
+            with validator.timers.phase('select'):
+                resource_list = TerraformResourceList(validator, [resource_type], resources, options)
+            targets = {}
+            for rule in rules:
+                with collector.rule(rule.name):
+                    rule.apply(resource_list, targets)
+        return collector
@@ -0,0 +1,331 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: runner.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+runner module
+
+Executes the rules of a rule set concurrently against one loaded validator.
+
+Every rule runs with its own QueryOptions and its own ViolationCollector so rules
+never share mutable state. With the process executor the loaded validator is
+placed in a module global before the pool forks, so workers inherit the parsed
+configuration copy on write instead of receiving a pickled copy per task. Where
+processes cannot be forked, or when asked to, the configuration is published in
+shared memory instead and every worker decodes the resource types its rules
+select from there.
+
+Given a RuleHistory the rules are started longest first, or most likely to fail
+first in fail fast mode, and the history is updated with the outcome of the run.
+
+Given a ResultCache a rule is only evaluated against the resources the cache
+holds no outcome for, the cached violations of the others are added to its result.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import gc
+import logging
+import os
+import time
+
+from .fingerprints import variables_fingerprint
+from .history import schedule_rules
+from .terraform_validate_patched import LOGGER_BASENAME
+from .violations import ViolationCollector
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+THREAD_EXECUTOR = 'thread'
+PROCESS_EXECUTOR = 'process'
+
+# Populated in the parent right before a process pool forks, read by the workers.
+_SHARED = {}
+
+
+class RuleResult(object):
+    """The outcome of evaluating a single rule, with the operations it took.
+
+    ``cached`` counts the resources whose outcome came from a ResultCache instead of being evaluated.
+    """
+
+    __slots__ = ('rule', 'violations', 'duration', 'counts', 'cached')
+
+    def __init__(self, rule, violations, duration, counts=None, cached=0):
+        self.rule = rule
+        self.violations = violations
+        self.duration = duration
+        self.counts = counts
+        self.cached = cached
+
+    def __getstate__(self):
+        return self.rule, self.violations, self.duration, self.counts, self.cached
+
+    def __setstate__(self, state):
+        self.rule, self.violations, self.duration, self.counts, self.cached = state
+
+    @property
+    def passed(self):
+        return not self.violations
+
+
+def evaluate_rule(validator, rule, resources=None):
+    """Evaluates a rule, only against the (type, name) resources given, every resource when None."""
+    if resources is not None:
+        validator = validator.restricted_to(resources)
+    collector = ViolationCollector()
+    start = time.time()
+    with collector.rule(rule.name), validator.counting() as counts:
+        rule.evaluate(validator, collector)
+    return RuleResult(rule.name, collector.violations, time.time() - start, counts)
+
+
+def _initialize_worker(validator, rules):
+    _SHARED['validator'] = validator
+    _SHARED['rules'] = rules
+
+
+def _attach_worker(name, settings, rules):
+    from .shared import attach
+    _initialize_worker(attach(name, *settings), rules)
+
+
+def _evaluate_shared_rule(index, resources=None):
+    return evaluate_rule(_SHARED['validator'], _SHARED['rules'][index], resources)
+
+
+class RuleRunner(object):
+    """Runs rules across a thread or a process pool.
+
+    Args:
+        rule_set: The RuleSet (or any iterable of rules) to execute
+        jobs: Number of workers, defaults to the number of CPUs
+        executor: 'thread' or 'process'
+        history: Optional RuleHistory used to schedule the rules and updated, and saved when it has a path,
+            after every run
+        fail_fast: Stop starting rules once one has failed
+        cache: Optional ResultCache skipping the resources a rule has seen before, updated, and saved when it
+            has a path, after every run. Rules answered from the cache are not recorded in the history
+        shared_memory: Publish the configuration in shared memory for the process executor, by default only
+            when processes cannot be forked
+
+    """
+
+    def __init__(self, rule_set, jobs=None, executor=THREAD_EXECUTOR, history=None, fail_fast=False, cache=None,
+                 shared_memory=None):
+        logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
+                                                suffix=self.__class__.__name__)
+        self._logger = logging.getLogger(logger_name)
+        if executor not in (THREAD_EXECUTOR, PROCESS_EXECUTOR):
+            raise ValueError('Unknown executor {!r}, expected "thread" or "process"'.format(executor))
+        self.rules = list(rule_set)
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.executor = executor
+        self.history = history
+        self.fail_fast = fail_fast
+        self.cache = cache
+        self.shared_memory = shared_memory
+        self.report = None
+
+    def schedule(self):
+        """Returns the Schedule the rules are started in, rule order when there is no history."""
+        if self.history is None:
+            return None
+        return schedule_rules(self.rules, self.history, self.jobs, self.fail_fast)
+
+    def results(self, validator):
+        """Evaluates every rule.
+
+        Results are yielded in rule order. In fail fast mode they are yielded as they
+        complete instead, and no rule is started after the first failing result.
+
+        Args:
+            validator: The loaded validator, it is only read
+
+        Returns:
+            generator: A RuleResult per evaluated rule
+
+        """
+        schedule = self.schedule()
+        order = list(schedule) if schedule is not None else list(range(len(self.rules)))
+        start = time.time()
+        lookups = self._lookups(validator)
+        # only what the history needs, the violations are not kept beyond the consumer
+        outcomes = []
+        try:
+            for result in self._results(validator, order, lookups):
+                outcomes.append((result.rule, result.duration, not result.passed, result.cached))
+                yield result
+        finally:
+            self._finish(schedule, outcomes, time.time() - start)
+
+    def _lookups(self, validator):
+        """What the cache holds for every rule, keyed by rule name."""
+        if self.cache is None:
+            return {}
+        variables = variables_fingerprint(validator.terraform_config)
+        return {rule.name: self.cache.lookup(validator, rule, variables) for rule in self.rules}
+
+    @staticmethod
+    def _missing(lookups, rule):
+        lookup = lookups.get(rule.name)
+        return lookup.missing if lookup is not None and lookup.hits else None
+
+    @staticmethod
+    def _complete(result, lookups):
+        lookup = lookups.get(result.rule)
+        if lookup is not None:
+            result.violations = lookup.merge(result.violations)
+            result.cached = lookup.hits
+        return result
+
+    def _cached(self, lookups):
+        """Results of the rules the cache holds every outcome of, keyed by rule index."""
+        return {index: RuleResult(rule.name, list(lookups[rule.name].violations), 0.0, cached=lookups[rule.name].hits)
+                for index, rule in enumerate(self.rules)
+                if rule.name in lookups and lookups[rule.name].complete}
+
+    def _results(self, validator, order, lookups):
+        cached = self._cached(lookups)
+        if self.jobs == 1 or len(self.rules) - len(cached) < 2:
+            # On a single worker the order only matters to find a failure early.
+            for index in order if self.fail_fast else range(len(self.rules)):
+                rule = self.rules[index]
+                if index in cached:
+                    result = cached[index]
+                else:
+                    result = self._complete(evaluate_rule(validator, rule, self._missing(lookups, rule)), lookups)
+                yield result
+                if self.fail_fast and not result.passed:
+                    return
+        elif self.executor == THREAD_EXECUTOR:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                futures = {index: pool.submit(evaluate_rule, validator, self.rules[index],
+                                              self._missing(lookups, self.rules[index]))
+                           for index in order if index not in cached}
+                for result in self._gather(futures, cached, lookups):
+                    yield result
+        else:
+            for result in self._process_results(validator, order, cached, lookups):
+                yield result
+
+    def _gather(self, futures, cached, lookups):
+        if not self.fail_fast:
+            for index in range(len(self.rules)):
+                yield cached[index] if index in cached else self._complete(futures.pop(index).result(), lookups)
+            return
+        from concurrent.futures import as_completed
+        for result in self._fail_fast_results(cached, as_completed(futures.values()), lookups):
+            yield result
+            if not result.passed:
+                for pending in futures.values():
+                    pending.cancel()
+                return
+
+    def _fail_fast_results(self, cached, completed, lookups):
+        for result in cached.values():
+            yield result
+        for future in completed:
+            yield self._complete(future.result(), lookups)
+
+    def _process_results(self, validator, order, cached, lookups):
+        # multiprocessing drags in a good part of the standard library, only pay for it when a pool is used.
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        fork = 'fork' in multiprocessing.get_all_start_methods()
+        shared, frozen = None, False
+        if self.shared_memory or (self.shared_memory is None and not fork):
+            from .shared import SharedConfig
+            shared = SharedConfig(validator)
+            settings = (validator.variable_expand, validator.raise_error_if_property_missing)
+            pool = ProcessPoolExecutor(max_workers=self.jobs,
+                                       initializer=_attach_worker,
+                                       initargs=(shared.name, settings, self.rules))
+        elif fork:
+            _initialize_worker(validator, self.rules)
+            pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context('fork'))
+            # Workers are forked lazily while tasks are submitted, keep the collector from touching,
+            # and therefore copying, the inherited objects in them meanwhile.
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+                frozen = True
+        else:
+            self._logger.debug('fork is not available, shipping the configuration to every worker')
+            pool = ProcessPoolExecutor(max_workers=self.jobs,
+                                       initializer=_initialize_worker,
+                                       initargs=(validator, self.rules))
+        try:
+            with pool:
+                # Tasks are submitted one by one in schedule order, the workers take them in that order.
+                futures = {index: pool.submit(_evaluate_shared_rule, index, self._missing(lookups, self.rules[index]))
+                           for index in order if index not in cached}
+                for result in self._gather(futures, cached, lookups):
+                    yield result
+        finally:
+            if frozen:
+                gc.unfreeze()
+            if shared is not None:
+                shared.close()
+            _SHARED.clear()
+
+    def _finish(self, schedule, outcomes, elapsed):
+        self.report = {'rules': len(self.rules),
+                       'evaluated': len(outcomes),
+                       'jobs': self.jobs,
+                       'predicted': schedule.predicted_makespan if schedule is not None else None,
+                       'actual': elapsed,
+                       'cached': sum(cached for _, _, _, cached in outcomes)}
+        if schedule is not None:
+            self._logger.info('Evaluated {} of {} rules in {:.3f}s, predicted {:.3f}s'.format(
+                len(outcomes), len(self.rules), elapsed, schedule.predicted_makespan))
+        if self.history is not None and outcomes:
+            for rule_name, duration, failed, cached in outcomes:
+                if not cached:
+                    self.history.record(rule_name, duration, failed)
+            if self.history.path:
+                self.history.save()
+        if self.cache is not None:
+            self._logger.info('{} rule and resource outcomes taken from the result cache'.format(self.report['cached']))
+            if self.cache.path:
+                self.cache.save()
+
+    def run(self, validator, collector=None):
+        """Evaluates the rules and gathers all violations.
+
+        Args:
+            validator: The loaded validator
+            collector: Optional ViolationCollector to append to
+
+        Returns:
+            ViolationCollector: The collector holding the violations of the evaluated rules
+
+        """
+        collector = collector if collector is not None else ViolationCollector()
+        for result in self.results(validator):
+            collector.add(result.violations)
+        return collector
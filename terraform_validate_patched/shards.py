@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: shards.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+shards module
+
+Splits a validation run over machines and merges what they found.
+
+The work is divided into units, the roots, the .tf files of the roots or the rules,
+and every unit is assigned to one of N shards. Without timings a unit goes to the
+shard its stable hash points at. Given the seconds every unit took before, the
+units are assigned longest first to the least loaded shard, units without a timing
+are expected to take the mean. Either way every machine computes the same
+assignment from the same command line and timings file.
+
+A shard writes its violations to a partial result file as JSON Lines, a header
+naming the shard, a line per violation and a trailer with the time every unit
+took. Merging checks every shard of the run is there and writes the violations of
+all shards sorted, with the timings of the units to balance the next run::
+
+    terraform-validate run -r rules.yml --shard 2/4 --partial shard-2.jsonl infra/*
+    terraform-validate merge --timings timings.json -o report.txt shard-*.jsonl
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import hashlib
+import heapq
+import json
+import os
+from collections import OrderedDict
+
+from ._version import __version__
+from .sinks import JsonLinesSink
+from .violations import Violation
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+SHARD_BY = ROOTS, FILES, RULES = 'roots', 'files', 'rules'
+PARTIAL_VERSION = 1
+
+
+class TerraformShardException(Exception):
+    pass
+
+
+def stable_hash(unit):
+    """A hash of a unit name that is the same on every machine and interpreter."""
+    return int(hashlib.blake2b(unit.encode('utf-8'), digest_size=8).hexdigest(), 16)
+
+
+def parse_shard(text):
+    """Parses 'I/N' into (I, N), shards are numbered from 1."""
+    try:
+        index, count = [int(part) for part in text.split('/')]
+    except ValueError:
+        raise ValueError('A shard is given as I/N, like 2/4, not {!r}'.format(text))
+    if not 1 <= index <= count:
+        raise ValueError('Shard {} is not one of 1 to {}'.format(index, count))
+    return index, count
+
+
+def assign(units, count, timings=None):
+    """Assigns every unit to a shard.
+
+    Args:
+        units: The unit names
+        count: The number of shards
+        timings: Optional mapping of unit name to the seconds it took, balances the shards by cost
+
+    Returns:
+        dict: Unit name to shard number, from 1 to count
+
+    """
+    if not timings:
+        return {unit: stable_hash(unit) % count + 1 for unit in units}
+    default = sum(timings.values()) / len(timings)
+    costs = {unit: timings.get(unit, default) for unit in units}
+    loads = [(0.0, shard) for shard in range(1, count + 1)]
+    assignment = {}
+    for unit in sorted(costs, key=lambda unit: (-costs[unit], stable_hash(unit), unit)):
+        load, shard = heapq.heappop(loads)
+        assignment[unit] = shard
+        heapq.heappush(loads, (load + costs[unit], shard))
+    return assignment
+
+
+def unit_name(path):
+    return os.path.normpath(path)
+
+
+class Shard(object):
+    """One of the shards of a run.
+
+    Args:
+        index: The number of the shard, from 1 to count
+        count: The number of shards
+        by: What is divided, 'roots', 'files' or 'rules'
+        timings: Optional mapping of unit name to the seconds it took
+
+    """
+
+    def __init__(self, index, count, by=ROOTS, timings=None):
+        if by not in SHARD_BY:
+            raise ValueError('Unknown shard unit {!r}, expected one of {}'.format(by, ', '.join(SHARD_BY)))
+        self.index = index
+        self.count = count
+        self.by = by
+        self.timings = timings or {}
+
+    def __repr__(self):
+        return '<Shard {}/{} by {}>'.format(self.index, self.count, self.by)
+
+    def select(self, units, key=unit_name):
+        """Returns the units of this shard, in the given order.
+
+        Args:
+            units: Every unit of the run, the same on every shard
+            key: Gives the name of a unit, normalized paths by default
+
+        """
+        units = list(units)
+        assignment = assign([key(unit) for unit in units], self.count, self.timings)
+        return [unit for unit in units if assignment[key(unit)] == self.index]
+
+
+def load_timings(path):
+    """Reads the unit timings a merge wrote, an empty mapping when there are none."""
+    try:
+        with open(path) as ifile:
+            return json.load(ifile).get('timings', {})
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+class PartialSink(JsonLinesSink):
+    """Writes the partial result file of a shard.
+
+    Args:
+        stream: The text stream written to
+        shard: The Shard that is run
+        roots: The number of roots on the command line, to prefix the merged text report the same way
+        rules: The rules that are going to be evaluated
+
+    """
+
+    def __init__(self, stream, shard, roots, rules=()):
+        super(PartialSink, self).__init__(stream, rules)
+        self.shard = shard
+        self.roots = roots
+        self.timings = OrderedDict()
+
+    def record(self, unit, seconds):
+        self.timings[unit] = self.timings.get(unit, 0.0) + seconds
+
+    def _start(self):
+        header = OrderedDict([('version', PARTIAL_VERSION),
+                              ('library', __version__),
+                              ('shard', self.shard.index),
+                              ('count', self.shard.count),
+                              ('by', self.shard.by),
+                              ('roots', self.roots)])
+        self.stream.write('{}\n'.format(json.dumps({'partial': header})))
+
+    def _finish(self):
+        self.stream.write('{}\n'.format(json.dumps({'timings': self.timings, 'violations': self.count})))
+
+
+class PartialResult(object):
+    """What one shard found, read back from its partial result file."""
+
+    def __init__(self, header, violations, timings):
+        self.header = header
+        self.violations = violations
+        self.timings = timings
+
+    @classmethod
+    def load(cls, path):
+        header, violations, timings = None, [], None
+        with open(path) as ifile:
+            for line in ifile:
+                record = json.loads(line)
+                if 'partial' in record:
+                    header = record['partial']
+                elif 'timings' in record:
+                    timings = record['timings']
+                else:
+                    violations.append((record.get('root'), record_violation(record)))
+        if header is None or header.get('version') != PARTIAL_VERSION:
+            raise TerraformShardException('{} is not a partial result file'.format(path))
+        if timings is None:
+            raise TerraformShardException('{} is incomplete, its shard did not finish'.format(path))
+        return cls(header, violations, timings)
+
+
+def record_violation(record):
+    """Rebuilds a violation from its JSON record, with the exact message it was written with."""
+    template = record['message'].replace('{', '{{').replace('}', '}}')
+    return Violation(template, record['type'], record['name'], record['path'], record['expected'],
+                     record['actual'], record['rule'])
+
+
+def merge_partials(partials):
+    """Checks the partial results make up one whole run and combines them.
+
+    Args:
+        partials: PartialResult objects, one per shard
+
+    Returns:
+        tuple: The (root, violation) pairs of every shard sorted by root and message, the merged
+            unit timings and the number of roots of the run
+
+    Raises:
+        TerraformShardException: When the partials come from different runs or a shard is missing or repeated
+
+    """
+    if not partials:
+        raise TerraformShardException('No partial results to merge')
+    runs = {(partial.header['count'], partial.header['by'], partial.header['roots']) for partial in partials}
+    if len(runs) != 1:
+        raise TerraformShardException('The partial results come from differently sharded runs')
+    count = partials[0].header['count']
+    shards = sorted(partial.header['shard'] for partial in partials)
+    if shards != list(range(1, count + 1)):
+        raise TerraformShardException('Expected the results of shards 1 to {}, got {}'.format(
+            count, ', '.join(str(shard) for shard in shards)))
+    violations, timings = [], OrderedDict()
+    for partial in partials:
+        violations.extend(partial.violations)
+        for unit, seconds in partial.timings.items():
+            timings[unit] = timings.get(unit, 0.0) + seconds
+    violations.sort(key=lambda pair: (pair[0] or '', pair[1].message))
+    return violations, timings, partials[0].header['roots']
+
+
+def save_timings(path, by, timings):
+    with open(path, 'w') as ofile:
+        json.dump(OrderedDict([('version', PARTIAL_VERSION),
+                               ('by', by),
+                               ('timings', OrderedDict(sorted(timings.items())))]), ofile, indent=2)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: shared.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+shared module
+
+Publishes a loaded configuration in shared memory for worker processes.
+
+The configuration is encoded once in the snapshot layout into a block of shared
+memory. A worker attaches to the block by name and gets a validator whose
+resources are decoded from it per type on first use, so a worker only holds the
+resource types its rules select and nothing is pickled per worker::
+
+    with SharedConfig(validator) as shared:
+        # in every worker
+        worker_validator = attach(shared.name)
+
+The block is only read once published, whoever published it unlinks it on close.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import logging
+
+from .snapshot import Snapshot, encode_snapshot
+from .terraform_validate_patched import LOGGER_BASENAME, Validator
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+LOGGER = logging.getLogger('{}.shared'.format(LOGGER_BASENAME))
+
+
+def _shared_memory():
+    # only there from Python 3.8 on
+    from multiprocessing import shared_memory
+    return shared_memory
+
+
+class SharedConfig(object):
+    """The configuration of a validator copied into a block of shared memory.
+
+    Args:
+        validator: The loaded validator
+
+    """
+
+    def __init__(self, validator):
+        data = encode_snapshot(validator.terraform_config, validator.root, validator.source_files,
+                               validator.load_strategy)
+        self.memory = _shared_memory().SharedMemory(create=True, size=max(1, len(data)))
+        self.memory.buf[:len(data)] = data
+        self.name = self.memory.name
+        self.size = len(data)
+        LOGGER.debug('Published {} bytes of configuration as {}'.format(self.size, self.name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+
+def attach(name, variable_expand=False, raise_error_if_property_missing=False):
+    """Returns a validator reading the configuration published under name.
+
+    The block stays mapped as long as the configuration of the validator is referenced.
+
+    Args:
+        name: The name of the SharedConfig
+        variable_expand: The variable expansion setting of the validator
+        raise_error_if_property_missing: The missing property setting of the validator
+
+    """
+    memory = _shared_memory().SharedMemory(name=name)
+    snapshot = Snapshot.from_buffer(memory.buf, name, owner=memory)
+    validator = Validator({})
+    validator.terraform_config = snapshot.lazy_config()
+    validator.root = snapshot.root
+    validator.load_strategy = snapshot.load_strategy
+    validator.variable_expand = variable_expand
+    validator.raise_error_if_property_missing = raise_error_if_property_missing
+    return validator
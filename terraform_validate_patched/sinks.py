@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: sinks.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+sinks module
+
+Result sinks write violations to a stream as they are produced instead of keeping
+them, so the memory of a run does not grow with the number of violations. Text,
+a JSON document, JSON Lines, JUnit XML and SARIF are supported.
+
+A sink takes the place of a ViolationCollector anywhere one is accepted::
+
+    with open('violations.jsonl', 'w') as stream, JsonLinesSink(stream) as sink:
+        rule_set.run(validator, sink)
+
+    with open('report.xml', 'w') as stream, JUnitSink(stream) as sink:
+        for result in RuleRunner(rule_set, jobs=4).results(validator):
+            sink.add_result(result)
+
+Fed RuleResult objects with ``add_result`` the sinks also know about the rules
+that passed and write the violations of a rule sorted. A sink only holds counters,
+the stream is flushed every ``flush_every`` violations and when the sink is closed.
+Closing writes what the format needs at the end, like the closing tags of JUnit
+XML or the end of the SARIF result list.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import abc
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from xml.sax.saxutils import escape, quoteattr
+
+from ._version import __version__
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+TOOL_NAME = 'terraform-validate'
+INFORMATION_URI = 'https://github.com/schubergphilis/terraform_validate_patched'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+FLUSH_EVERY = 1000
+
+
+def resource_address(violation):
+    """The dotted type.name.path of what a violation is about."""
+    address = '{}.{}'.format(violation.resource_type, violation.resource_name)
+    return '{}.{}'.format(address, violation.path) if violation.path else address
+
+
+class ViolationSink(abc.ABC):
+    """Writes violations to a text stream as they are added, a format implements ``_write``.
+
+    Args:
+        stream: The text stream written to, it is flushed but never closed by the sink
+        rules: The rules that are going to be evaluated, used by formats that describe them up front
+        flush_every: Flush the stream after this many violations
+
+    """
+
+    def __init__(self, stream, rules=(), flush_every=FLUSH_EVERY):
+        self.stream = stream
+        self.rules = list(rules)
+        self.flush_every = flush_every
+        self.current_rule = None
+        self.current_root = None
+        self.count = 0
+        self.results = 0
+        self.failed_results = 0
+        self.closed = False
+        self._unflushed = 0
+        self._started = False
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def passed(self):
+        return not self.count
+
+    @contextmanager
+    def rule(self, name):
+        """Attributes every violation added inside the block to the named rule."""
+        previous = self.current_rule
+        self.current_rule = name
+        try:
+            yield self
+        finally:
+            self.current_rule = previous
+
+    @contextmanager
+    def root(self, path):
+        """Marks every violation added inside the block as found in the root at path."""
+        previous = self.current_root
+        self._ensure_started()
+        self.current_root = path
+        self._root_started(path)
+        try:
+            yield self
+        finally:
+            self._root_finished(path)
+            self.current_root = previous
+
+    def add(self, violations):
+        self._ensure_started()
+        for violation in violations:
+            if violation.rule is None:
+                violation.rule = self.current_rule
+            self._write(violation)
+            self.count += 1
+            self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def add_result(self, result):
+        """Writes the violations of a RuleResult sorted by message, a passing rule is recorded as such."""
+        self._ensure_started()
+        self.results += 1
+        if result.passed:
+            self._write_passed(result)
+        else:
+            self.failed_results += 1
+            with self.rule(result.rule):
+                self.add(sorted(result.violations, key=lambda violation: violation.message))
+
+    def flush(self):
+        self._unflushed = 0
+        self.stream.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        self._ensure_started()
+        self._finish()
+        self.closed = True
+        self.flush()
+
+    def _ensure_started(self):
+        if not self._started:
+            self._started = True
+            self._start()
+
+    def _start(self):
+        pass
+
+    def _root_started(self, path):
+        pass
+
+    def _root_finished(self, path):
+        pass
+
+    @abc.abstractmethod
+    def _write(self, violation):
+        """Writes one violation in the format of the sink, ``current_root`` is the root it was found in."""
+
+    def _write_passed(self, result):
+        pass
+
+    def _finish(self):
+        pass
+
+
+class TextSink(ViolationSink):
+    """One message per line, prefixed with the root when one is set and prefix_roots is on."""
+
+    prefix_roots = True
+
+    def _write(self, violation):
+        if self.current_root is None or not self.prefix_roots:
+            self.stream.write('{}\n'.format(violation.message))
+        else:
+            self.stream.write('{}: {}\n'.format(self.current_root, violation.message))
+
+
+class JsonLinesSink(ViolationSink):
+    """One JSON object per violation and line, with the root when one is set."""
+
+    def _write(self, violation):
+        record = violation.as_dict()
+        if self.current_root is not None:
+            record['root'] = self.current_root
+        self.stream.write(json.dumps(record, default=str))
+        self.stream.write('\n')
+
+
+class JsonSink(ViolationSink):
+    """A single JSON document, the violations are streamed into its list and the totals follow it."""
+
+    def _start(self):
+        self.stream.write('{{"version": {}, "violations": [\n'.format(json.dumps(__version__)))
+
+    def _write(self, violation):
+        record = violation.as_dict()
+        if self.current_root is not None:
+            record['root'] = self.current_root
+        self.stream.write('{}{}'.format(',\n' if self.count else '', json.dumps(record, default=str)))
+
+    def _finish(self):
+        self.stream.write('\n], "count": {}, "passed": {}}}\n'.format(self.count, json.dumps(self.passed)))
+
+
+class JUnitSink(ViolationSink):
+    """JUnit XML with a test suite per root and a failing test case per violation.
+
+    A test case is named after the offending resource and classed under its rule,
+    rules fed with ``add_result`` that passed get one passing test case. Suites
+    carry no totals since those are only known once the suite has been written.
+    """
+
+    def __init__(self, stream, rules=(), flush_every=FLUSH_EVERY):
+        super(JUnitSink, self).__init__(stream, rules, flush_every)
+        self._suite_open = False
+
+    def _start(self):
+        self.stream.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites name={}>\n'.format(
+            quoteattr(TOOL_NAME)))
+
+    def _open_suite(self, name):
+        self.stream.write('  <testsuite name={}>\n'.format(quoteattr(name)))
+        self._suite_open = True
+
+    def _close_suite(self):
+        if self._suite_open:
+            self.stream.write('  </testsuite>\n')
+            self._suite_open = False
+
+    def _root_started(self, path):
+        self._close_suite()
+        self._open_suite(path)
+
+    def _root_finished(self, path):
+        self._close_suite()
+
+    def _write(self, violation):
+        if not self._suite_open:
+            self._open_suite(TOOL_NAME)
+        self.stream.write('    <testcase classname={} name={}><failure type="AssertionError" message={}>{}'
+                          '</failure></testcase>\n'.format(quoteattr(str(violation.rule)),
+                                                           quoteattr(resource_address(violation)),
+                                                           quoteattr(violation.message),
+                                                           escape(violation.message)))
+
+    def _write_passed(self, result):
+        if not self._suite_open:
+            self._open_suite(TOOL_NAME)
+        self.stream.write('    <testcase classname={0} name={0} time="{1:.6f}"/>\n'.format(
+            quoteattr(result.rule), result.duration))
+
+    def _finish(self):
+        self._close_suite()
+        self.stream.write('</testsuites>\n')
+
+
+class SarifSink(ViolationSink):
+    """A SARIF 2.1.0 log, violations point at their resource as a logical location."""
+
+    def __init__(self, stream, rules=(), flush_every=FLUSH_EVERY):
+        super(SarifSink, self).__init__(stream, rules, flush_every)
+        self._indexes = {rule.name: index for index, rule in enumerate(self.rules)}
+
+    def _start(self):
+        rules = [OrderedDict([('id', rule.name),
+                              ('shortDescription', {'text': rule.description or '{} {}'.format(
+                                  '.'.join(rule.property_path) or 'resources', rule.assertion)}),
+                              ('properties', {'resources': rule.resources})])
+                 for rule in self.rules]
+        driver = OrderedDict([('name', TOOL_NAME),
+                              ('version', __version__),
+                              ('informationUri', INFORMATION_URI),
+                              ('rules', rules)])
+        header = json.dumps(OrderedDict([('$schema', SARIF_SCHEMA), ('version', '2.1.0')]))
+        # everything up to the result list, which is written one result at a time
+        self.stream.write('{}, "runs": [{{"tool": {{"driver": {}}}, "results": [\n'.format(
+            header[:-1], json.dumps(driver, default=str)))
+
+    def _write(self, violation):
+        result = OrderedDict([('ruleId', violation.rule)])
+        if violation.rule in self._indexes:
+            result['ruleIndex'] = self._indexes[violation.rule]
+        result['level'] = 'error'
+        result['message'] = {'text': violation.message}
+        result['locations'] = [{'logicalLocations': [{'fullyQualifiedName': resource_address(violation),
+                                                      'kind': 'resource'}]}]
+        if self.current_root is not None:
+            result['properties'] = {'root': self.current_root}
+        self.stream.write('{}{}'.format(',\n' if self.count else '', json.dumps(result, default=str)))
+
+    def _finish(self):
+        self.stream.write('\n]}]}\n')
+
+
+SINKS = OrderedDict([('text', TextSink),
+                     ('json', JsonSink),
+                     ('jsonl', JsonLinesSink),
+                     ('junit', JUnitSink),
+                     ('sarif', SarifSink)])
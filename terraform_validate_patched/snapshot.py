@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: snapshot.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+snapshot module
+
+A binary snapshot of a loaded configuration, written once and loaded by other jobs
+instead of walking and parsing the root again::
+
+    Validator('infra/').save_snapshot('infra.tfsnap')
+    validator = Validator.load_snapshot('infra.tfsnap')
+
+The file is laid out to be memory mapped::
+
+    header    magic, format version, marshal version, Python version, table of contents size
+    contents  JSON: the metadata, the files the configuration was loaded from with their size
+              and modification time, the names of the resources of every type and where every
+              section starts and ends
+    sections  the variable table, the other top level blocks and the resources of every type,
+              each in the marshal format and aligned to 8 bytes
+
+Only the table of contents is read on opening, a section is decoded straight from
+the mapping when asked for, so the resources of one type can be loaded without the
+others. Marshal data is only portable between interpreters of the same Python
+version, which is checked on opening.
+
+The same layout is read from any buffer with ``Snapshot.from_buffer``, like a block
+of shared memory, and ``lazy_config`` gives a configuration whose resources are
+only decoded once their type is looked up.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from ._version import __version__
+from .frozen import freeze, thaw
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+SNAPSHOT_MAGIC = b'TFVSNAP\0'
+SNAPSHOT_VERSION = 1
+# magic, snapshot format version, marshal version, Python major and minor version, table of contents size
+HEADER = struct.Struct('<8sHHBBxxI')
+ALIGNMENT = 8
+VARIABLES_SECTION = 'variable'
+BLOCKS_SECTION = 'blocks'
+RESOURCE_SECTION = 'resource/{}'
+
+
+class TerraformSnapshotException(Exception):
+    pass
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_snapshot(config, root=None, files=None, load_strategy=None):
+    """Encodes a parsed configuration in the snapshot layout.
+
+    Args:
+        config: The parsed configuration
+        root: The directory the configuration was loaded from
+        files: Mapping of the path of every loaded file to its (size, mtime_ns)
+        load_strategy: How the configuration was loaded
+
+    Returns:
+        bytes: The snapshot
+
+    """
+    resources = config.get('resource', {})
+    sections = [(VARIABLES_SECTION, config.get('variable', {})),
+                (BLOCKS_SECTION, {key: value for key, value in config.items() if key not in ('resource', 'variable')})]
+    sections.extend((RESOURCE_SECTION.format(resource_type), named) for resource_type, named in resources.items())
+    encoded, offsets, offset = [], [], 0
+    for name, value in sections:
+        try:
+            # marshal only writes plain dicts and lists
+            data = marshal.dumps(thaw(value))
+        except ValueError as error:
+            raise TerraformSnapshotException('Section {} cannot be written: {}'.format(name, error))
+        offsets.append([name, offset, len(data)])
+        encoded.append(data)
+        offset = _aligned(offset + len(data))
+    root = os.path.abspath(root) if root else None
+    contents = OrderedDict([('library', __version__),
+                            ('root', root),
+                            ('load_strategy', load_strategy),
+                            ('order', list(config)),
+                            ('files', [[os.path.relpath(file_path, root) if root else file_path, size, mtime]
+                                       for file_path, (size, mtime) in (files or {}).items()]),
+                            ('index', OrderedDict((resource_type, list(named))
+                                                  for resource_type, named in resources.items())),
+                            ('sections', offsets)])
+    contents = json.dumps(contents, separators=(',', ':')).encode('utf-8')
+    start = _aligned(HEADER.size + len(contents))
+    snapshot = bytearray(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, marshal.version, sys.version_info[0],
+                                     sys.version_info[1], len(contents)))
+    snapshot += contents
+    for (_, section_offset, _), data in zip(offsets, encoded):
+        snapshot += b'\0' * (start + section_offset - len(snapshot))
+        snapshot += data
+    return bytes(snapshot)
+
+
+def write_snapshot(path, config, root=None, files=None, load_strategy=None):
+    """Writes a parsed configuration to a snapshot file atomically, the arguments are those of encode_snapshot."""
+    snapshot = encode_snapshot(config, root, files, load_strategy)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(descriptor, 'wb') as ofile:
+            ofile.write(snapshot)
+        os.replace(temporary, path)
+    except Exception:
+        os.unlink(temporary)
+        raise
+
+
+class Snapshot(object):
+    """A snapshot file mapped into memory.
+
+    Args:
+        path: The snapshot file
+
+    Raises:
+        TerraformSnapshotException: When the file is not a snapshot or was written by another format or Python version
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'rb') as ifile:
+                self._map = mmap.mmap(ifile.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise TerraformSnapshotException('{} is empty'.format(path))
+        try:
+            self._read_contents()
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def from_buffer(cls, buffer, name='<buffer>', owner=None):
+        """Reads a snapshot held in a buffer.
+
+        Args:
+            buffer: The bytes-like object holding the snapshot
+            name: Names the snapshot in errors
+            owner: Kept referenced as long as the snapshot, like the shared memory block holding the buffer
+
+        """
+        snapshot = cls.__new__(cls)
+        snapshot.path = name
+        snapshot._map = buffer
+        snapshot._owner = owner
+        snapshot._read_contents()
+        return snapshot
+
+    def _read_contents(self):
+        if len(self._map) < HEADER.size:
+            raise TerraformSnapshotException('{} is not a snapshot'.format(self.path))
+        magic, version, marshal_version, major, minor, size = HEADER.unpack_from(self._map)
+        if magic != SNAPSHOT_MAGIC:
+            raise TerraformSnapshotException('{} is not a snapshot'.format(self.path))
+        if version != SNAPSHOT_VERSION:
+            raise TerraformSnapshotException('{} has snapshot format {}, expected {}'.format(self.path, version,
+                                                                                         SNAPSHOT_VERSION))
+        if (marshal_version, major, minor) != (marshal.version,) + tuple(sys.version_info[:2]):
+            raise TerraformSnapshotException('{} was written by Python {}.{}, it can only be loaded by that '
+                                             'version'.format(self.path, major, minor))
+        self.contents = json.loads(bytes(self._map[HEADER.size:HEADER.size + size]).decode('utf-8'))
+        start = _aligned(HEADER.size + size)
+        self.sections = {name: (start + offset, start + offset + length)
+                         for name, offset, length in self.contents['sections']}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Unmaps a snapshot file, a buffer is left to its owner."""
+        if isinstance(self._map, mmap.mmap) and not self._map.closed:
+            self._map.close()
+
+    @property
+    def root(self):
+        return self.contents['root']
+
+    @property
+    def load_strategy(self):
+        return self.contents['load_strategy']
+
+    @property
+    def index(self):
+        """The names of the resources of every type, read without decoding any section."""
+        return self.contents['index']
+
+    def files(self, root=None):
+        """The loaded files with their (size, mtime_ns), relative to root, the root they were loaded from by default."""
+        root = root or self.root
+        return OrderedDict((os.path.join(root, name) if root else name, (size, mtime))
+                           for name, size, mtime in self.contents['files'])
+
+    def stale_files(self, root=None):
+        """Lists the loaded files that changed or disappeared since the snapshot, new files are not noticed."""
+        stale = []
+        for file_path, (size, mtime) in self.files(root).items():
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                stale.append(file_path)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                stale.append(file_path)
+        return stale
+
+    def section(self, name):
+        try:
+            start, end = self.sections[name]
+        except KeyError:
+            raise TerraformSnapshotException('{} has no section {}'.format(self.path, name))
+        view = memoryview(self._map)[start:end]
+        try:
+            return marshal.loads(view)
+        finally:
+            view.release()
+
+    def resources(self, resource_type):
+        """Decodes the resources of one type only."""
+        return self.section(RESOURCE_SECTION.format(resource_type))
+
+    def config(self):
+        """Decodes the whole configuration, with its top level blocks in the order they were loaded in."""
+        config = self.config_without_resources()
+        if 'resource' in config:
+            config['resource'] = {resource_type: self.resources(resource_type) for resource_type in self.index}
+        return config
+
+    def lazy_config(self):
+        """The configuration with its resources decoded per type on first use, the snapshot has to stay open."""
+        config = self.config_without_resources()
+        if 'resource' in config:
+            config['resource'] = LazyResources(self)
+        return config
+
+    def config_without_resources(self):
+        blocks = self.section(BLOCKS_SECTION)
+        blocks['variable'] = self.section(VARIABLES_SECTION)
+        blocks['resource'] = None
+        return {key: blocks[key] for key in self.contents['order']}
+
+
+class LazyResources(Mapping):
+    """The resources of a snapshot by type, the resources of a type are decoded when it is first looked up."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.decoded = {}
+
+    def __getitem__(self, resource_type):
+        named = self.decoded.get(resource_type)
+        if named is None:
+            if resource_type not in self.snapshot.index:
+                raise KeyError(resource_type)
+            named = self.decoded[resource_type] = freeze(self.snapshot.resources(resource_type))
+        return named
+
+    def __iter__(self):
+        return iter(self.snapshot.index)
+
+    def __len__(self):
+        return len(self.snapshot.index)
+
+    def __contains__(self, resource_type):
+        return resource_type in self.snapshot.index
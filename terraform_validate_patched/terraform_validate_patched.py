@@ -1,12 +1,35 @@
-import hcl
 import os
 import re
+import time
 import warnings
 import logging
 import json
+from collections import OrderedDict
+from contextlib import closing
+from .query import compile_query, format_path, TerraformQueryException
+from .columns import TerraformPropertyColumns
+from . import hclparser
+from .violations import Violation, ViolationCollector, format_violations
+from .instrumentation import OperationCounters, PhaseTimers, timed
+from .fingerprints import canonical, resource_fingerprints
+from .filesystem import READ_WORKERS, PrefetchReader
+from .frozen import derived, freeze
+from .snapshot import Snapshot, TerraformSnapshotException, write_snapshot
 
 # This is the main prefix used for logging
 LOGGER_BASENAME = '''TerraformValidate'''
+
+REGEX_CACHE_SIZE = 512
+# Distinct values remembered per memoized assertion and arguments.
+ASSERTION_CACHE_SIZE = 4096
+# Distinct strings whose expansion is remembered per variable table.
+EXPANSION_CACHE_SIZE = 4096
+CONCATENATE, PER_FILE = LOAD_STRATEGIES = ('concatenate', 'per_file')
+# The load strategy of validators loaded with Validator.load_snapshot.
+SNAPSHOT = 'snapshot'
+# Peak traced memory of parsing the concatenated files, per byte of Terraform, measured on the benchmark corpus.
+CONCATENATE_MEMORY_PER_BYTE = 8
+_REGEX_CACHE = {}
 LOGGER = logging.getLogger(LOGGER_BASENAME)
 LOGGER.addHandler(logging.NullHandler())
 
@@ -25,6 +48,62 @@ def is_test_skipped(resource):
     return True if resource.config.get('tags', {}).get(skip_tag, False) == 'true' else False
 
 
+def value_key(value):
+    """A hashable key equal for equal parsed values, strings are their own key.
+
+    The key of a dict or list is rendered once per frozen node and cached on it, frozen
+    and plain containers holding the same values have the same key.
+    """
+    if isinstance(value, str):
+        return value
+    if value is None or isinstance(value, (bool, int, float)):
+        return type(value).__name__, value
+    kind = 'dict' if isinstance(value, dict) else 'list' if isinstance(value, list) else type(value).__name__
+    return derived(value, 'value_key', lambda: (kind, canonical(value)))
+
+
+def normalize_value(value):
+    """The value equality assertions compare, ints become their string, booleans and their string "True" or "False"."""
+    if type(value) is int:
+        value = str(value)
+    if str(value).lower() == "true":
+        return "True"
+    if str(value).lower() == "false":
+        return "False"
+    return value
+
+
+def property_violation(template, property, expected=None, actual=None):
+    name, _, parent_path = property.resource_name.partition('.')
+    path = '{0}.{1}'.format(parent_path, property.property_name) if parent_path else property.property_name
+    return Violation(template, property.resource_type, name, path, expected, actual)
+
+
+class QueryOptions(object):
+    """Settings a query and everything derived from it is evaluated with.
+
+    Options are captured when a query is started with ``Validator.resources`` and
+    travel with the resulting resource and property lists, so concurrent queries on
+    one validator never see each other's settings.
+    """
+
+    __slots__ = ('variable_expand', 'raise_error_if_property_missing', 'collector')
+
+    def __init__(self, variable_expand=False, raise_error_if_property_missing=False, collector=None):
+        self.variable_expand = variable_expand
+        self.raise_error_if_property_missing = raise_error_if_property_missing
+        self.collector = collector
+
+    def __repr__(self):
+        return ('<QueryOptions variable_expand={0} raise_error_if_property_missing={1} '
+                'collector={2}>').format(self.variable_expand, self.raise_error_if_property_missing, self.collector)
+
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return QueryOptions(**values)
+
+
 class TerraformSyntaxException(Exception):
     pass
 
@@ -77,16 +156,48 @@ class TerraformVariableParser:
 
 class TerraformPropertyList:
 
-    def __init__(self, validator):
+    def __init__(self, validator, options=None):
         self.properties = []
         self.validator = validator
+        if options is None:
+            options = validator.options() if validator is not None else QueryOptions()
+        self.options = options
 
     def tfproperties(self):
         return self.properties
 
+    def _failures(self, assertion, arguments, evaluate):
+        """Yields the failing properties and their actual value, evaluating every distinct value once.
+
+        Args:
+            assertion: The name of the assertion, with arguments part of the memo key
+            arguments: The arguments of the assertion
+            evaluate: Called with a property value, returns whether it fails and the actual value to report
+
+        """
+        memo = self.validator.assertion_memo(assertion, arguments, self.options.variable_expand)
+        counters = self.validator.counters
+        for property in self.properties:
+            key = value_key(property.property_value)
+            outcome = memo.get(key)
+            if outcome is None:
+                counters.increment('assertion_cache_misses')
+                outcome = evaluate(property.property_value)
+                if len(memo) >= ASSERTION_CACHE_SIZE:
+                    memo.clear()
+                memo[key] = outcome
+            else:
+                counters.increment('assertion_cache_hits')
+            if outcome[0]:
+                yield property, outcome[1]
+
+    def _expanded(self, value):
+        return self.validator.substitute_variable_values_in_string(value, self.options.variable_expand)
+
+    @timed('select')
     def property(self, property_name):
         errors = []
-        result = TerraformPropertyList(self.validator)
+        result = TerraformPropertyList(self.validator, self.options)
         for property in self.properties:
             def _check_prop(prop_value):
                 if property_name in prop_value.keys():
@@ -95,12 +206,10 @@ class TerraformPropertyList:
                                                                                 property.property_name),
                                                                property_name,
                                                                prop_value[property_name]))
-                elif self.validator.raise_error_if_property_missing:
-                    errors.append("[{0}.{1}] should have property: '{2}'".format(property.resource_type,
-                                                                                 "{0}.{1}".format(
-                                                                                     property.resource_name,
-                                                                                     property.property_name),
-                                                                                 property_name))
+                elif self.options.raise_error_if_property_missing:
+                    errors.append(property_violation("[{type}.{name}.{path}] should have property: '{expected}'",
+                                                     property,
+                                                     expected=property_name))
 
             if isinstance(property.property_value, list):
                 for prop in property.property_value:
@@ -108,52 +217,43 @@ class TerraformPropertyList:
             else:
                 _check_prop(property.property_value)
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        self.validator.counters.increment('properties', len(result.properties))
+        self.validator.report_violations(errors, self.options.collector)
 
         return result
 
+    @timed('assert')
     def should_equal(self, expected_value):
-        errors = []
-        for property in self.properties:
+        expected_value = normalize_value(expected_value)
 
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
+        def evaluate(value):
+            actual_property_value = normalize_value(self._expanded(value))
+            return actual_property_value != expected_value, actual_property_value
 
-            expected_value = self.int2str(expected_value)
-            actual_property_value = self.int2str(actual_property_value)
-            expected_value = self.bool2str(expected_value)
-            actual_property_value = self.bool2str(actual_property_value)
-
-            if actual_property_value != expected_value:
-                errors.append("[{0}.{1}.{2}] should be '{3}'. Is: '{4}'".format(property.resource_type,
-                                                                                property.resource_name,
-                                                                                property.property_name,
-                                                                                expected_value,
-                                                                                actual_property_value))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        errors = [property_violation("[{type}.{name}.{path}] should be '{expected}'. Is: '{actual}'",
+                                     property,
+                                     expected=expected_value,
+                                     actual=actual_property_value)
+                  for property, actual_property_value in self._failures('should_equal', expected_value, evaluate)]
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def should_not_equal(self, expected_value):
-        errors = []
-        for property in self.properties:
-
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
+        expected_value = normalize_value(expected_value)
 
-            actual_property_value = self.int2str(actual_property_value)
-            expected_value = self.int2str(expected_value)
-            expected_value = self.bool2str(expected_value)
-            actual_property_value = self.bool2str(actual_property_value)
+        def evaluate(value):
+            actual_property_value = normalize_value(self._expanded(value))
+            return actual_property_value == expected_value, actual_property_value
 
-            if actual_property_value == expected_value:
-                errors.append("[{0}.{1}.{2}] should not be '{3}'. Is: '{4}'".format(property.resource_type,
-                                                                                    property.resource_name,
-                                                                                    property.property_name,
-                                                                                    expected_value,
-                                                                                    actual_property_value))
-
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        errors = [property_violation("[{type}.{name}.{path}] should not be '{expected}'. Is: '{actual}'",
+                                     property,
+                                     expected=expected_value,
+                                     actual=actual_property_value)
+                  for property, actual_property_value in self._failures('should_not_equal', expected_value,
+                                                                        evaluate)]
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def list_should_contain(self, values_list):
         errors = []
 
@@ -162,23 +262,23 @@ class TerraformPropertyList:
 
         for property in self.properties:
 
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
+            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value,
+                                                                                        self.options.variable_expand)
             values_missing = []
             for value in values_list:
                 if value not in actual_property_value:
                     values_missing.append(value)
 
             if len(values_missing) != 0:
-                if type(actual_property_value) is list:
+                if isinstance(actual_property_value, list):
                     actual_property_value = [str(x) for x in actual_property_value]  # fix 2.6/7
-                errors.append("[{0}.{1}.{2}] '{3}' should contain '{4}'.".format(property.resource_type,
-                                                                                 property.resource_name,
-                                                                                 property.property_name,
-                                                                                 actual_property_value,
-                                                                                 values_missing))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                errors.append(property_violation("[{type}.{name}.{path}] '{actual}' should contain '{expected}'.",
+                                                 property,
+                                                 expected=values_missing,
+                                                 actual=actual_property_value))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def list_should_not_contain(self, values_list):
         errors = []
 
@@ -187,23 +287,23 @@ class TerraformPropertyList:
 
         for property in self.properties:
 
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
+            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value,
+                                                                                        self.options.variable_expand)
             values_missing = []
             for value in values_list:
                 if value in actual_property_value:
                     values_missing.append(value)
 
             if len(values_missing) != 0:
-                if type(actual_property_value) is list:
+                if isinstance(actual_property_value, list):
                     actual_property_value = [str(x) for x in actual_property_value]  # fix 2.6/7
-                errors.append("[{0}.{1}.{2}] '{3}' should not contain '{4}'.".format(property.resource_type,
-                                                                                     property.resource_name,
-                                                                                     property.property_name,
-                                                                                     actual_property_value,
-                                                                                     values_missing))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                errors.append(property_violation("[{type}.{name}.{path}] '{actual}' should not contain '{expected}'.",
+                                                 property,
+                                                 expected=values_missing,
+                                                 actual=actual_property_value))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def should_have_properties(self, properties_list):
         errors = []
 
@@ -214,13 +314,12 @@ class TerraformPropertyList:
             property_names = property.property_value.keys()
             for required_property_name in properties_list:
                 if required_property_name not in property_names:
-                    errors.append("[{0}.{1}.{2}] should have property: '{3}'".format(property.resource_type,
-                                                                                     property.resource_name,
-                                                                                     property.property_name,
-                                                                                     required_property_name))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                    errors.append(property_violation("[{type}.{name}.{path}] should have property: '{expected}'",
+                                                     property,
+                                                     expected=required_property_name))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def should_not_have_properties(self, properties_list):
         errors = []
 
@@ -231,16 +330,14 @@ class TerraformPropertyList:
             property_names = property.property_value.keys()
             for excluded_property_name in properties_list:
                 if excluded_property_name in property_names:
-                    errors.append(
-                        "[{0}.{1}.{2}] should not have property: '{3}'".format(property.resource_type,
-                                                                               property.resource_name,
-                                                                               property.property_name,
-                                                                               excluded_property_name))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                    errors.append(property_violation("[{type}.{name}.{path}] should not have property: '{expected}'",
+                                                     property,
+                                                     expected=excluded_property_name))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('select')
     def find_property(self, regex):
-        list = TerraformPropertyList(self.validator)
+        list = TerraformPropertyList(self.validator, self.options)
         for property in self.properties:
             for nested_property in property.property_value:
                 if self.validator.matches_regex_pattern(nested_property, regex):
@@ -249,33 +346,47 @@ class TerraformPropertyList:
                                                                               property.property_name),
                                                              nested_property,
                                                              property.property_value[nested_property]))
+        self.validator.counters.increment('properties', len(list.properties))
         return list
 
+    @timed('assert')
     def should_match_regex(self, regex):
-        errors = []
-        for property in self.properties:
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
-            if not self.validator.matches_regex_pattern(actual_property_value, regex):
-                errors.append("[{0}.{1}] should match regex '{2}'".format(property.resource_type,
-                                                                          "{0}.{1}".format(property.resource_name,
-                                                                                           property.property_name),
-                                                                          regex))
-
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
-
+        def evaluate(value):
+            actual_property_value = self._expanded(value)
+            return not self.validator.matches_regex_pattern(actual_property_value, regex), actual_property_value
+
+        errors = [property_violation("[{type}.{name}.{path}] should match regex '{expected}'",
+                                     property,
+                                     expected=regex,
+                                     actual=actual_property_value)
+                  for property, actual_property_value in self._failures('should_match_regex', regex, evaluate)]
+        self.validator.report_violations(errors, self.options.collector)
+
+    @timed('assert')
     def should_contain_valid_json(self):
-        errors = []
-        for property in self.properties:
-            actual_property_value = self.validator.substitute_variable_values_in_string(property.property_value)
+        def evaluate(value):
+            actual_property_value = self._expanded(value)
+            self.validator.counters.increment('json_decodes')
             try:
-                json_object = json.loads(actual_property_value)
+                json.loads(actual_property_value)
             except:
-                errors.append("[{0}.{1}.{2}] is not valid json".format(property.resource_type, property.resource_name,
-                                                                       property.property_name))
+                return True, actual_property_value
+            return False, actual_property_value
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        errors = [property_violation("[{type}.{name}.{path}] is not valid json",
+                                     property,
+                                     actual=actual_property_value)
+                  for property, actual_property_value in self._failures('should_contain_valid_json', None, evaluate)]
+        self.validator.report_violations(errors, self.options.collector)
+
+    @timed('select')
+    def columns(self, backend=None):
+        rows = [(property.resource_type, property.resource_name, property.property_name, property.property_value)
+                for property in self.properties]
+        return TerraformPropertyColumns(self.validator, rows, self.normalize_value, backend, self.options)
+
+    def normalize_value(self, value):
+        return normalize_value(value)
 
     def bool2str(self, bool):
         if str(bool).lower() in ["true"]:
@@ -312,7 +423,7 @@ class TerraformResource:
 
 class TerraformResourceList:
 
-    def __init__(self, validator, resource_types, resources):
+    def __init__(self, validator, resource_types, resources, options=None):
         logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
                                                 suffix=self.__class__.__name__)
         self._logger = logging.getLogger(logger_name)
@@ -335,29 +446,57 @@ class TerraformResourceList:
                     else:
                         self._logger.warning('Skipping resource {}/{} due to user override tag'.format(resource_type,
                                                                                                       resource))
+        validator.counters.increment('resources', len(self.resource_list))
 
         self.resource_types = resource_types
         self.validator = validator
+        self.options = options if options is not None else validator.options()
+
+    def with_options(self, options):
+        result = TerraformResourceList(self.validator, self.resource_types, {}, options)
+        result.resource_list = self.resource_list
+        return result
 
+    @timed('select')
     def property(self, property_name):
         errors = []
-        list = TerraformPropertyList(self.validator)
+        list = TerraformPropertyList(self.validator, self.options)
         if len(self.resource_list) > 0:
             for resource in self.resource_list:
                 if property_name in resource.config.keys():
                     list.properties.append(
                         TerraformProperty(resource.type, resource.name, property_name, resource.config[property_name]))
-                elif self.validator.raise_error_if_property_missing:
-                    errors.append(
-                        "[{0}.{1}] should have property: '{2}'".format(resource.type, resource.name, property_name))
+                elif self.options.raise_error_if_property_missing:
+                    errors.append(Violation("[{type}.{name}] should have property: '{expected}'",
+                                            resource.type,
+                                            resource.name,
+                                            expected=property_name))
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        self.validator.counters.increment('properties', len(list.properties))
+        self.validator.report_violations(errors, self.options.collector)
 
         return list
 
+    @timed('select')
+    def columns(self, property_name, backend=None):
+        errors = []
+        rows = []
+        for resource in self.resource_list:
+            if property_name in resource.config:
+                rows.append((resource.type, resource.name, property_name, resource.config[property_name]))
+            elif self.options.raise_error_if_property_missing:
+                errors.append(Violation("[{type}.{name}] should have property: '{expected}'",
+                                        resource.type,
+                                        resource.name,
+                                        expected=property_name))
+
+        self.validator.report_violations(errors, self.options.collector)
+
+        return TerraformPropertyColumns(self.validator, rows, normalize_value, backend, self.options)
+
+    @timed('select')
     def find_property(self, regex):
-        list = TerraformPropertyList(self.validator)
+        list = TerraformPropertyList(self.validator, self.options)
         if len(self.resource_list) > 0:
             for resource in self.resource_list:
                 for property in resource.config:
@@ -366,10 +505,12 @@ class TerraformResourceList:
                                                                  resource.name,
                                                                  property,
                                                                  resource.config[property]))
+        self.validator.counters.increment('properties', len(list.properties))
         return list
 
+    @timed('select')
     def with_property(self, property_name, regex):
-        list = TerraformResourceList(self.validator, self.resource_types, {})
+        list = TerraformResourceList(self.validator, self.resource_types, {}, self.options)
 
         if len(self.resource_list) > 0:
             for resource in self.resource_list:
@@ -378,12 +519,13 @@ class TerraformResourceList:
                         tf_property = TerraformProperty(resource.type, resource.name, property_name,
                                                         resource.config[property_name])
                         actual_property_value = self.validator.substitute_variable_values_in_string(
-                            tf_property.property_value)
+                            tf_property.property_value, self.options.variable_expand)
                         if self.validator.matches_regex_pattern(actual_property_value, regex):
                             list.resource_list.append(resource)
 
         return list
 
+    @timed('assert')
     def should_have_properties(self, properties_list):
         errors = []
 
@@ -395,13 +537,13 @@ class TerraformResourceList:
                 property_names = resource.config.keys()
                 for required_property_name in properties_list:
                     if required_property_name not in property_names:
-                        errors.append(
-                            "[{0}.{1}] should have property: '{2}'".format(resource.type,
-                                                                           resource.name,
-                                                                           required_property_name))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                        errors.append(Violation("[{type}.{name}] should have property: '{expected}'",
+                                                resource.type,
+                                                resource.name,
+                                                expected=required_property_name))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def should_not_have_properties(self, properties_list):
         errors = []
 
@@ -413,21 +555,24 @@ class TerraformResourceList:
                 property_names = resource.config.keys()
                 for excluded_property_name in properties_list:
                     if excluded_property_name in property_names:
-                        errors.append(
-                            "[{0}.{1}] should not have property: '{2}'".format(resource.type,
-                                                                               resource.name,
-                                                                               excluded_property_name))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+                        errors.append(Violation("[{type}.{name}] should not have property: '{expected}'",
+                                                resource.type,
+                                                resource.name,
+                                                expected=excluded_property_name))
+        self.validator.report_violations(errors, self.options.collector)
 
+    @timed('assert')
     def name_should_match_regex(self, regex):
         errors = []
         for resource in self.resource_list:
             if not self.validator.matches_regex_pattern(resource.name, regex):
-                errors.append("[{0}.{1}] name should match regex '{2}'".format(resource.type, resource.name, regex))
+                errors.append(Violation("[{type}.{name}] name should match regex '{expected}'",
+                                        resource.type,
+                                        resource.name,
+                                        expected=regex,
+                                        actual=resource.name))
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        self.validator.report_violations(errors, self.options.collector)
 
 
 class TerraformVariable:
@@ -437,60 +582,238 @@ class TerraformVariable:
         self.name = name
         self.value = value
 
+    @timed('assert')
     def default_value_exists(self):
         errors = []
         if self.value == None:
-            errors.append("Variable '{0}' should have a default value".format(self.name))
+            errors.append(Violation("Variable '{name}' should have a default value", 'variable', self.name))
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        self.validator.report_violations(errors)
 
+    @timed('assert')
     def default_value_equals(self, expected_value):
         errors = []
 
         if self.value != expected_value:
-            errors.append("Variable '{0}' should have a default value of {1}. Is: {2}".format(self.name,
-                                                                                              expected_value,
-                                                                                              self.value))
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
-
+            errors.append(Violation("Variable '{name}' should have a default value of {expected}. Is: {actual}",
+                                    'variable',
+                                    self.name,
+                                    expected=expected_value,
+                                    actual=self.value))
+        self.validator.report_violations(errors)
+
+    @timed('assert')
     def default_value_matches_regex(self, regex):
         errors = []
         if not self.validator.matches_regex_pattern(self.value, regex):
-            errors.append(
-                "Variable '{0}' should have a default value that matches regex '{1}'. Is: {2}".format(self.name, regex,
-                                                                                                      self.value))
+            errors.append(Violation("Variable '{name}' should have a default value that matches regex '{expected}'. "
+                                    "Is: {actual}",
+                                    'variable',
+                                    self.name,
+                                    expected=regex,
+                                    actual=self.value))
 
-        if len(errors) > 0:
-            raise AssertionError("\n".join(sorted(errors)))
+        self.validator.report_violations(errors)
 
 
 class Validator:
+    """Loads a Terraform directory and queries its resources.
+
+    Args:
+        path: A directory to load or an already parsed configuration
+        profile_memory: Track the peak and retained memory of every phase with tracemalloc
+        memory_budget: Bytes loading may take at most, above it the files are parsed and merged
+            one by one instead of concatenated and parsed as a whole
+        read_workers: Threads reading files ahead of the parser, 1 reads them one by one
+        filesystem: The filesystem the files are read from, see the filesystem module, the local one by default
 
-    def __init__(self, path=None):
+    """
+
+    def __init__(self, path=None, profile_memory=False, memory_budget=None, read_workers=READ_WORKERS,
+                 filesystem=None):
         logger_name = u'{base}.{suffix}'.format(base=LOGGER_BASENAME,
                                                 suffix=self.__class__.__name__)
         self._logger = logging.getLogger(logger_name)
         self.variable_expand = False
         self.raise_error_if_property_missing = False
-        if type(path) is not dict:
+        self.violation_collector = None
+        self.memory_budget = memory_budget
+        self.read_workers = read_workers
+        self.filesystem = filesystem
+        self.load_strategy = None
+        self.root = None
+        # The size and modification time of every loaded file, by path.
+        self.source_files = OrderedDict()
+        self._fingerprints = (None, None)
+        self._assertion_memos = (None, {})
+        self.timers = PhaseTimers(memory=profile_memory)
+        self.counters = OperationCounters()
+        self._terraform_config = None
+        if not isinstance(path, dict):
             if path is not None:
                 self.terraform_config = self.parse_terraform_directory(path)
         else:
             self.terraform_config = path
 
-    def resources(self, type):
-        if 'resource' not in self.terraform_config.keys():
-            resources = {}
-        else:
-            resources = self.terraform_config['resource']
+    @property
+    def terraform_config(self):
+        """The loaded configuration, a frozen tree, see the frozen module for how to change it."""
+        return self._terraform_config
 
-        return TerraformResourceList(self, type, resources)
+    @terraform_config.setter
+    def terraform_config(self, config):
+        self._terraform_config = freeze(config)
+
+    def resources(self, type, options=None, **changes):
+        with self.timers.phase('select'):
+            if 'resource' not in self.terraform_config.keys():
+                resources = {}
+            else:
+                resources = self.terraform_config['resource']
+
+            options = options.replace(**changes) if options is not None else self.options(**changes)
+            return TerraformResourceList(self, type, resources, options)
+
+    def options(self, **changes):
+        return QueryOptions(self.variable_expand,
+                            self.raise_error_if_property_missing,
+                            self.violation_collector).replace(**changes)
+
+    def fingerprints(self):
+        """Returns the content hash of every resource keyed by (type, name), computed once per configuration."""
+        config, fingerprints = self._fingerprints
+        if config is not self.terraform_config:
+            with self.timers.phase('select'):
+                fingerprints = resource_fingerprints(self.terraform_config)
+            self._fingerprints = (self.terraform_config, fingerprints)
+        return fingerprints
+
+    def assertion_memo(self, assertion, arguments, variable_expand):
+        """Returns the outcomes of an assertion with given arguments, keyed by ``value_key`` of the checked value.
+
+        The memos are dropped when the configuration is replaced, since expanded values depend on its variables.
+        """
+        config, memos = self._assertion_memos
+        if config is not self.terraform_config:
+            memos = {}
+            self._assertion_memos = (self.terraform_config, memos)
+        key = (assertion, canonical(arguments), variable_expand)
+        memo = memos.get(key)
+        if memo is None:
+            memo = memos.setdefault(key, {})
+        return memo
+
+    def save_snapshot(self, path):
+        """Writes the configuration, the resources of every type and the loaded files to a snapshot file.
+
+        The file can be loaded by ``load_snapshot`` in another process instead of parsing the root again.
+        """
+        write_snapshot(path, self.terraform_config, self.root, self.source_files, self.load_strategy)
+
+    @classmethod
+    def load_snapshot(cls, path, check=False, **kwargs):
+        """Loads a validator from a snapshot file written by ``save_snapshot``.
+
+        Args:
+            path: The snapshot file
+            check: Raise when a file the snapshot was made of changed since
+            **kwargs: Passed on to the Validator
+
+        Raises:
+            TerraformSnapshotException: When the file is no usable snapshot or, with check, is out of date
+
+        """
+        validator = cls({}, **kwargs)
+        with validator.timers.phase('read'):
+            snapshot = Snapshot(path)
+        with snapshot:
+            if check:
+                stale = snapshot.stale_files()
+                if stale:
+                    raise TerraformSnapshotException('{} is out of date, {} changed'.format(path, ', '.join(stale)))
+            with validator.timers.phase('parse'):
+                validator.terraform_config = snapshot.config()
+            validator.root = snapshot.root
+            validator.source_files = snapshot.files()
+        validator.load_strategy = SNAPSHOT
+        return validator
+
+    @classmethod
+    async def aload(cls, path, executor=None, limit=None, jobs=None, **kwargs):
+        """Loads a validator without blocking the event loop, the arguments are those of ``aio.load``."""
+        from .aio import load
+        return await load(path, executor, limit, jobs, **kwargs)
+
+    def restricted_to(self, resources):
+        """Returns a validator with the settings and variables of this one, holding only some of its resources.
+
+        Args:
+            resources: The (type, name) of the resources to keep
+
+        """
+        resources = set(resources)
+        config = dict(self.terraform_config)
+        kept = {}
+        available = config.get('resource', {})
+        resource_types = {resource_type for resource_type, _ in resources}
+        # only the types asked for are looked up, a lazily decoded configuration decodes nothing else
+        for resource_type in [resource_type for resource_type in available if resource_type in resource_types]:
+            named = available[resource_type]
+            selected = {name: value for name, value in named.items() if (resource_type, name) in resources}
+            if selected:
+                kept[resource_type] = selected
+        config['resource'] = kept
+        validator = Validator(config)
+        validator.variable_expand = self.variable_expand
+        validator.raise_error_if_property_missing = self.raise_error_if_property_missing
+        validator.violation_collector = self.violation_collector
+        return validator
+
+    def stats(self, slowest=None):
+        """Returns the time spent per phase, the slowest files to parse and the operation counts.
+
+        Args:
+            slowest: How many of the slowest files to list, defaults to the timers' setting
+
+        Returns:
+            OrderedDict: The 'phases', total 'wall' and 'cpu', number of 'files', 'slowest_files', the
+                'counters', the 'cache_hit_rates' and the 'load_strategy'. Phases hold 'peak' and 'retained'
+                bytes when memory was profiled
+
+        """
+        stats = self.timers.as_dict(slowest)
+        stats['load_strategy'] = self.load_strategy
+        counts = self.counts()
+        stats['counters'] = counts
+        stats['cache_hit_rates'] = counts.hit_rates()
+        return stats
+
+    def counts(self):
+        return self.counters.totals()
+
+    def counting(self):
+        """Returns a context manager counting the operations done by the calling thread inside the block."""
+        return self.counters.scope()
+
+    def enable_memory_profiling(self):
+        self.timers.enable_memory()
+
+    def disable_memory_profiling(self):
+        self.timers.disable_memory()
+
+    def log_stats(self, level=logging.INFO, slowest=None):
+        self.timers.log(level, slowest)
+
+    def reset_stats(self):
+        self.timers.reset()
+        self.counters.reset()
 
     def variable(self, name):
         return TerraformVariable(self, name, self.get_terraform_variable_value(name))
 
+    def query(self, expression):
+        return list(compile_query(expression, self.counters).evaluate(self.terraform_config))
+
     def enable_variable_expansion(self):
         self.variable_expand = True
 
@@ -500,6 +823,24 @@ class Validator:
     def error_if_property_missing(self):
         self.raise_error_if_property_missing = True
 
+    def enable_violation_collection(self, collector=None):
+        self.violation_collector = collector if collector is not None else ViolationCollector()
+        return self.violation_collector
+
+    def disable_violation_collection(self):
+        collector = self.violation_collector
+        self.violation_collector = None
+        return collector
+
+    def report_violations(self, violations, collector=None):
+        if not violations:
+            return
+        collector = collector if collector is not None else self.violation_collector
+        if collector is not None:
+            collector.add(violations)
+        else:
+            raise AssertionError(format_violations(violations))
+
     def read_terraform_file(self, fullpath):
         with open(fullpath) as fp:
             new_terraform = fp.read()
@@ -598,19 +939,60 @@ class Validator:
     #     return terraform
 
     def parse_terraform_directory(self, path):
-        terraform_string = ""
-        for directory, subdirectories, files in os.walk(path):
-            for ifile in files:
-                if ifile.endswith(".tf"):
-                    with open(os.path.join(directory, ifile)) as fp:
-                        new_terraform = fp.read()
-                        try:
-                            hcl.loads(new_terraform)
-                        except ValueError:
-                            self._logger.debug('Terraform plan {} is empty, skipping'.format(ifile))
-                            continue
-                        terraform_string += new_terraform
-        terraform = hcl.loads(terraform_string)
+        self.root = path
+        # the files are read on a thread pool while the ones read before are parsed
+        with PrefetchReader(self.filesystem, self.read_workers) as reader:
+            with self.timers.phase('walk'):
+                paths = reader.walk(path)
+            self.load_strategy = self.choose_load_strategy(paths, reader.size)
+            if self.load_strategy == PER_FILE:
+                return self._parse_per_file(reader, paths)
+            return self._parse_concatenated(reader, paths)
+
+    def choose_load_strategy(self, paths, file_size=os.path.getsize):
+        """Returns PER_FILE when concatenating the files is expected to take more memory than the budget."""
+        if self.memory_budget is None:
+            return CONCATENATE
+        size = sum(file_size(file_path) for file_path in paths)
+        estimate = size * CONCATENATE_MEMORY_PER_BYTE
+        if estimate <= self.memory_budget:
+            return CONCATENATE
+        self._logger.info('Loading {} bytes of Terraform is estimated to take {} bytes, over the budget of {}, '
+                          'parsing file by file'.format(size, estimate, self.memory_budget))
+        return PER_FILE
+
+    def _read_terraform_files(self, reader, paths, parse):
+        with closing(reader.read(paths)) as files:
+            for _ in paths:
+                # only the time spent waiting for a file counts, reading ahead overlaps with parsing
+                with self.timers.phase('read'):
+                    file_path, new_terraform, stat = next(files)
+                self.source_files[file_path] = (stat.st_size, stat.st_mtime_ns)
+                with self.timers.phase('parse'):
+                    start = time.perf_counter()
+                    try:
+                        parsed = parse(new_terraform)
+                    except ValueError:
+                        self._logger.debug('Terraform plan {} is empty, skipping'.format(os.path.basename(file_path)))
+                        continue
+                    finally:
+                        self.timers.record_file(file_path, time.perf_counter() - start, len(new_terraform))
+                yield new_terraform, parsed
+
+    def _parse_concatenated(self, reader, paths):
+        terraform_strings = [new_terraform for new_terraform, _ in self._read_terraform_files(reader, paths,
+                                                                                              hclparser.loads)]
+        with self.timers.phase('merge'):
+            terraform = freeze(hclparser.loads(''.join(terraform_strings)))
+        return terraform
+
+    def _parse_per_file(self, reader, paths):
+        # Every file is parsed once into its top level items and dropped, only the parsed items are kept.
+        items = []
+        for _, file_items in self._read_terraform_files(reader, paths, hclparser.loads_items):
+            items.extend(file_items)
+        with self.timers.phase('merge'):
+            terraform = freeze(hclparser.merge_items(items))
         return terraform
 
     def get_terraform_resources(self, name, resources):
@@ -622,16 +1004,25 @@ class Validator:
         return not (self.get_regex_matches(regex, variable) is None)
 
     def get_regex_matches(self, regex, variable):
-        if regex[-1:] != "$":
-            regex = regex + "$"
-
-        if regex[0] != "^":
-            regex = "^" + regex
-
         variable = str(variable)
-        if '\n' in variable:
-            return re.match(regex, variable, re.DOTALL)
-        return re.match(regex, variable)
+        flags = re.DOTALL if '\n' in variable else 0
+        self.counters.increment('regex_evaluations')
+        pattern = _REGEX_CACHE.get((regex, flags))
+        if pattern is None:
+            self.counters.increment('regex_cache_misses')
+            anchored = regex
+            if anchored[-1:] != "$":
+                anchored = anchored + "$"
+
+            if anchored[0] != "^":
+                anchored = "^" + anchored
+            pattern = re.compile(anchored, flags)
+            if len(_REGEX_CACHE) >= REGEX_CACHE_SIZE:
+                _REGEX_CACHE.clear()
+            _REGEX_CACHE[(regex, flags)] = pattern
+        else:
+            self.counters.increment('regex_cache_hits')
+        return pattern.match(variable)
 
     def get_terraform_variable_value(self, variable):
         if ('variable' not in self.terraform_config.keys()) or (
@@ -641,30 +1032,62 @@ class Validator:
             return None
         return self.terraform_config['variable'][variable]['default']
 
-    def substitute_variable_values_in_string(self, s):
-        if self.variable_expand:
-            if not isinstance(s, dict):
-                for variable in self.list_terraform_variables_in_string(s):
-                    a = TerraformVariableParser(variable)
-                    a.parse()
-                    variable_default_value = self.get_terraform_variable_value(a.variable)
-                    if variable_default_value != None:
-                        for function in a.functions:
-                            if function == "lower":
-                                variable_default_value = variable_default_value.lower()
-                            elif function == "upper":
-                                variable_default_value = variable_default_value.upper()
-                            else:
-                                raise TerraformUnimplementedInterpolationException(
-                                    "The interpolation function '{0}' has not been implemented in Terraform Validator yet. Suggest you run disable_variable_expansion().".format(
-                                        function))
-                        s = s.replace("${" + variable + "}", variable_default_value)
+    def substitute_variable_values_in_string(self, s, variable_expand=None):
+        if variable_expand is None:
+            variable_expand = self.variable_expand
+        if variable_expand and not isinstance(s, dict):
+            if isinstance(s, str):
+                return self._expand_string(s)
+            variables = self.list_terraform_variables_in_string(s)
+            if variables:
+                self.counters.increment('variable_expansions')
+                with self.timers.phase('expand'):
+                    return self._substitute_variables(s, variables)
+        return s
+
+    def _expand_string(self, s):
+        # Expansions only depend on the variable table, so they are cached on its node and shared by every
+        # validator and configuration holding the same table.
+        table = self.terraform_config.get('variable', self.terraform_config)
+        expansions = derived(table, 'expansions', dict)
+        expanded = expansions.get(s)
+        if expanded is not None:
+            self.counters.increment('expansion_cache_hits')
+            return expanded
+        self.counters.increment('expansion_cache_misses')
+        expanded = s
+        variables = self.list_terraform_variables_in_string(s)
+        if variables:
+            self.counters.increment('variable_expansions')
+            with self.timers.phase('expand'):
+                expanded = self._substitute_variables(s, variables)
+        if len(expansions) >= EXPANSION_CACHE_SIZE:
+            expansions.clear()
+        expansions[s] = expanded
+        return expanded
+
+    def _substitute_variables(self, s, variables):
+        for variable in variables:
+            a = TerraformVariableParser(variable)
+            a.parse()
+            variable_default_value = self.get_terraform_variable_value(a.variable)
+            if variable_default_value != None:
+                for function in a.functions:
+                    if function == "lower":
+                        variable_default_value = variable_default_value.lower()
+                    elif function == "upper":
+                        variable_default_value = variable_default_value.upper()
+                    else:
+                        raise TerraformUnimplementedInterpolationException(
+                            "The interpolation function '{0}' has not been implemented in Terraform Validator yet. Suggest you run disable_variable_expansion().".format(
+                                function))
+                s = s.replace("${" + variable + "}", variable_default_value)
         return s
 
     def list_terraform_variables_in_string(self, s):
         return re.findall('\${(.*?)}', str(s))
 
     def convert_to_list(self, nested_resources):
-        if not type(nested_resources) == list:
+        if not isinstance(nested_resources, list):
             nested_resources = [nested_resources]
         return nested_resources
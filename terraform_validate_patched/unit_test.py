@@ -1,3 +1,10 @@
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 import terraform_validate_patched as t
 
@@ -125,3 +132,474 @@ class TestTerraformVariableParser(unittest.TestCase):
         a.parse()
         self.assertEqual(a.variable, 'lol')
         self.assertEqual(a.functions, ['lower', 'upper'])
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.config = {'resource': {'aws_instance': {'foo': {'tags': {'a.b': 'x'}, 'disk': [{'size': 1}, {'size': 2}]},
+                                                     'bar': {'disk': {'size': 3}}}}}
+
+    def test_compiled_query_is_cached(self):
+        self.assertIs(t.compile_query('resource.*.*.disk[*].size'), t.compile_query('resource.*.*.disk[*].size'))
+
+    def test_list_index_and_wildcard(self):
+        query = t.compile_query('resource.aws_instance.*.disk[*].size')
+        self.assertEqual(sorted(value for _, value in query.evaluate(self.config)), [1, 2, 3])
+        query = t.compile_query('resource.aws_instance.foo.disk[1].size')
+        self.assertEqual(list(query.evaluate(self.config)),
+                         [(('resource', 'aws_instance', 'foo', 'disk', 1, 'size'), 2)])
+
+    def test_key_segment_descends_into_lists(self):
+        query = t.compile_query('resource.aws_instance.foo.disk.size')
+        self.assertEqual([value for _, value in query.evaluate(self.config)], [1, 2])
+
+    def test_quoted_and_regex_segments(self):
+        query = t.compile_query('resource./aws_inst.*/.foo.tags."a.b"')
+        self.assertEqual(list(query.evaluate(self.config)), [(('resource', 'aws_instance', 'foo', 'tags', 'a.b'), 'x')])
+
+    def test_invalid_expressions(self):
+        for expression in ('', 'resource..foo', 'resource.', 'resource[abc]', 'resource[0', 'resource./(/'):
+            self.assertRaises(t.TerraformQueryException, t.compile_query, expression)
+
+    def test_format_path(self):
+        self.assertEqual(t.format_path(('resource', 'aws_instance', 'foo', 'disk', 0, 'size')),
+                         'resource.aws_instance.foo.disk[0].size')
+
+
+class TestViolation(unittest.TestCase):
+
+    def test_message_is_formatted_from_fields(self):
+        violation = t.Violation("[{type}.{name}.{path}] should be '{expected}'. Is: '{actual}'",
+                                'aws_instance', 'foo', 'nested.value', '2', '1')
+        self.assertEqual(violation.message, "[aws_instance.foo.nested.value] should be '2'. Is: '1'")
+        self.assertEqual(violation.as_dict()['path'], 'nested.value')
+
+    def test_violation_survives_pickling(self):
+        import pickle
+        violation = t.Violation("[{type}.{name}] should have property: '{expected}'", 'aws_instance', 'foo',
+                                expected='tags', rule='tagging')
+        self.assertEqual(pickle.loads(pickle.dumps(violation)), violation)
+
+    def test_nested_property_violation_is_split_into_name_and_path(self):
+        violation = t.property_violation("[{type}.{name}.{path}] is not valid json",
+                                         t.TerraformProperty('aws_instance', 'foo.nested', 'value', 1))
+        self.assertEqual((violation.resource_name, violation.path), ('foo', 'nested.value'))
+        self.assertEqual(violation.message, "[aws_instance.foo.nested.value] is not valid json")
+
+
+class TestRules(unittest.TestCase):
+
+    def test_unknown_assertion_is_rejected(self):
+        self.assertRaises(t.TerraformRuleException, t.Rule, 'bad', 'aws_instance', 'should_be_awesome')
+        self.assertRaises(t.TerraformRuleException, t.Rule, 'bad', 'aws_instance', 'should_equal')
+
+    def test_unknown_keys_and_duplicate_names_are_rejected(self):
+        self.assertRaises(t.TerraformRuleException, t.RuleSet.from_data,
+                          [{'name': 'a', 'resources': 'x', 'assertion': 'name_should_match_regex', 'typo': 1}])
+        rule = {'name': 'a', 'resources': 'x', 'assertion': 'name_should_match_regex', 'args': ['.*']}
+        self.assertRaises(t.TerraformRuleException, t.RuleSet.from_data, [rule, rule])
+
+    def test_plan_groups_rules_by_resource_type(self):
+        v = t.Validator({'resource': {'aws_instance': {'foo': {'value': 1}}, 'aws_s3_bucket': {'bar': {'value': 2}}}})
+        rule_set = t.RuleSet.from_data([
+            {'name': 'all', 'resources': 'aws_.*', 'property': 'value', 'assertion': 'should_equal', 'args': [1]},
+            {'name': 'instances', 'resources': ['aws_instance'], 'assertion': 'name_should_match_regex',
+             'args': ['f.*']}
+        ])
+        groups = rule_set.compile().group_by_resource_type(v)
+        self.assertEqual([rule.name for rule in groups['aws_instance']], ['all', 'instances'])
+        self.assertEqual([rule.name for rule in groups['aws_s3_bucket']], ['all'])
+        self.assertEqual(rule_set.run(v).messages(), ["[aws_s3_bucket.bar.value] should be '1'. Is: '2'"])
+
+
+    def test_evaluate_attributes_violations_to_the_rule(self):
+        v = t.Validator({'resource': {'aws_instance': {'foo': {'value': 2}}}})
+        rule = t.Rule('ones', 'aws_instance', 'should_equal', args=[1], property='value')
+        collector = t.ViolationCollector()
+        rule.evaluate(v, collector)
+        self.assertEqual(list(collector.by_rule()), ['ones'])
+
+    def test_errors_that_are_not_violations_end_the_plan(self):
+        v = t.Validator({'resource': {'aws_instance': {'foo': {'value': '${var.missing}'}}}})
+        rule_set = t.RuleSet.from_data([
+            {'name': 'names', 'resources': 'aws_instance', 'assertion': 'name_should_match_regex', 'args': ['bar']},
+            {'name': 'expanded', 'resources': 'aws_instance', 'property': 'value', 'assertion': 'should_equal',
+             'args': [1], 'variable_expansion': True}
+        ])
+        collector = t.ViolationCollector()
+        self.assertRaises(t.TerraformVariableException, rule_set.run, v, collector)
+        self.assertEqual(list(collector.by_rule()), ['names'])
+
+class TestHclParser(unittest.TestCase):
+
+    def test_prebuilt_tables_match_the_installed_grammar(self):
+        from terraform_validate_patched import _hcl_parsetab, hclparser
+        import hcl
+        self.assertEqual(_hcl_parsetab.SIGNATURE, hclparser.grammar_signature(hcl.parser.HclParser))
+
+    def test_parses_like_pyhcl(self):
+        from terraform_validate_patched import hclparser
+        import hcl
+        text = 'resource "aws_instance" "foo" {\n  value = "${var.a}"\n  block { nested = [1, 2] }\n}\n'
+        self.assertEqual(hclparser.loads(text), hcl.loads(text))
+        self.assertEqual(hclparser.loads('{"a": 1}'), {'a': 1})
+        self.assertRaises(ValueError, hclparser.loads, 'resource "x" {')
+
+    def test_tables_are_generated_when_the_signature_does_not_match(self):
+        from terraform_validate_patched import hclparser
+        import hcl
+        tables = hclparser._generate_tables(hcl.parser.HclParser)
+        self.assertEqual(tables.SIGNATURE, hclparser.grammar_signature(hcl.parser.HclParser))
+        state = dict(hclparser._load_hcl(), tables=tables)
+        text = 'resource "aws_instance" "foo" {\n  value = "${var.a}"\n  block { nested = [1, 2] }\n}\n'
+        self.assertEqual(hclparser._build_parser(state).parse(text), hcl.loads(text))
+
+    def test_importing_the_package_does_not_import_the_parser(self):
+        code = 'import sys, terraform_validate_patched; print("hcl" in sys.modules or "numpy" in sys.modules)'
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(output.decode('utf-8').strip(), 'False')
+
+
+class TestPhaseTimers(unittest.TestCase):
+
+    def test_nested_phases_are_not_counted_twice(self):
+        from terraform_validate_patched.instrumentation import PhaseTimers
+        timers = PhaseTimers()
+        with timers.phase('assert'):
+            with timers.phase('expand'):
+                time.sleep(0.02)
+        self.assertGreaterEqual(timers.wall['expand'], 0.02)
+        self.assertLess(timers.wall['assert'], 0.01)
+        self.assertEqual((timers.calls['assert'], timers.calls['expand']), (1, 1))
+
+    def test_slowest_files(self):
+        from terraform_validate_patched.instrumentation import PhaseTimers
+        timers = PhaseTimers(slowest=2)
+        for path, seconds in (('a.tf', 0.1), ('b.tf', 0.3), ('c.tf', 0.2)):
+            timers.record_file(path, seconds, 10)
+        self.assertEqual([path for path, _, _ in timers.slowest_files()], ['b.tf', 'c.tf'])
+        self.assertEqual(pickle.loads(pickle.dumps(timers)).slowest_files(1), [('b.tf', 0.3, 10)])
+
+    def test_memory_of_nested_phases(self):
+        from terraform_validate_patched.instrumentation import PhaseTimers
+        timers = PhaseTimers(memory=True)
+        try:
+            with timers.phase('parse'):
+                kept = bytearray(100000)
+                with timers.phase('merge'):
+                    dropped = bytearray(500000)
+                    del dropped
+        finally:
+            timers.disable_memory()
+        self.assertGreaterEqual(timers.peak['merge'], 500000)
+        self.assertGreaterEqual(timers.peak['parse'], 600000)
+        self.assertGreater(timers.retained['parse'], 90000)
+        self.assertLess(timers.retained['merge'], 100000)
+        self.assertEqual(len(kept), 100000)
+        self.assertIsNone(PhaseTimers().as_dict()['phases']['parse']['peak'])
+
+
+    def test_threads_that_ended_keep_counting_without_being_kept(self):
+        from terraform_validate_patched.instrumentation import PhaseTimers
+
+        def work():
+            with timers.phase('assert'):
+                with timers.phase('expand'):
+                    pass
+
+        timers = PhaseTimers()
+        for _ in range(20):
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+        self.assertEqual((timers.calls['assert'], timers.calls['expand']), (20, 20))
+        self.assertEqual(pickle.loads(pickle.dumps(timers)).calls['expand'], 20)
+        with timers.phase('assert'):
+            self.assertEqual(timers.calls['assert'], 20)
+        self.assertEqual(timers.calls['assert'], 21)
+
+class TestOperationCounters(unittest.TestCase):
+
+    def test_scopes_only_count_their_own_thread(self):
+        from terraform_validate_patched.instrumentation import OperationCounters
+        counters = OperationCounters()
+        with counters.scope() as counts:
+            counters.increment('json_decodes')
+            worker = threading.Thread(target=counters.increment, args=('json_decodes', 5))
+            worker.start()
+            worker.join()
+        self.assertEqual(counts['json_decodes'], 1)
+        self.assertEqual(counters.totals()['json_decodes'], 6)
+        self.assertIsNone(counts.hit_rate('query_cache'))
+
+    def test_counts_of_ended_threads_are_folded_in(self):
+        from terraform_validate_patched.instrumentation import OperationCounters
+        counters = OperationCounters()
+        for _ in range(20):
+            worker = threading.Thread(target=counters.increment, args=('json_decodes', 2))
+            worker.start()
+            worker.join()
+        counters.increment('json_decodes')
+        self.assertEqual(counters.totals()['json_decodes'], 41)
+        self.assertEqual(len(counters._totals), 1)
+
+    def test_query_cache_counts(self):
+        v = t.Validator({'resource': {'aws_instance': {'foo': {'value': 1}}}})
+        with v.counting() as counts:
+            v.query('resource.aws_instance.*.value')
+            v.query('resource.aws_instance.*.value')
+        self.assertEqual(counts['query_cache_hits'], 1)
+        self.assertEqual(counts['query_cache_hits'] + counts['query_cache_misses'], 2)
+
+
+class TestFingerprints(unittest.TestCase):
+
+    def test_fingerprints_ignore_formatting_and_attribute_order(self):
+        base = t.Validator(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures/resource"))
+        reordered = {'resource': {resource_type: {name: dict(reversed(list(config.items())))
+                                                  for name, config in named.items()}
+                                  for resource_type, named in base.terraform_config['resource'].items()}}
+        self.assertEqual(base.fingerprints(), t.Validator(reordered).fingerprints())
+        self.assertIs(base.fingerprints(), base.fingerprints())
+
+    def test_diff_configs(self):
+        from terraform_validate_patched.fingerprints import diff_configs
+        base = {'resource': {'aws_instance': {'foo': {'value': 1}, 'bar': {'value': 2}, 'gone': {}}}}
+        head = t.Validator({'resource': {'aws_instance': {'foo': {'value': 1}, 'bar': {'value': 3}, 'new': {}}}})
+        diff = diff_configs(base, head)
+        self.assertEqual((diff.added, diff.changed, diff.removed, diff.unchanged),
+                         ([('aws_instance', 'new')], [('aws_instance', 'bar')], [('aws_instance', 'gone')],
+                          [('aws_instance', 'foo')]))
+        restricted = head.restricted_to(diff.resources)
+        self.assertEqual(sorted(restricted.terraform_config['resource']['aws_instance']), ['bar', 'new'])
+        self.assertFalse(diff_configs(base, base))
+
+
+class TestRuleHistory(unittest.TestCase):
+
+    def _rules(self, *names):
+        return [t.Rule(name, 'aws_instance', 'name_should_match_regex', args=['.*']) for name in names]
+
+    def test_longest_rules_are_scheduled_first(self):
+        history = t.RuleHistory()
+        for name, duration in (('a', 3.0), ('b', 3.0), ('c', 3.0), ('d', 4.0), ('e', 5.0)):
+            history.record(name, duration, failed=False)
+        schedule = t.schedule_rules(self._rules('a', 'b', 'c', 'd', 'e', 'new'), history, jobs=2)
+        # the rule without history is expected to take the mean known duration, 3.6
+        self.assertEqual(schedule.order, [4, 3, 5, 0, 1, 2])
+        self.assertAlmostEqual(schedule.predicted_makespan, 11.0)
+
+    def test_failing_rules_are_scheduled_first_in_fail_fast_mode(self):
+        history = t.RuleHistory()
+        history.record('slow', 5.0, failed=False)
+        history.record('failing', 1.0, failed=True)
+        schedule = t.schedule_rules(self._rules('slow', 'failing'), history, jobs=1, fail_fast=True)
+        self.assertEqual(schedule.order, [1, 0])
+
+    def test_history_survives_saving(self):
+        path = os.path.join(tempfile.mkdtemp(), 'history.json')
+        history = t.RuleHistory(path, smoothing=0.5)
+        history.record('a', 1.0, failed=True)
+        history.record('a', 3.0, failed=False)
+        history.save()
+        loaded = t.RuleHistory.load(path)
+        self.assertEqual((loaded.get('a').runs, loaded.get('a').failures), (2, 1))
+        self.assertAlmostEqual(loaded.expected_duration('a'), 2.0)
+        self.assertAlmostEqual(loaded.failure_score('a'), 0.5)
+        self.assertEqual(len(t.RuleHistory.load(os.path.join(os.path.dirname(path), 'missing.json'))), 0)
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = t.ResultCache(max_entries=2)
+        cache.put('a', [])
+        cache.put('b', [])
+        cache.get('a')
+        cache.put('c', [])
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+
+    def test_cache_survives_saving_and_clearing(self):
+        path = os.path.join(tempfile.mkdtemp(), 'results.json')
+        cache = t.ResultCache(path)
+        cache.put('key', [["[{type}.{name}.{path}] is not valid json", 'policy', None, '{']])
+        cache.save()
+        self.assertEqual(t.ResultCache.load(path).get('key'), cache.get('key'))
+        self.assertEqual(len(t.ResultCache.load(path, max_entries=0)), 0)
+        cache.clear()
+        self.assertFalse(os.path.exists(path))
+
+    def test_rule_digest_ignores_name_and_description(self):
+        from terraform_validate_patched.cache import rule_digest
+        rule = t.Rule('a', 'aws_instance', 'name_should_match_regex', args=['.*'])
+        self.assertEqual(rule_digest(rule), rule_digest(t.Rule('b', 'aws_instance', 'name_should_match_regex',
+                                                               args=['.*'], description='renamed')))
+        self.assertNotEqual(rule_digest(rule), rule_digest(t.Rule('a', 'aws_instance', 'name_should_match_regex',
+                                                                  args=['[a-z]+'])))
+
+
+class TestShards(unittest.TestCase):
+
+    def test_units_are_assigned_to_exactly_one_shard(self):
+        units = ['root{}'.format(index) for index in range(50)]
+        selected = [t.Shard(index, 4).select(units) for index in range(1, 5)]
+        self.assertEqual(sorted(unit for shard in selected for unit in shard), sorted(units))
+        self.assertEqual(t.Shard(2, 4).select(units), selected[1])
+
+    def test_timings_balance_the_shards(self):
+        timings = {'slow': 10.0, 'a': 4.0, 'b': 3.0, 'c': 2.0}
+        # longest first onto the least loaded shard, 'new' is expected to take the mean, 4.75
+        self.assertEqual(t.assign(['a', 'b', 'c', 'slow', 'new'], 2, timings), {
+            'slow': 1, 'new': 2, 'a': 2, 'b': 2, 'c': 1})
+
+    def test_shards_are_parsed_from_one(self):
+        from terraform_validate_patched.shards import parse_shard
+        self.assertEqual(parse_shard('1/4'), (1, 4))
+        for text in ('0/4', '5/4', '4', 'a/b'):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+
+class TestFrozenConfig(unittest.TestCase):
+
+    def _validator(self):
+        return t.Validator({'variable': {'size': {'default': 'small'}},
+                            'resource': {'aws_instance': {'foo': {'size': '${var.size}', 'ports': [22, 80]},
+                                                          'bar': {'size': 'large'}}}})
+
+    def test_configuration_cannot_be_changed_in_place(self):
+        config = self._validator().terraform_config
+        instance = config['resource']['aws_instance']['foo']
+        for change in (lambda: instance.__setitem__('size', 'tiny'), lambda: instance.update(size='tiny'),
+                       lambda: instance['ports'].append(443), lambda: config.pop('variable')):
+            with self.assertRaises(TypeError):
+                change()
+        self.assertEqual(hash(instance), hash(t.freeze({'ports': [22, 80], 'size': '${var.size}'})))
+        self.assertEqual(pickle.loads(pickle.dumps(config)), config)
+        self.assertIsInstance(t.thaw(config)['resource']['aws_instance']['foo']['ports'], list)
+
+    def test_changes_copy_the_path_and_share_the_rest(self):
+        config = self._validator().terraform_config
+        changed = config.set_in(('resource', 'aws_instance', 'bar', 'size'), 'medium')
+        self.assertEqual(config['resource']['aws_instance']['bar']['size'], 'large')
+        self.assertEqual(changed['resource']['aws_instance']['bar']['size'], 'medium')
+        self.assertIs(changed['resource']['aws_instance']['foo'], config['resource']['aws_instance']['foo'])
+        self.assertIs(changed['variable'], config['variable'])
+        removed = changed.delete_in(('resource', 'aws_instance', 'foo', 'ports'))
+        self.assertEqual(removed['resource']['aws_instance']['foo'], {'size': '${var.size}'})
+
+    def test_derived_values_are_cached_on_the_nodes(self):
+        validator = self._validator()
+        validator.enable_variable_expansion()
+        fingerprints = validator.fingerprints()
+        changed = t.Validator(validator.terraform_config.set_in(('resource', 'aws_instance', 'bar', 'size'), 'tiny'))
+        changed.enable_variable_expansion()
+        instance = validator.terraform_config['resource']['aws_instance']['foo']
+        self.assertIs(changed.fingerprints()[('aws_instance', 'foo')], fingerprints[('aws_instance', 'foo')])
+        self.assertNotEqual(changed.fingerprints()[('aws_instance', 'bar')], fingerprints[('aws_instance', 'bar')])
+        self.assertEqual(validator.substitute_variable_values_in_string(instance['size']), 'small')
+        self.assertEqual(changed.substitute_variable_values_in_string(instance['size']), 'small')
+        self.assertEqual((validator.counts()['expansion_cache_misses'], changed.counts()['expansion_cache_hits']),
+                         (1, 1))
+
+
+    def test_value_keys_are_cached_on_the_nodes(self):
+        from terraform_validate_patched.terraform_validate_patched import value_key
+        ports = self._validator().terraform_config['resource']['aws_instance']['foo']['ports']
+        key = value_key(ports)
+        self.assertIs(value_key(ports), key)
+        self.assertEqual(value_key([22, 80]), key)
+        self.assertNotEqual(value_key(t.freeze({'ports': [22, 80]})), key)
+
+class TestPrefetchReader(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for directory in ('a', 'a/b', 'c'):
+            os.makedirs(os.path.join(self.root, directory))
+        for index, directory in enumerate(('', 'a', 'a/b', 'a/b', 'c', 'c')):
+            with open(os.path.join(self.root, directory, '{}.tf'.format(index)), 'w') as ofile:
+                ofile.write('variable "v{}" {{}}\n'.format(index))
+        open(os.path.join(self.root, 'a', 'notes.txt'), 'w').close()
+        os.symlink(os.path.join(self.root, 'a'), os.path.join(self.root, 'link'))
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.root)
+
+    def test_files_are_found_and_read_in_walk_order(self):
+        from terraform_validate_patched.filesystem import PrefetchReader
+        expected = [os.path.join(directory, name) for directory, _, names in os.walk(self.root)
+                    for name in names if name.endswith('.tf')]
+        for workers in (1, 4):
+            with PrefetchReader(workers=workers, depth=2) as reader:
+                paths = reader.walk(self.root)
+                self.assertEqual(paths, expected)
+                self.assertEqual([path for path, _, _ in reader.read(paths)], expected)
+                self.assertEqual(reader.size(paths[0]), os.path.getsize(paths[0]))
+
+    def test_reads_overlap_on_a_slow_filesystem(self):
+        from terraform_validate_patched.filesystem import LatencyFilesystem
+        loaded = {}
+        for workers in (1, 4):
+            filesystem = LatencyFilesystem(latency=0.02)
+            loaded[workers] = t.Validator(self.root, read_workers=workers, filesystem=filesystem)
+            self.assertEqual(filesystem.calls, 4 + 6)
+            self.assertEqual(filesystem.peak > 1, workers > 1)
+        self.assertEqual(loaded[4].terraform_config, loaded[1].terraform_config)
+        self.assertEqual(list(loaded[4].source_files), list(loaded[1].source_files))
+
+
+class TestViolationSinks(unittest.TestCase):
+
+    class _Stream(object):
+
+        def __init__(self):
+            self.parts = []
+            self.flushes = 0
+
+        def write(self, text):
+            self.parts.append(text)
+
+        def flush(self):
+            self.flushes += 1
+
+        def getvalue(self):
+            return ''.join(self.parts)
+
+    def _validator(self):
+        return t.Validator({'resource': {'aws_instance': {'foo': {'value': 1}, 'bar': {'value': 2}}}})
+
+    def test_sink_collects_in_place_of_a_collector(self):
+        import json
+        stream = self._Stream()
+        rule_set = t.RuleSet([t.Rule('value-is-3', 'aws_instance', 'should_equal', args=[3], property='value')])
+        with t.JsonLinesSink(stream, flush_every=1) as sink:
+            rule_set.run(self._validator(), sink)
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(sorted(record['name'] for record in records), ['bar', 'foo'])
+        self.assertEqual({record['rule'] for record in records}, {'value-is-3'})
+        self.assertEqual(len(sink), 2)
+        self.assertGreaterEqual(stream.flushes, 2)
+
+    def test_a_sink_needs_a_format(self):
+        self.assertRaises(TypeError, t.ViolationSink, self._Stream())
+
+    def test_documents_are_complete_without_violations(self):
+        import json
+        from xml.etree import ElementTree
+        rule_set = t.RuleSet([t.Rule('names', 'aws_instance', 'name_should_match_regex', args=['.*'])])
+        for sink_class in (t.JsonSink, t.SarifSink, t.JUnitSink):
+            stream = self._Stream()
+            with sink_class(stream, rule_set) as sink:
+                for result in t.RuleRunner(rule_set, jobs=1).results(self._validator()):
+                    sink.add_result(result)
+            self.assertTrue(sink.passed)
+            if sink_class is t.JUnitSink:
+                self.assertEqual(ElementTree.fromstring(stream.getvalue()).find('testsuite/testcase').get('name'),
+                                 'names')
+            else:
+                document = json.loads(stream.getvalue())
+                self.assertEqual(document.get('violations', document.get('runs', [{}])[0].get('results')), [])
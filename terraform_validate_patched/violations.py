@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File: violations.py
+#
+# Copyright (C) 2018 Costas Tyfoxylos
+#
+# This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""
+violations module
+
+Structured records of failed assertions and the collector used by the non raising mode.
+
+.. _Google Python Style Guide:
+   http://google.github.io/styleguide/pyguide.html
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+__author__ = '''Costas Tyfoxylos <ctyfoxylos@schubergphilis.com>'''
+__docformat__ = '''google'''
+__date__ = '''2018-05-25'''
+__copyright__ = '''Copyright 2018, Costas Tyfoxylos'''
+__license__ = '''GNU GPL v3.0'''
+__maintainer__ = '''Costas Tyfoxylos'''
+__email__ = '''<ctyfoxylos@schubergphilis.com>'''
+__status__ = '''Development'''  # "Prototype", "Development", "Production".
+
+
+class Violation(object):
+    """A single failed assertion.
+
+    The English message is only rendered from the template when ``message`` is accessed.
+
+    Args:
+        template: A format string using the {type}, {name}, {path}, {expected} and {actual} fields
+        resource_type: The type of the offending resource, 'variable' for variables
+        resource_name: The name of the offending resource or variable
+        path: The dotted property path inside the resource, None for resource level violations
+        expected: What the assertion expected
+        actual: What was found
+        rule: The rule that was being evaluated, if any
+
+    """
+
+    __slots__ = ('template', 'resource_type', 'resource_name', 'path', 'expected', 'actual', 'rule')
+
+    def __init__(self, template, resource_type, resource_name, path=None, expected=None, actual=None, rule=None):
+        self.template = template
+        self.resource_type = resource_type
+        self.resource_name = resource_name
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+        self.rule = rule
+
+    def __repr__(self):
+        return '<Violation {!r}>'.format(self.message)
+
+    def __eq__(self, other):
+        return isinstance(other, Violation) and self.as_tuple() == other.as_tuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.message)
+
+    def __getstate__(self):
+        return self.as_tuple()
+
+    def __setstate__(self, state):
+        (self.rule, self.template, self.resource_type, self.resource_name,
+         self.path, self.expected, self.actual) = state
+
+    def as_tuple(self):
+        return (self.rule, self.template, self.resource_type, self.resource_name, self.path, self.expected,
+                self.actual)
+
+    @property
+    def message(self):
+        return self.template.format(type=self.resource_type,
+                                    name=self.resource_name,
+                                    path=self.path,
+                                    expected=self.expected,
+                                    actual=self.actual)
+
+    def as_dict(self):
+        return OrderedDict([('rule', self.rule),
+                            ('type', self.resource_type),
+                            ('name', self.resource_name),
+                            ('path', self.path),
+                            ('expected', self.expected),
+                            ('actual', self.actual),
+                            ('message', self.message)])
+
+
+def format_violations(violations):
+    """Renders violations the way the assertion methods always have, one sorted message per line."""
+    return "\n".join(sorted(violation.message for violation in violations))
+
+
+class ViolationCollector(object):
+    """Accumulates violations instead of raising on the first failing assertion."""
+
+    def __init__(self):
+        self.violations = []
+        self.current_rule = None
+
+    def __len__(self):
+        return len(self.violations)
+
+    def __iter__(self):
+        return iter(self.violations)
+
+    @contextmanager
+    def rule(self, name):
+        """Attributes every violation recorded inside the block to the named rule."""
+        previous = self.current_rule
+        self.current_rule = name
+        try:
+            yield self
+        finally:
+            self.current_rule = previous
+
+    def add(self, violations):
+        for violation in violations:
+            if violation.rule is None:
+                violation.rule = self.current_rule
+            self.violations.append(violation)
+
+    def clear(self):
+        del self.violations[:]
+
+    def by_rule(self):
+        grouped = OrderedDict()
+        for violation in self.violations:
+            grouped.setdefault(violation.rule, []).append(violation)
+        return grouped
+
+    def messages(self):
+        return sorted(violation.message for violation in self.violations)
+
+    def raise_if_violations(self):
+        if self.violations:
+            raise AssertionError(format_violations(self.violations))